@@ -1,5 +1,6 @@
 #!/usr/bin/env bash
 set -euo pipefail
+pytest shared/tests -v
 pytest simulator/tests -v
 pytest services/anomaly-detection/tests -v
 pytest services/predictive-maintenance/tests -v
@@ -13,3 +13,7 @@
 {{ .Values.serviceAccount.name | default "default" }}
 {{- end -}}
 {{- end -}}
+
+{{- define "chart.shardTokenSecret" -}}
+{{ .Values.sharding.token.existingSecret | default (printf "%s-shard-token" (include "chart.fullname" .)) }}
+{{- end -}}
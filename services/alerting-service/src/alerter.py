@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import logging
+from contextlib import nullcontext
 
 import httpx
 from config import AlertingConfig
+from dt_shared.instrumentation import Instrumentation
 from models import AlertRequest
 
 LOG = logging.getLogger(__name__)
@@ -14,8 +16,11 @@ LOG = logging.getLogger(__name__)
 class Alerter:
     """Deliver alerts to external channels such as Slack."""
 
-    def __init__(self, config: AlertingConfig) -> None:
+    def __init__(
+        self, config: AlertingConfig, instrumentation: Instrumentation | None = None
+    ) -> None:
         self._config = config
+        self._instrumentation = instrumentation
 
     async def send(self, alert: AlertRequest) -> tuple[str, str]:
         if not self._config.slack_webhook_url:
@@ -29,14 +34,20 @@ class Alerter:
             )
         }
 
+        timed = (
+            nullcontext()
+            if self._instrumentation is None
+            else self._instrumentation.downstream("slack", "send_alert")
+        )
         try:
-            async with httpx.AsyncClient(
-                timeout=self._config.request_timeout_s
-            ) as client:
-                response = await client.post(
-                    self._config.slack_webhook_url, json=payload
-                )
-                response.raise_for_status()
+            with timed:
+                async with httpx.AsyncClient(
+                    timeout=self._config.request_timeout_s
+                ) as client:
+                    response = await client.post(
+                        self._config.slack_webhook_url, json=payload
+                    )
+                    response.raise_for_status()
         except httpx.HTTPError as exc:
             LOG.exception("Failed to deliver Slack alert")
             return "queued", f"delivery failed: {exc}"
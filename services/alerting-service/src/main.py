@@ -4,13 +4,16 @@ from __future__ import annotations
 
 from alerter import Alerter
 from config import AlertingConfig
+from dt_shared.instrumentation import Instrumentation
 from fastapi import FastAPI
 from models import AlertRequest, AlertResponse
 
 app = FastAPI(title="Alerting Service", version="0.1.0")
+instrumentation = Instrumentation()
+instrumentation.instrument_app(app)
 
 _config = AlertingConfig()
-_alerter = Alerter(config=_config)
+_alerter = Alerter(config=_config, instrumentation=instrumentation)
 
 
 @app.get("/health")
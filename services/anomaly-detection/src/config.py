@@ -20,3 +20,34 @@ class DetectorConfig:
     rule_vibration_high: float = float(os.getenv("RULE_VIBRATION_HIGH", "5"))
     rule_coolant_low: float = float(os.getenv("RULE_COOLANT_FLOW_LOW", "2"))
     rule_min_rpm_running: float = float(os.getenv("RULE_MIN_RPM_RUNNING", "500"))
+    bearing_ball_diameter_mm: float = float(os.getenv("BEARING_BALL_DIAMETER_MM", "8"))
+    bearing_pitch_diameter_mm: float = float(
+        os.getenv("BEARING_PITCH_DIAMETER_MM", "40")
+    )
+    bearing_contact_angle_deg: float = float(
+        os.getenv("BEARING_CONTACT_ANGLE_DEG", "15")
+    )
+    bearing_num_balls: int = int(os.getenv("BEARING_NUM_BALLS", "8"))
+    envelope_band_low_hz: float = float(os.getenv("ENVELOPE_BAND_LOW_HZ", "2000"))
+    envelope_band_high_hz: float = float(os.getenv("ENVELOPE_BAND_HIGH_HZ", "4000"))
+    envelope_threshold: float = float(os.getenv("ENVELOPE_THRESHOLD", "8"))
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    """Machine-id sharding across replicas (disabled without peers)."""
+
+    self_url: str = os.getenv("ANOMALY_SHARD_SELF", "")
+    peers: tuple = tuple(
+        peer.strip()
+        for peer in os.getenv("ANOMALY_SHARD_PEERS", "").split(",")
+        if peer.strip()
+    )
+    peer_dns: str = os.getenv("ANOMALY_SHARD_DNS", "")
+    peer_port: int = int(os.getenv("ANOMALY_SHARD_PORT", "8000"))
+    refresh_interval_s: float = float(os.getenv("ANOMALY_SHARD_REFRESH_S", "15"))
+    vnodes: int = int(os.getenv("ANOMALY_SHARD_VNODES", "64"))
+    timeout_s: float = float(os.getenv("ANOMALY_SHARD_TIMEOUT_S", "3"))
+    # Required in x-admin-token by PUT /shard/ring and POST /shard/state and
+    # sent with handoffs, so every replica must share it.
+    admin_token: str = os.getenv("ANOMALY_SHARD_TOKEN", "")
@@ -4,32 +4,95 @@ from __future__ import annotations
 
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List
+from typing import Deque, Dict, Iterable, List, Sequence, Tuple
 
 import numpy as np
 from config import DetectorConfig
+from dt_shared.profiling import Stopwatch, stage_timer
 from models import Anomaly
 from sklearn.ensemble import IsolationForest
+from spectrum import EnvelopeAnalyzer, bearing_orders
+
+_RULES_EVALUATE = stage_timer("anomaly.rules.evaluate")
+_ZSCORE_WINDOW = stage_timer("anomaly.zscore.window")
+_ZSCORE_SCORE = stage_timer("anomaly.zscore.score")
 
 
 @dataclass
 class Detector:
-    """Combine statistical, ML, and rule-based anomaly detectors."""
+    """Combine statistical, ML, and rule-based anomaly detectors.
+
+    Rolling z-score windows are kept per ``(machine_id, metric)`` and can be
+    exported and imported per machine, so a replica can hand a machine's
+    baseline to the replica that takes over its shard.
+    """
 
     config: DetectorConfig = field(default_factory=DetectorConfig)
-    _history: Dict[str, Deque[float]] = field(default_factory=dict, init=False)
+    _history: Dict[Tuple[str, str], Deque[float]] = field(
+        default_factory=dict, init=False
+    )
     _iforest: IsolationForest = field(
         default_factory=lambda: IsolationForest(
             n_estimators=100, contamination=0.02, random_state=42
         )
     )
     _iforest_ready: bool = field(default=False, init=False)
+    _envelope: EnvelopeAnalyzer = field(init=False)
+
+    def __post_init__(self) -> None:
+        orders = bearing_orders(
+            self.config.bearing_ball_diameter_mm,
+            self.config.bearing_pitch_diameter_mm,
+            self.config.bearing_contact_angle_deg,
+            self.config.bearing_num_balls,
+        )
+        # FTF (cage) faults show up as sidebands rather than envelope peaks.
+        orders.pop("FTF")
+        self._envelope = EnvelopeAnalyzer(
+            orders=orders,
+            band_hz=(
+                self.config.envelope_band_low_hz,
+                self.config.envelope_band_high_hz,
+            ),
+        )
 
-    def _push(self, metric: str, value: float) -> None:
-        window = self._history.setdefault(metric, deque(maxlen=self.config.window_size))
+    def _push(self, machine_id: str, metric: str, value: float) -> Deque[float]:
+        window = self._history.setdefault(
+            (machine_id, metric), deque(maxlen=self.config.window_size)
+        )
         window.append(value)
+        return window
+
+    def machine_ids(self) -> List[str]:
+        return sorted({machine_id for machine_id, _ in self._history})
+
+    def export_state(self, machine_ids: Iterable[str]) -> Dict[str, Dict[str, list]]:
+        """Rolling windows as ``{machine_id: {metric: [values]}}``."""
+
+        wanted = set(machine_ids)
+        state: Dict[str, Dict[str, list]] = {}
+        for (machine_id, metric), window in self._history.items():
+            if machine_id in wanted:
+                state.setdefault(machine_id, {})[metric] = list(window)
+        return state
+
+    def import_state(self, state: Dict[str, Dict[str, Sequence[float]]]) -> None:
+        """Adopt exported windows, older than any samples already seen here."""
+
+        for machine_id, metrics in state.items():
+            for metric, values in metrics.items():
+                key = (machine_id, metric)
+                window = deque(values, maxlen=self.config.window_size)
+                window.extend(self._history.get(key, ()))
+                self._history[key] = window
+
+    def drop_state(self, machine_ids: Iterable[str]) -> None:
+        dropped = set(machine_ids)
+        for key in [key for key in self._history if key[0] in dropped]:
+            del self._history[key]
 
     def detect_rule_based(self, telemetry: dict) -> List[Anomaly]:
+        watch = Stopwatch()
         anomalies: List[Anomaly] = []
         machine_id = telemetry.get("machine_id", "unknown")
         spindle = telemetry.get("spindle", {})
@@ -87,18 +150,21 @@ class Detector:
                 )
             )
 
+        watch.lap(_RULES_EVALUATE)
         return anomalies
 
     def detect_zscore(
         self, metric: str, value: float, machine_id: str
     ) -> List[Anomaly]:
+        watch = Stopwatch()
         anomalies: List[Anomaly] = []
-        self._push(metric, value)
-        window = self._history[metric]
+        window = self._push(machine_id, metric, value)
+        watch.lap(_ZSCORE_WINDOW)
         if len(window) < max(5, self.config.window_size // 2):
             return anomalies
         mean = float(np.mean(window))
         std = float(np.std(window))
+        watch.lap(_ZSCORE_SCORE)
         if std <= 1e-6:
             return anomalies
         z = abs((value - mean) / std)
@@ -141,3 +207,34 @@ class Detector:
                     )
                 )
         return anomalies
+
+    def detect_bearing_defects(
+        self,
+        machine_ids: Sequence[str],
+        blocks: np.ndarray,
+        sample_rate_hz: float,
+        rpm: np.ndarray,
+    ) -> List[Anomaly]:
+        """Flag bearing defect frequencies in raw ``(n_blocks, n_samples)`` data."""
+
+        threshold = self.config.envelope_threshold
+        anomalies: List[Anomaly] = []
+        scores = self._envelope.scores(blocks, sample_rate_hz, rpm)
+        for name, values in scores.items():
+            for index in np.flatnonzero(values > threshold):
+                score = float(values[index])
+                frequency = rpm[index] / 60.0 * self._envelope.orders[name]
+                anomalies.append(
+                    Anomaly(
+                        machine_id=machine_ids[index],
+                        metric=f"spindle.bearing.{name.lower()}",
+                        value=score,
+                        severity="high" if score > 2.0 * threshold else "medium",
+                        detector="envelope",
+                        reason=(
+                            f"{name} at {frequency:.1f} Hz is {score:.1f}x the "
+                            "envelope noise floor"
+                        ),
+                    )
+                )
+        return anomalies
@@ -2,26 +2,146 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
-from typing import List
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Dict, List, Tuple
 
-from config import DetectorConfig
+import httpx
+import numpy as np
+from config import DetectorConfig, ShardConfig
 from detector import Detector
-from fastapi import FastAPI
-from fastapi.responses import PlainTextResponse
-from models import Anomaly, DetectionResult, TelemetryBatch
-from prometheus_client import Counter, Histogram, generate_latest
+from dt_shared.admin import ADMIN_TOKEN_HEADER, require_admin_token
+from dt_shared.instrumentation import Instrumentation
+from dt_shared.telemetry import (
+    BINARY_CONTENT_TYPE,
+    decode_binary,
+    decode_binary_rows,
+    encode_rows_binary,
+    telemetry_row,
+    telemetry_row_payload,
+)
+from fastapi import FastAPI, Header, HTTPException, Request
+from models import (
+    Anomaly,
+    DetectionResult,
+    ShardRing,
+    ShardState,
+    TelemetryBatch,
+    VibrationBatch,
+    VibrationBlock,
+)
+from prometheus_client import Counter, Histogram
+from sharding import HashRing, ShardManager, resolve_peers
+
+logger = logging.getLogger(__name__)
+
+# Marks a request already routed by a peer, so it is never forwarded again.
+SHARD_FORWARDED_HEADER = "x-shard-forwarded"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    refresher = None
+    if _shard_config.peer_dns:
+        refresher = asyncio.create_task(_refresh_ring())
+    elif _shard_config.peers:
+        await _shard.update(_shard_config.peers)
+    try:
+        yield
+    finally:
+        if refresher is not None:
+            refresher.cancel()
+        # Scale-in: give this replica's machines to the remaining owners.
+        await _shard.leave()
+
+
+app = FastAPI(title="Anomaly Detection Service", version="0.1.0", lifespan=lifespan)
 
-app = FastAPI(title="Anomaly Detection Service", version="0.1.0")
+instrumentation = Instrumentation()
+instrumentation.instrument_app(app)
 
-DETECTION_COUNTER = Counter("anomalies_detected_total", "Total anomalies detected")
+DETECTION_COUNTER = Counter(
+    "anomalies_detected_total",
+    "Total anomalies detected",
+    registry=instrumentation.registry,
+)
 PROCESSED_COUNTER = Counter(
-    "messages_processed_total", "Total telemetry messages processed"
+    "messages_processed_total",
+    "Total telemetry messages processed",
+    registry=instrumentation.registry,
+)
+LATENCY_HIST = Histogram(
+    "detection_latency_seconds",
+    "Detection latency in seconds",
+    registry=instrumentation.registry,
 )
-LATENCY_HIST = Histogram("detection_latency_seconds", "Detection latency in seconds")
 
 _detector = Detector(config=DetectorConfig())
 _recent_anomalies: List[Anomaly] = []
+instrumentation.track_size("zscore_machines", lambda: len(_detector.machine_ids()))
+instrumentation.track_size("recent_anomalies", lambda: len(_recent_anomalies))
+
+
+async def _post(
+    url: str, payload: dict | bytes, headers: Dict[str, str] | None = None
+) -> dict:
+    """POST JSON, or ``bytes`` as a binary telemetry batch, to a peer."""
+
+    if isinstance(payload, bytes):
+        body = {"content": payload}
+        headers = {"content-type": BINARY_CONTENT_TYPE, **(headers or {})}
+    else:
+        body = {"json": payload}
+    with instrumentation.downstream("anomaly-detection-peer", httpx.URL(url).path):
+        async with httpx.AsyncClient(timeout=_shard_config.timeout_s) as client:
+            response = await client.post(url, headers=headers, **body)
+            response.raise_for_status()
+            return response.json()
+
+
+async def _send_state(node: str, machines: Dict[str, Dict[str, list]]) -> None:
+    await _post(
+        f"{node}/shard/state",
+        {"machines": machines},
+        headers={ADMIN_TOKEN_HEADER: _shard_config.admin_token},
+    )
+
+
+_shard_config = ShardConfig()
+_shard = ShardManager(
+    self_node=_shard_config.self_url,
+    detector=_detector,
+    transport=_send_state,
+    ring=HashRing(vnodes=_shard_config.vnodes),
+)
+
+
+async def _refresh_ring() -> None:
+    while True:
+        try:
+            peers = await asyncio.to_thread(
+                resolve_peers, _shard_config.peer_dns, _shard_config.peer_port
+            )
+            await _shard.update(peers)
+        except Exception:
+            logger.exception("Shard ring refresh failed")
+        await asyncio.sleep(_shard_config.refresh_interval_s)
+
+
+async def _forward(node: str, rows: List[tuple]) -> List[Anomaly] | None:
+    try:
+        result = await _post(
+            f"{node}/detect/binary",
+            encode_rows_binary(rows),
+            headers={SHARD_FORWARDED_HEADER: "1"},
+        )
+    except Exception:
+        logger.warning("Forwarding %d samples to %s failed", len(rows), node)
+        return None
+    return DetectionResult.model_validate(result).anomalies
 
 
 @app.get("/health")
@@ -35,24 +155,106 @@ async def ready() -> dict:
 
 
 @app.post("/detect")
-async def detect(batch: TelemetryBatch) -> DetectionResult:
+async def detect(
+    batch: TelemetryBatch,
+    x_shard_forwarded: Annotated[str | None, Header()] = None,
+) -> DetectionResult:
+    rows = [telemetry_row(item) for item in batch.telemetry]
+    return await _detect(rows, forwarded=x_shard_forwarded is not None)
+
+
+@app.post("/detect/binary")
+async def detect_binary(
+    request: Request,
+    x_shard_forwarded: Annotated[str | None, Header()] = None,
+) -> DetectionResult:
+    """Detect on a ``dt_shared.telemetry`` binary batch.
+
+    Batches forwarded by a peer were validated where they entered the
+    cluster, so their records are used as decoded.
+    """
+
+    body = await request.body()
+    try:
+        if x_shard_forwarded is not None:
+            rows = decode_binary_rows(body)
+        else:
+            rows = [telemetry_row(item) for item in decode_binary(body)]
+    except ValueError as exc:
+        # Malformed batches, and pydantic ``ValidationError`` for bad values.
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return await _detect(rows, forwarded=x_shard_forwarded is not None)
+
+
+async def _detect(rows: List[tuple], forwarded: bool) -> DetectionResult:
+    # ``rows`` are ``TELEMETRY_ROW_FIELDS`` tuples; index 1 is the machine id.
     start = time.perf_counter()
     anomalies: List[Anomaly] = []
+    local = rows
+    remote: List[Anomaly] = []
 
-    for item in batch.telemetry:
-        telemetry = item.model_dump()
+    if not forwarded and _shard.ring.nodes:
+        # Z-score windows live with the machine's owner: send each owner its
+        # samples in one request and detect the rest here.
+        routed = _shard.ring.route(rows, key=lambda row: row[1])
+        local = routed.pop(_shard.self_node, [])
+        results = await asyncio.gather(
+            *(_forward(node, items) for node, items in routed.items())
+        )
+        for items, result in zip(routed.values(), results):
+            if result is None:
+                local.extend(items)
+            else:
+                remote.extend(result)
+
+    for row in local:
+        telemetry = telemetry_row_payload(row)
         anomalies.extend(_detector.detect_rule_based(telemetry))
         anomalies.extend(
             _detector.detect_zscore(
                 "spindle.temperature_c",
                 telemetry["spindle"]["temperature_c"],
-                item.machine_id,
+                row[1],
             )
         )
 
     duration = time.perf_counter() - start
     LATENCY_HIST.observe(duration)
-    PROCESSED_COUNTER.inc(len(batch.telemetry))
+    PROCESSED_COUNTER.inc(len(local))
+    DETECTION_COUNTER.inc(len(anomalies))
+
+    _recent_anomalies.extend(anomalies)
+    _recent_anomalies[:] = _recent_anomalies[-100:]
+
+    return DetectionResult(
+        anomalies=anomalies + remote,
+        model_not_ready=not _detector._iforest_ready,
+        processed=len(rows),
+    )
+
+
+@app.post("/detect/vibration")
+async def detect_vibration(batch: VibrationBatch) -> DetectionResult:
+    start = time.perf_counter()
+    anomalies: List[Anomaly] = []
+
+    # Blocks sharing a sample rate and length are analysed as one array.
+    groups: Dict[Tuple[float, int], List[VibrationBlock]] = defaultdict(list)
+    for block in batch.blocks:
+        groups[(block.sample_rate_hz, len(block.samples))].append(block)
+    for (sample_rate_hz, _), blocks in groups.items():
+        anomalies.extend(
+            _detector.detect_bearing_defects(
+                [block.machine_id for block in blocks],
+                np.array([block.samples for block in blocks]),
+                sample_rate_hz,
+                np.array([block.rpm for block in blocks]),
+            )
+        )
+
+    duration = time.perf_counter() - start
+    LATENCY_HIST.observe(duration)
+    PROCESSED_COUNTER.inc(len(batch.blocks))
     DETECTION_COUNTER.inc(len(anomalies))
 
     _recent_anomalies.extend(anomalies)
@@ -61,15 +263,41 @@ async def detect(batch: TelemetryBatch) -> DetectionResult:
     return DetectionResult(
         anomalies=anomalies,
         model_not_ready=not _detector._iforest_ready,
-        processed=len(batch.telemetry),
+        processed=len(batch.blocks),
     )
 
 
+@app.get("/shard/ring")
+async def shard_ring() -> dict:
+    return {"self": _shard.self_node, "nodes": _shard.ring.nodes}
+
+
+@app.put("/shard/ring")
+async def update_shard_ring(
+    ring: ShardRing,
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> dict:
+    require_admin_token(_shard_config.admin_token, x_admin_token)
+    handed_off = await _shard.update(ring.nodes)
+    return {"nodes": _shard.ring.nodes, "handed_off": handed_off}
+
+
+@app.get("/shard/owner/{machine_id}")
+async def shard_owner(machine_id: str) -> dict:
+    owner = _shard.ring.owner(machine_id) or _shard.self_node
+    return {"machine_id": machine_id, "owner": owner}
+
+
+@app.post("/shard/state")
+async def import_shard_state(
+    state: ShardState,
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> dict:
+    require_admin_token(_shard_config.admin_token, x_admin_token)
+    _detector.import_state(state.machines)
+    return {"imported": len(state.machines)}
+
+
 @app.get("/anomalies")
 async def anomalies(limit: int = 50) -> List[Anomaly]:
     return list(_recent_anomalies[-limit:])
-
-
-@app.get("/metrics")
-async def metrics() -> PlainTextResponse:
-    return PlainTextResponse(generate_latest(), media_type="text/plain")
@@ -3,87 +3,32 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
+from dt_shared.telemetry import Telemetry
 from pydantic import BaseModel, ConfigDict, Field
 
 
-class SpindleTelemetry(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    rpm: float = Field(0.0, ge=0, le=24000)
-    load_percent: float = Field(0.0, ge=0, le=100)
-    temperature_c: float = Field(20.0, ge=0, le=120)
-    vibration_mm_s: float = Field(0.0, ge=0, le=20)
-
-
-class AxisState(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    position_mm: float = 0.0
-    velocity_mm_min: float = 0.0
-
-
-class AxesTelemetry(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    x: AxisState
-    y: AxisState
-    z: AxisState
-
-
-class ToolTelemetry(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    id: str
-    type: Literal["end_mill", "drill", "tap", "boring_bar"]
-    diameter_mm: float = Field(..., gt=0)
-    wear_percent: float = Field(0.0, ge=0, le=100)
-    runtime_minutes: float = Field(0.0, ge=0)
-
-
-class CoolantTelemetry(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    flow_rate_lpm: float = Field(0.0, ge=0, le=20)
-    temperature_c: float = Field(20.0, ge=0, le=60)
-    pressure_bar: float = Field(0.0, ge=0, le=10)
-
-
-class PowerTelemetry(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    total_kw: float = Field(0.0, ge=0)
-    spindle_kw: float = Field(0.0, ge=0)
-    servo_kw: float = Field(0.0, ge=0)
-
-
-class StatusTelemetry(BaseModel):
+class TelemetryBatch(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    mode: Literal["AUTO", "MDI", "JOG", "REF"]
-    program: str
-    block: str
-    cycle_time_s: int = Field(0, ge=0)
+    telemetry: List[Telemetry]
 
 
-class Telemetry(BaseModel):
+class VibrationBlock(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    timestamp: datetime
     machine_id: str
-    spindle: SpindleTelemetry
-    axes: AxesTelemetry
-    tool: ToolTelemetry
-    coolant: CoolantTelemetry
-    power: PowerTelemetry
-    status: StatusTelemetry
+    timestamp: float
+    sample_rate_hz: float = Field(..., gt=0)
+    rpm: float = Field(0.0, ge=0, le=24000)
+    samples: List[float] = Field(..., min_length=256)
 
 
-class TelemetryBatch(BaseModel):
+class VibrationBatch(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    telemetry: List[Telemetry]
+    blocks: List[VibrationBlock]
 
 
 class Anomaly(BaseModel):
@@ -94,7 +39,7 @@ class Anomaly(BaseModel):
     metric: str
     value: float
     severity: Literal["low", "medium", "high"]
-    detector: Literal["zscore", "isolation_forest", "rule"]
+    detector: Literal["zscore", "isolation_forest", "rule", "envelope"]
     reason: str
 
 
@@ -104,3 +49,15 @@ class DetectionResult(BaseModel):
     anomalies: List[Anomaly]
     model_not_ready: bool = False
     processed: int = 0
+
+
+class ShardRing(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    nodes: List[str]
+
+
+class ShardState(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    machines: Dict[str, Dict[str, List[float]]]
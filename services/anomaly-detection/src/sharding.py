@@ -0,0 +1,138 @@
+"""Consistent-hash sharding of machines across anomaly-detection replicas."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import socket
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Posts exported detector state to a peer replica.
+StateTransport = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.md5(key.encode(), usedforsecurity=False).digest()[:8], "big"
+    )
+
+
+class HashRing:
+    """Consistent-hash ring mapping machine ids to replica nodes.
+
+    Each node is placed at ``vnodes`` points on the ring so load spreads
+    evenly; adding or removing one node only moves the machines between it
+    and its neighbours (about 1/N of them). Every replica and client that
+    builds a ring from the same node list routes identically.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64) -> None:
+        if vnodes <= 0:
+            raise ValueError("vnodes must be positive")
+        self.vnodes = vnodes
+        self._nodes: set[str] = set()
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.set_nodes(nodes)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(self._nodes)
+
+    def set_nodes(self, nodes: Iterable[str]) -> None:
+        self._nodes = set(nodes)
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node)
+            for node in self._nodes
+            for replica in range(self.vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, machine_id: str) -> str | None:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(machine_id)) % len(self._points)
+        return self._owners[index]
+
+    def route(
+        self, items: Iterable[T], key: Callable[[T], str]
+    ) -> Dict[str | None, List[T]]:
+        """Group ``items`` by owning node, keeping their order."""
+
+        routed: Dict[str | None, List[T]] = {}
+        for item in items:
+            routed.setdefault(self.owner(key(item)), []).append(item)
+        return routed
+
+
+@dataclass
+class ShardManager:
+    """Own a slice of the fleet and hand rolling state over when the ring changes.
+
+    ``detector`` provides ``machine_ids``, ``export_state``, ``import_state``
+    and ``drop_state``. On a membership change, state for every machine now
+    owned by another node is sent to it with ``transport`` and then dropped
+    locally; a failed transfer keeps the state for the next attempt. With
+    no peers configured, every machine is local.
+    """
+
+    self_node: str
+    detector: Any
+    transport: StateTransport
+    ring: HashRing = field(default_factory=HashRing)
+
+    def is_local(self, machine_id: str) -> bool:
+        owner = self.ring.owner(machine_id)
+        return owner is None or owner == self.self_node
+
+    async def update(self, nodes: Sequence[str]) -> int:
+        """Adopt a new node list; return how many machines were handed off."""
+
+        if set(nodes) != set(self.ring.nodes):
+            self.ring.set_nodes(nodes)
+            logger.info("Shard ring updated: %s", ", ".join(self.ring.nodes))
+        return await self.rebalance()
+
+    async def rebalance(self) -> int:
+        moving = self.ring.route(
+            (m for m in self.detector.machine_ids() if not self.is_local(m)),
+            key=lambda machine_id: machine_id,
+        )
+        results = await asyncio.gather(
+            *(self._hand_off(node, machines) for node, machines in moving.items())
+        )
+        return sum(results)
+
+    async def leave(self) -> int:
+        """Hand every machine to the remaining nodes (e.g. on shutdown)."""
+
+        remaining = [node for node in self.ring.nodes if node != self.self_node]
+        if not remaining:
+            return 0
+        self.ring.set_nodes(remaining)
+        return await self.rebalance()
+
+    async def _hand_off(self, node: str, machine_ids: List[str]) -> int:
+        state = self.detector.export_state(machine_ids)
+        try:
+            await self.transport(node, state)
+        except Exception:
+            logger.exception("State handoff to %s failed", node)
+            return 0
+        self.detector.drop_state(machine_ids)
+        return len(machine_ids)
+
+
+def resolve_peers(service_dns: str, port: int, scheme: str = "http") -> List[str]:
+    """Replica URLs behind a headless service (one A record per pod)."""
+
+    infos = socket.getaddrinfo(service_dns, port, type=socket.SOCK_STREAM)
+    return sorted({f"{scheme}://{info[4][0]}:{port}" for info in infos})
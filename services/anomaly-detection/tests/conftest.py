@@ -12,7 +12,20 @@ for parent in FILE_PATH.parents:
 if ROOT_DIR is None:
     ROOT_DIR = FILE_PATH.parents[2]
 SRC_DIR = FILE_PATH.parents[1] / "src"
-MODULES = ("config", "models", "main", "auth", "detector", "predictor", "cnc_machine")
+SHARED_DIR = ROOT_DIR / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.append(str(SHARED_DIR))
+MODULES = (
+    "config",
+    "models",
+    "main",
+    "auth",
+    "detector",
+    "predictor",
+    "cnc_machine",
+    "spectrum",
+    "sharding",
+)
 
 
 def _remove_src_path() -> None:
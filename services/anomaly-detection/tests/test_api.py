@@ -20,3 +20,163 @@ def test_health():
     # Call handler directly to avoid TestClient hangs in this environment
     result = asyncio.run(main.health())
     assert result["status"] == "ok"
+
+
+def test_detect_vibration_groups_blocks_and_flags_defects():
+    import main
+    import numpy as np
+    from models import VibrationBatch
+
+    rng = np.random.default_rng(7)
+    t = np.arange(4096) / 10_000.0
+    bpfo_hz = 6000.0 / 60.0 * main._detector._envelope.orders["BPFO"]
+    faulty = 2.0 * np.exp(-np.mod(t, 1.0 / bpfo_hz) / 0.001)
+    faulty *= np.sin(2.0 * np.pi * 3000.0 * t)
+    blocks = [
+        {
+            "machine_id": machine_id,
+            "timestamp": 0.0,
+            "sample_rate_hz": rate,
+            "rpm": 6000.0,
+            "samples": (rng.standard_normal(size) * 0.3 + signal[:size]).tolist(),
+        }
+        for machine_id, rate, size, signal in (
+            ("CNC-001", 10_000.0, 4096, np.zeros(4096)),
+            ("CNC-002", 10_000.0, 4096, faulty),
+            ("CNC-003", 20_000.0, 2048, np.zeros(4096)),
+        )
+    ]
+
+    result = asyncio.run(
+        main.detect_vibration(VibrationBatch.model_validate({"blocks": blocks}))
+    )
+
+    assert result.processed == 3
+    assert {a.machine_id for a in result.anomalies} == {"CNC-002"}
+
+
+def test_detect_forwards_samples_to_their_shard_owner(monkeypatch):
+    import main
+    from config import ShardConfig
+    from dt_shared.telemetry import decode_binary_rows
+    from fastapi import HTTPException
+    from models import ShardRing, TelemetryBatch
+
+    def sample(machine_id):
+        return {
+            "timestamp": "2026-02-04T06:40:00Z",
+            "machine_id": machine_id,
+            "spindle": {"rpm": 8000, "temperature_c": 75.0},
+            "axes": {"x": {}, "y": {}, "z": {}},
+            "tool": {"id": "T1", "type": "end_mill", "diameter_mm": 10},
+            "coolant": {"flow_rate_lpm": 8.0},
+            "power": {},
+            "status": {"mode": "AUTO", "program": "O1", "block": "N10"},
+        }
+
+    posts = []
+
+    async def fake_post(url, payload, headers=None):
+        posts.append((url, payload, headers))
+        return {"anomalies": []}
+
+    monkeypatch.setattr(main, "_post", fake_post)
+    monkeypatch.setattr(main, "_shard_config", ShardConfig(admin_token="secret"))
+    main._shard.self_node = "http://a:8000"
+    machines = [f"CNC-{index:03d}" for index in range(20)]
+    batch = TelemetryBatch.model_validate({"telemetry": [sample(m) for m in machines]})
+    asyncio.run(main.detect(batch))
+
+    ring = ShardRing(nodes=["http://a:8000", "http://b:8000"])
+    with pytest.raises(HTTPException) as denied:
+        asyncio.run(main.update_shard_ring(ring, x_admin_token="wrong"))
+    assert denied.value.status_code == 401
+    assert posts == []
+
+    result = asyncio.run(main.update_shard_ring(ring, x_admin_token="secret"))
+    moved = {m for m in machines if main._shard.ring.owner(m) == "http://b:8000"}
+    assert result["handed_off"] == len(moved) > 0
+    assert posts[0][0] == "http://b:8000/shard/state"
+    assert set(posts[0][1]["machines"]) == moved
+    assert posts[0][2] == {"x-admin-token": "secret"}
+
+    result = asyncio.run(main.detect(batch))
+
+    url, payload, headers = posts[1]
+    # Peers receive the owned samples as one binary batch.
+    assert url == "http://b:8000/detect/binary"
+    assert headers == {main.SHARD_FORWARDED_HEADER: "1"}
+    assert {row[1] for row in decode_binary_rows(payload)} == moved
+    assert result.processed == len(machines)
+    # Rule anomalies (high temperature) come only from locally owned machines.
+    assert {a.machine_id for a in result.anomalies} == set(machines) - moved
+
+
+def test_detect_binary_accepts_shared_encoding():
+    import httpx
+    import main
+    from dt_shared.telemetry import BINARY_CONTENT_TYPE, Telemetry, encode_binary
+
+    hot = Telemetry.example().model_copy(deep=True)
+    hot.spindle.temperature_c = 95.0
+    body = encode_binary([Telemetry.example(), hot])
+
+    async def post(content, headers=None):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post(
+                "/detect/binary",
+                content=content,
+                headers={"content-type": BINARY_CONTENT_TYPE, **(headers or {})},
+            )
+
+    response = asyncio.run(post(body))
+    assert response.status_code == 200
+    result = response.json()
+    assert result["processed"] == 2
+    assert [a["metric"] for a in result["anomalies"]] == ["spindle.temperature_c"]
+
+    forwarded = asyncio.run(post(body, {main.SHARD_FORWARDED_HEADER: "1"}))
+    assert forwarded.json()["processed"] == 2
+    assert asyncio.run(post(body[:-3])).status_code == 422
+
+
+def test_shard_state_import_requires_the_shard_token():
+    import httpx
+    import main
+
+    state = {"machines": {"CNC-001": {"spindle.temperature_c": [70.0]}}}
+
+    async def post(headers):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post("/shard/state", json=state, headers=headers)
+
+    # No ANOMALY_SHARD_TOKEN is configured, so every request is rejected.
+    assert asyncio.run(post({})).status_code == 401
+    assert asyncio.run(post({"x-admin-token": ""})).status_code == 401
+    assert "CNC-001" not in main._detector.machine_ids()
+
+
+def test_detect_rejects_samples_missing_tool_or_status_fields():
+    import httpx
+    import main
+    from dt_shared.telemetry import Telemetry
+
+    sample = Telemetry.example().model_dump(mode="json")
+    del sample["tool"]["id"]
+
+    async def post(payload):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post("/detect", json={"telemetry": [payload]})
+
+    response = asyncio.run(post(sample))
+    assert response.status_code == 422
+    assert ["body", "telemetry", 0, "tool", "id"] in [
+        error["loc"] for error in response.json()["detail"]
+    ]
+
+    sample = Telemetry.example().model_dump(mode="json")
+    del sample["status"]["program"]
+    assert asyncio.run(post(sample)).status_code == 422
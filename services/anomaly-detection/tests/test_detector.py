@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 
@@ -40,3 +41,57 @@ def test_rule_based_detection():
     metrics = {anomaly.metric for anomaly in anomalies}
     assert "spindle.temperature_c" in metrics
     assert "tool.wear_percent" in metrics
+
+
+def _bearing_blocks(rpm, severities, seed=0, sample_rate_hz=10_000.0, size=4096):
+    """Noise plus 3 kHz ringing impacts repeating at each block's BPFO."""
+
+    from spectrum import bearing_orders
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(size) / sample_rate_hz
+    bpfo_hz = rpm[:, None] / 60.0 * bearing_orders(8.0, 40.0, 15.0, 8)["BPFO"]
+    # A stopped spindle (rpm 0) produces no impacts.
+    running = bpfo_hz > 0
+    period = 1.0 / np.where(running, bpfo_hz, 1.0)
+    impacts = np.where(running, np.exp(-np.mod(t, period) / 0.001), 0.0)
+    ringing = np.sin(2.0 * np.pi * 3000.0 * t)
+    noise = rng.standard_normal((len(rpm), size)) * 0.3
+    return noise + severities[:, None] * 4.0 * impacts * ringing
+
+
+def test_envelope_detection_flags_bpfo_only_on_defective_bearings():
+    from detector import Detector
+
+    det = Detector()
+    rpm = np.array([6000.0, 12000.0, 9000.0, 0.0])
+    blocks = _bearing_blocks(rpm, np.array([0.0, 0.0, 0.5, 0.5]))
+
+    anomalies = det.detect_bearing_defects(
+        ["CNC-001", "CNC-002", "CNC-003", "CNC-004"], blocks, 10_000.0, rpm
+    )
+
+    flagged = {(a.machine_id, a.metric) for a in anomalies}
+    assert ("CNC-003", "spindle.bearing.bpfo") in flagged
+    assert {machine for machine, _ in flagged} == {"CNC-003"}
+    assert all(a.detector == "envelope" for a in anomalies)
+
+
+def test_zscore_state_hands_off_between_detectors():
+    from config import DetectorConfig
+    from detector import Detector
+
+    config = DetectorConfig(window_size=10, zscore_threshold=2.0)
+    old_owner, new_owner = Detector(config=config), Detector(config=config)
+    for _ in range(9):
+        old_owner.detect_zscore("spindle.temperature_c", 40.0, "CNC-001")
+    old_owner.detect_zscore("spindle.temperature_c", 40.0, "CNC-002")
+
+    new_owner.import_state(old_owner.export_state(["CNC-001"]))
+    old_owner.drop_state(["CNC-001"])
+
+    assert old_owner.machine_ids() == ["CNC-002"]
+    assert new_owner.machine_ids() == ["CNC-001"]
+    # The moved baseline is complete: the next outlier is caught immediately.
+    assert new_owner.detect_zscore("spindle.temperature_c", 100.0, "CNC-001")
+    assert not new_owner.detect_zscore("spindle.temperature_c", 100.0, "CNC-002")
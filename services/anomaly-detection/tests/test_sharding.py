@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+
+MACHINES = [f"CNC-{index:04d}" for index in range(2000)]
+
+
+def test_ring_balances_and_moves_few_machines_on_scale_out():
+    from sharding import HashRing
+
+    nodes = [f"http://10.0.0.{index}:8000" for index in range(1, 5)]
+    ring = HashRing(nodes)
+    before = {machine: ring.owner(machine) for machine in MACHINES}
+    counts = [list(before.values()).count(node) for node in nodes]
+    assert min(counts) > 0.6 * len(MACHINES) / len(nodes)
+
+    ring.set_nodes(nodes + ["http://10.0.0.5:8000"])
+    moved = [m for m in MACHINES if ring.owner(m) != before[m]]
+
+    # Only machines taken over by the new node move (about 1/5 of them).
+    assert {ring.owner(m) for m in moved} == {"http://10.0.0.5:8000"}
+    assert len(moved) < 0.3 * len(MACHINES)
+    assert HashRing(reversed(nodes)).owner("CNC-0001") == before["CNC-0001"]
+
+
+def test_shard_manager_hands_off_moved_machines():
+    from config import DetectorConfig
+    from detector import Detector
+    from sharding import ShardManager
+
+    detector = Detector(config=DetectorConfig(window_size=10))
+    for machine in MACHINES[:50]:
+        detector.detect_zscore("spindle.temperature_c", 40.0, machine)
+    sent = {}
+    failing = {"http://b:8000"}
+
+    async def transport(node, state):
+        if node in failing:
+            raise ConnectionError(node)
+        sent.setdefault(node, {}).update(state)
+
+    manager = ShardManager("http://a:8000", detector, transport)
+    assert manager.is_local("CNC-0001")
+
+    asyncio.run(manager.update(["http://a:8000", "http://b:8000"]))
+    # A failed transfer keeps the state so a later rebalance can retry it.
+    assert len(detector.machine_ids()) == 50
+    failing.clear()
+    handed_off = asyncio.run(manager.rebalance())
+
+    assert handed_off == len(sent["http://b:8000"]) > 0
+    assert all(manager.is_local(m) for m in detector.machine_ids())
+    assert all(not manager.is_local(m) for m in sent["http://b:8000"])
+
+    asyncio.run(manager.leave())
+    assert detector.machine_ids() == []
+    assert len(sent["http://b:8000"]) == 50
@@ -5,53 +5,49 @@ from __future__ import annotations
 from collections import defaultdict
 from datetime import datetime
 
+from dt_shared.profiling import Stopwatch, stage_timer
+from dt_shared.rollup import rollup
 from models import AggregateBucket, MetricPoint, Window
 
-_WINDOW_TO_SECONDS = {
-    "1min": 60,
-    "5min": 300,
-    "1hour": 3600,
-}
+_BUCKET = stage_timer("aggregator.bucket")
+_SUMMARIZE = stage_timer("aggregator.summarize")
+_SORT = stage_timer("aggregator.sort")
 
 
 class DataAggregator:
-    """Build fixed-window rollups from metric points."""
+    """Build fixed-window rollups from metric points.
+
+    The per-series math lives in ``dt_shared.rollup`` so digital-twin-api can
+    roll up a machine's history in-process with identical buckets. A window
+    listed more than once is rolled up once.
+    """
 
     def aggregate(
         self, points: list[MetricPoint], windows: list[Window]
     ) -> list[AggregateBucket]:
-        grouped: dict[tuple[str, str, Window, datetime], list[float]] = defaultdict(
-            list
-        )
-
+        watch = Stopwatch()
+        series: dict[tuple[str, str], list[tuple[datetime, float]]] = defaultdict(list)
         for point in points:
-            for window in windows:
-                bucket_start = self._bucket_start(point.timestamp, window)
-                grouped[(point.machine_id, point.metric, window, bucket_start)].append(
-                    point.value
-                )
+            series[(point.machine_id, point.metric)].append(
+                (point.timestamp, point.value)
+            )
+        watch.lap(_BUCKET)
 
         buckets: list[AggregateBucket] = []
-        for (machine_id, metric, window, bucket_start), values in grouped.items():
-            buckets.append(
-                AggregateBucket(
-                    machine_id=machine_id,
-                    metric=metric,
-                    window=window,
-                    bucket_start=bucket_start,
-                    count=len(values),
-                    min_value=min(values),
-                    max_value=max(values),
-                    avg_value=sum(values) / len(values),
+        unique_windows = list(dict.fromkeys(windows))
+        for (machine_id, metric), samples in series.items():
+            for window in unique_windows:
+                buckets.extend(
+                    AggregateBucket(
+                        machine_id=machine_id,
+                        metric=metric,
+                        window=window,
+                        **summary._asdict(),
+                    )
+                    for summary in rollup(samples, window)
                 )
-            )
+        watch.lap(_SUMMARIZE)
 
         buckets.sort(key=lambda b: (b.machine_id, b.metric, b.window, b.bucket_start))
+        watch.lap(_SORT)
         return buckets
-
-    @staticmethod
-    def _bucket_start(timestamp: datetime, window: Window) -> datetime:
-        bucket_seconds = _WINDOW_TO_SECONDS[window]
-        ts_seconds = int(timestamp.timestamp())
-        floored = ts_seconds - (ts_seconds % bucket_seconds)
-        return datetime.fromtimestamp(floored, tz=timestamp.tzinfo)
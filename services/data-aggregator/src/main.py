@@ -4,10 +4,13 @@ from __future__ import annotations
 
 from aggregator import DataAggregator
 from config import AggregatorConfig
+from dt_shared.instrumentation import Instrumentation
 from fastapi import FastAPI
 from models import AggregateRequest, AggregateResponse
 
 app = FastAPI(title="Data Aggregator Service", version="0.1.0")
+instrumentation = Instrumentation()
+instrumentation.instrument_app(app)
 
 _config = AggregatorConfig()
 _aggregator = DataAggregator()
@@ -12,6 +12,9 @@ for parent in FILE_PATH.parents:
 if ROOT_DIR is None:
     ROOT_DIR = FILE_PATH.parents[2]
 SRC_DIR = FILE_PATH.parents[1] / "src"
+SHARED_DIR = ROOT_DIR / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.append(str(SHARED_DIR))
 MODULES = ("config", "models", "main", "aggregator")
 
 
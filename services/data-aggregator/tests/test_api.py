@@ -43,3 +43,22 @@ def test_aggregate_rollup():
     assert bucket.min_value == 40.0
     assert bucket.max_value == 50.0
     assert bucket.avg_value == 45.0
+
+
+def test_aggregate_rolls_up_repeated_windows_once():
+    from main import aggregate
+    from models import AggregateRequest, MetricPoint
+
+    point = MetricPoint(
+        machine_id="CNC-001",
+        metric="spindle.temperature_c",
+        timestamp=datetime(2026, 2, 4, 10, 0, 5, tzinfo=timezone.utc),
+        value=40.0,
+    )
+    req = AggregateRequest(points=[point], windows=["1min", "5min", "1min"])
+
+    response = asyncio.run(aggregate(req))
+    assert [(b.window, b.count) for b in response.buckets] == [
+        ("1min", 1),
+        ("5min", 1),
+    ]
@@ -22,3 +22,26 @@ class ApiConfig:
     )
     service_timeout_s: float = float(os.getenv("SERVICE_TIMEOUT_S", "3"))
     critical_spindle_temp_c: float = float(os.getenv("CRITICAL_SPINDLE_TEMP_C", "90"))
+    anomaly_detection_url: str = os.getenv("ANOMALY_DETECTION_URL", "")
+    predictive_maintenance_url: str = os.getenv("PREDICTIVE_MAINTENANCE_URL", "")
+    mqtt_bridge_enabled: bool = os.getenv("MQTT_BRIDGE_ENABLED", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    mqtt_broker: str = os.getenv("MQTT_BROKER", "localhost")
+    mqtt_port: int = int(os.getenv("MQTT_PORT", "1883"))
+    mqtt_bridge_workers: int = int(os.getenv("MQTT_BRIDGE_WORKERS", "4"))
+    mqtt_bridge_batch_size: int = int(os.getenv("MQTT_BRIDGE_BATCH_SIZE", "500"))
+    mqtt_bridge_batch_max_delay_s: float = float(
+        os.getenv("MQTT_BRIDGE_BATCH_MAX_DELAY_S", "0.2")
+    )
+    mqtt_bridge_queue_size: int = int(os.getenv("MQTT_BRIDGE_QUEUE_SIZE", "10000"))
+    # Columns for numeric telemetry paths outside the shared schema; further
+    # new paths are dropped.
+    metric_extra_columns: int = int(os.getenv("METRIC_EXTRA_COLUMNS", "32"))
+    store_backend: str = os.getenv("STORE_BACKEND", "memory")
+    shm_store_name: str = os.getenv("SHM_STORE_NAME", "dt-telemetry")
+    shm_store_max_machines: int = int(os.getenv("SHM_STORE_MAX_MACHINES", "128"))
+    shm_store_history: int = int(os.getenv("SHM_STORE_HISTORY", "200"))
+    shm_store_record_bytes: int = int(os.getenv("SHM_STORE_RECORD_BYTES", "1536"))
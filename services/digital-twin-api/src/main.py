@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List
 
 import httpx
 from auth import verify_api_key
 from config import ApiConfig
-from fastapi import FastAPI, Header, HTTPException, WebSocket
+from dt_shared.instrumentation import Instrumentation
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket
+from fastapi.responses import JSONResponse
+from metric_columns import METRICS, FlatSample, MetricFrame, rollup_frames
 from models import (
     AggregateRequest,
     AlertRequest,
@@ -17,6 +22,7 @@ from models import (
     CommandRequest,
     ErrorDetail,
     ErrorResponse,
+    FleetAggregateRequest,
     Machine,
     MachineStatus,
     PredictionRecord,
@@ -24,16 +30,73 @@ from models import (
     SuccessResponse,
     Telemetry,
 )
+from mqtt_bridge import (
+    BatchSink,
+    MQTTBridge,
+    anomaly_detection_sink,
+    predictive_maintenance_sink,
+)
 from rate_limit import TokenBucket
 from service_client import ServiceClient
+from shm_store import SharedMemoryStore, ShmReadError
 from store import InMemoryStore
 
-app = FastAPI(title="Digital Twin API", version="0.1.0")
 
-store = InMemoryStore()
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    global mqtt_bridge
+    # With a shared store, one worker ingests MQTT on behalf of all of them.
+    shared = isinstance(store, SharedMemoryStore)
+    if config.mqtt_bridge_enabled and (not shared or store.try_lead()):
+        mqtt_bridge = _create_mqtt_bridge(asyncio.get_running_loop())
+        mqtt_bridge.start()
+    try:
+        yield
+    finally:
+        if mqtt_bridge is not None:
+            mqtt_bridge.stop()
+            mqtt_bridge = None
+        if shared:
+            store.close()
+
+
+def _create_store(config: ApiConfig) -> InMemoryStore:
+    if config.store_backend == "shm":
+        return SharedMemoryStore(
+            name=config.shm_store_name,
+            max_machines=config.shm_store_max_machines,
+            history_size=config.shm_store_history,
+            record_bytes=config.shm_store_record_bytes,
+        )
+    if config.store_backend != "memory":
+        raise ValueError(f"unknown STORE_BACKEND {config.store_backend!r}")
+    return InMemoryStore()
+
+
+app = FastAPI(title="Digital Twin API", version="0.1.0", lifespan=lifespan)
+
 rate_limiters: Dict[str, TokenBucket] = {}
 config = ApiConfig()
-service_client = ServiceClient(config=config)
+store = _create_store(config)
+instrumentation = Instrumentation()
+instrumentation.instrument_app(app)
+service_client = ServiceClient(config=config, instrumentation=instrumentation)
+_SPINDLE_TEMPERATURE = METRICS.column("spindle.temperature_c")
+mqtt_bridge: MQTTBridge | None = None
+instrumentation.track_size("machines", lambda: len(store.list_machines()))
+instrumentation.track_size("telemetry", lambda: store.telemetry_count())
+instrumentation.track_size("metric_columns", lambda: len(METRICS))
+instrumentation.track_size("metric_columns_dropped", lambda: METRICS.dropped)
+instrumentation.track_size(
+    "mqtt_bridge_queue", lambda: mqtt_bridge.stats()["queued"] if mqtt_bridge else 0
+)
+
+
+@app.exception_handler(ShmReadError)
+async def shm_read_error(request: Request, exc: ShmReadError) -> JSONResponse:
+    # A worker died mid-write; the next write to that machine repairs it.
+    body = ErrorResponse(error=ErrorDetail(code="store_unavailable", message=str(exc)))
+    return JSONResponse(status_code=503, content=body.model_dump())
 
 
 def _require_key(x_api_key: str | None) -> str:
@@ -43,8 +106,9 @@ def _require_key(x_api_key: str | None) -> str:
 
 
 def _rate_limit(key: str) -> None:
+    limit = config.rate_limit_per_min
     bucket = rate_limiters.setdefault(
-        key, TokenBucket(capacity=100, refill_per_sec=100 / 60)
+        key, TokenBucket(capacity=limit, refill_per_sec=limit / 60)
     )
     if not bucket.allow():
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
@@ -115,10 +179,15 @@ async def ingest_telemetry(
     _rate_limit(key)
     if telemetry.machine_id != machine_id:
         raise HTTPException(status_code=400, detail="Machine ID mismatch")
-    if not store.get_machine(machine_id):
-        store.add_machine(Machine(id=machine_id, name=machine_id, location="demo"))
-    store.add_telemetry(telemetry)
-    await _dispatch_telemetry_alerts(telemetry)
+    try:
+        if not store.get_machine(machine_id):
+            store.add_machine(Machine(id=machine_id, name=machine_id, location="demo"))
+        flat = METRICS.flatten(telemetry.data)
+        store.add_telemetry(telemetry, flat=flat)
+    except ValueError as exc:
+        # Shared-memory records and machine slots have a fixed size.
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    await _dispatch_telemetry_alerts(telemetry, flat)
     return _success(telemetry)
 
 
@@ -185,16 +254,40 @@ async def aggregate_machine(
 ) -> SuccessResponse:
     key = _require_key(x_api_key)
     _rate_limit(key)
-    history = store.history(machine_id)
+    windows = _normalize_windows(req)
+    if req.mode == "local":
+        frame = store.metric_frame(machine_id, [METRICS.get(req.metric)])
+        return _success(_local_rollup(machine_id, req.metric, frame, windows))
+    points = store.metric_series(machine_id, req.metric)
     payload = await service_client.aggregate(
-        machine_id=machine_id,
-        points=history,
-        metric=req.metric,
-        windows=_normalize_windows(req),
+        machine_id=machine_id, points=points, metric=req.metric, windows=windows
     )
     return _success(payload)
 
 
+@app.post("/fleet/aggregate")
+async def aggregate_fleet(
+    req: FleetAggregateRequest, x_api_key: str | None = Header(default=None)
+) -> SuccessResponse:
+    key = _require_key(x_api_key)
+    _rate_limit(key)
+    machines = _select_machines(req)
+    columns = [METRICS.get(metric) for metric in req.metrics]
+    frames = [store.metric_frame(machine.id, columns) for machine in machines]
+    return _success(_fleet_rollup(machines, req.metrics, frames, req.windows))
+
+
+@app.get("/ingest/mqtt/stats")
+async def mqtt_ingest_stats(
+    x_api_key: str | None = Header(default=None),
+) -> SuccessResponse:
+    key = _require_key(x_api_key)
+    _rate_limit(key)
+    if mqtt_bridge is None:
+        return _success({"enabled": False})
+    return _success({"enabled": True, **mqtt_bridge.stats()})
+
+
 @app.websocket("/ws/machines/{machine_id}/telemetry")
 async def telemetry_ws(websocket: WebSocket, machine_id: str) -> None:
     await websocket.accept()
@@ -204,12 +297,12 @@ async def telemetry_ws(websocket: WebSocket, machine_id: str) -> None:
     await websocket.close()
 
 
-async def _dispatch_telemetry_alerts(telemetry: Telemetry) -> None:
-    spindle = telemetry.data.get("spindle", {})
-    temperature = spindle.get("temperature_c")
-    if not isinstance(temperature, (int, float)):
+async def _dispatch_telemetry_alerts(telemetry: Telemetry, flat: FlatSample) -> None:
+    columns, values = flat
+    if _SPINDLE_TEMPERATURE not in columns:
         return
-    if float(temperature) < config.critical_spindle_temp_c:
+    temperature = values[columns.index(_SPINDLE_TEMPERATURE)]
+    if temperature < config.critical_spindle_temp_c:
         return
 
     try:
@@ -218,7 +311,7 @@ async def _dispatch_telemetry_alerts(telemetry: Telemetry) -> None:
             severity="critical",
             message="Spindle temperature crossed critical threshold",
             metric="spindle.temperature_c",
-            value=float(temperature),
+            value=temperature,
             source="digital-twin-api",
         )
     except httpx.HTTPError:
@@ -226,6 +319,146 @@ async def _dispatch_telemetry_alerts(telemetry: Telemetry) -> None:
         pass
 
 
+def _create_mqtt_bridge(loop: asyncio.AbstractEventLoop) -> MQTTBridge:
+    sinks: List[BatchSink] = [_alert_sink(loop)]
+    if config.anomaly_detection_url:
+        sinks.append(
+            anomaly_detection_sink(
+                config.anomaly_detection_url,
+                timeout_s=config.service_timeout_s,
+                instrumentation=instrumentation,
+            )
+        )
+    if config.predictive_maintenance_url:
+        sinks.append(
+            predictive_maintenance_sink(
+                config.predictive_maintenance_url,
+                timeout_s=config.service_timeout_s,
+                instrumentation=instrumentation,
+            )
+        )
+    return MQTTBridge(
+        store=store,
+        sinks=sinks,
+        broker_host=config.mqtt_broker,
+        broker_port=config.mqtt_port,
+        workers=config.mqtt_bridge_workers,
+        batch_size=config.mqtt_bridge_batch_size,
+        batch_max_delay_s=config.mqtt_bridge_batch_max_delay_s,
+        queue_size=config.mqtt_bridge_queue_size,
+    )
+
+
+def _alert_sink(loop: asyncio.AbstractEventLoop) -> BatchSink:
+    """Raise the same critical-temperature alerts as HTTP ingestion."""
+
+    def check(batch: List[Dict[str, Any]]) -> None:
+        for sample in batch:
+            temperature = sample.get("spindle", {}).get("temperature_c")
+            if not isinstance(temperature, (int, float)):
+                continue
+            if float(temperature) < config.critical_spindle_temp_c:
+                continue
+            telemetry = Telemetry(
+                timestamp=sample["timestamp"],
+                machine_id=sample["machine_id"],
+                data={"spindle": sample["spindle"]},
+            )
+            flat = ([_SPINDLE_TEMPERATURE], [float(temperature)])
+            asyncio.run_coroutine_threadsafe(
+                _dispatch_telemetry_alerts(telemetry, flat), loop
+            )
+
+    return check
+
+
+def _local_rollup(
+    machine_id: str, metric: str, frame: MetricFrame, windows: List[str]
+) -> Dict[str, Any]:
+    """Same response shape as data-aggregator's ``POST /aggregate``.
+
+    ``frame`` is the metric's column slice, rolled up without building
+    per-sample points; bucket starts are UTC.
+    """
+
+    buckets: List[Dict[str, Any]] = []
+    for window in sorted(set(windows)):
+        result = rollup_frames([frame], 1, window)
+        for start, count, low, high, total in zip(
+            result.bucket_start.tolist(),
+            result.count[:, 0].tolist(),
+            result.min_value[:, 0].tolist(),
+            result.max_value[:, 0].tolist(),
+            result.total[:, 0].tolist(),
+        ):
+            buckets.append(
+                {
+                    "machine_id": machine_id,
+                    "metric": metric,
+                    "window": window,
+                    "bucket_start": datetime.fromtimestamp(start, tz=timezone.utc),
+                    "count": count,
+                    "min_value": low,
+                    "max_value": high,
+                    "avg_value": total / count,
+                }
+            )
+    return {"buckets": buckets}
+
+
+def _select_machines(req: FleetAggregateRequest) -> List[Machine]:
+    ids, locations, models = set(req.machine_ids), set(req.locations), set(req.models)
+    return sorted(
+        (
+            machine
+            for machine in store.list_machines()
+            if (not ids or machine.id in ids)
+            and (not locations or machine.location in locations)
+            and (not models or machine.model in models)
+        ),
+        key=lambda machine: machine.id,
+    )
+
+
+def _fleet_rollup(
+    machines: List[Machine],
+    metrics: List[str],
+    frames: List[MetricFrame],
+    windows: List[str],
+) -> Dict[str, Any]:
+    """Columnar buckets: row ``i`` of every list describes the same bucket.
+
+    ``metrics[name]`` holds that metric's summaries per row; ``count`` is 0
+    and the values are ``None`` where it had no samples in the bucket.
+    """
+
+    columns: Dict[str, List[Any]] = {"machine_id": [], "window": [], "bucket_start": []}
+    summaries = {
+        metric: {"count": [], "min_value": [], "max_value": [], "avg_value": []}
+        for metric in metrics
+    }
+    for window in sorted(set(windows)):
+        result = rollup_frames(frames, len(metrics), window)
+        columns["machine_id"].extend(machines[i].id for i in result.owner.tolist())
+        columns["window"].extend([window] * len(result.owner))
+        columns["bucket_start"].extend(
+            datetime.fromtimestamp(start, tz=timezone.utc)
+            for start in result.bucket_start.tolist()
+        )
+        counts = result.count.T.tolist()
+        lows, highs = result.min_value.T.tolist(), result.max_value.T.tolist()
+        totals = result.total.T.tolist()
+        for j, metric in enumerate(metrics):
+            summary = summaries[metric]
+            summary["count"].extend(counts[j])
+            for name, row in (("min_value", lows[j]), ("max_value", highs[j])):
+                summary[name].extend(v if n else None for n, v in zip(counts[j], row))
+            summary["avg_value"].extend(
+                t / n if n else None for n, t in zip(counts[j], totals[j])
+            )
+    return {**columns, "metrics": summaries}
+
+
 def _normalize_severity(severity: str) -> str:
     if severity == "warning":
         return "medium"
@@ -0,0 +1,286 @@
+"""Flattened numeric telemetry: dotted metric paths interned to column ids."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from config import ApiConfig
+from dt_shared.rollup import WINDOW_SECONDS, Window
+from dt_shared.telemetry import TELEMETRY_ROW_FIELDS
+
+# Numeric fields of the shared schema get the first, fixed column ids.
+SCHEMA_METRICS: Tuple[str, ...] = tuple(
+    name
+    for name in TELEMETRY_ROW_FIELDS
+    if name
+    not in (
+        "timestamp",
+        "machine_id",
+        "tool.id",
+        "tool.type",
+        "status.mode",
+        "status.program",
+        "status.block",
+    )
+)
+
+# Parallel lists of column ids and values of one sample.
+FlatSample = Tuple[List[int], List[float]]
+# Epoch seconds (n,) and values (n, k) of k metrics, oldest sample first.
+MetricFrame = Tuple[np.ndarray, np.ndarray]
+
+
+class _Node:
+    __slots__ = ("path", "children", "column")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.children: Dict[str, _Node] = {}
+        self.column: int | None = None
+
+
+class MetricIndex:
+    """Intern dotted metric paths (``spindle.temperature_c``) to column ids.
+
+    Paths are kept as a trie over the nested keys, so ``flatten`` walks a
+    sample's dicts once and reaches each numeric leaf's column without
+    building a path string. Paths outside the schema get new columns the
+    first time they are seen, up to ``extra`` of them; leaves past that
+    limit are dropped and counted in ``dropped``. Ids never change, and a
+    dotted key (``{"spindle.rpm": 1}``) shares the column of the nested one.
+    """
+
+    def __init__(self, paths: Iterable[str] = SCHEMA_METRICS, extra: int = 32) -> None:
+        self._root = _Node("")
+        self._columns: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        paths = tuple(paths)
+        self.limit = len(paths) + extra
+        for path in paths:
+            self._intern(path)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def get(self, path: str) -> int | None:
+        return self._columns.get(path)
+
+    def column(self, path: str) -> int | None:
+        """Column id of ``path``, assigning the next free one if it is new.
+
+        Returns ``None`` (and counts a drop) once the index is full.
+        """
+
+        column = self._columns.get(path)
+        if column is not None:
+            return column
+        with self._lock:
+            if len(self._columns) >= self.limit:
+                self.dropped += 1
+                return None
+        return self._intern(path)
+
+    def flatten(self, data: Dict[str, Any]) -> FlatSample:
+        """Column ids and float values of every numeric leaf of ``data``."""
+
+        columns: List[int] = []
+        values: List[float] = []
+        self._walk(self._root, data, columns, values)
+        return columns, values
+
+    def _walk(
+        self,
+        node: _Node,
+        data: Dict[str, Any],
+        columns: List[int],
+        values: List[float],
+    ) -> None:
+        for key, value in data.items():
+            child = node.children.get(key)
+            if child is None:
+                # Unseen key: nodes are only created for leaves given a column.
+                path = f"{node.path}.{key}" if node.path else key
+                self._walk_new(path, value, columns, values)
+            elif isinstance(value, dict):
+                self._walk(child, value, columns, values)
+            elif isinstance(value, (int, float)):
+                column = child.column
+                if column is None:
+                    column = self._assign(child)
+                    if column is None:
+                        continue
+                columns.append(column)
+                values.append(float(value))
+
+    def _walk_new(
+        self, path: str, value: Any, columns: List[int], values: List[float]
+    ) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                self._walk_new(f"{path}.{key}", item, columns, values)
+        elif isinstance(value, (int, float)):
+            column = self.column(path)
+            if column is not None:
+                columns.append(column)
+                values.append(float(value))
+
+    def _intern(self, path: str) -> int | None:
+        node = self._root
+        for part in path.split("."):
+            node = self._child(node, part)
+        return self._assign(node)
+
+    def _child(self, node: _Node, key: str) -> _Node:
+        path = f"{node.path}.{key}" if node.path else key
+        with self._lock:
+            return node.children.setdefault(key, _Node(path))
+
+    def _assign(self, node: _Node) -> int | None:
+        with self._lock:
+            if node.column is None:
+                if len(self._columns) >= self.limit:
+                    self.dropped += 1
+                    return None
+                node.column = len(self._columns)
+                self._columns[node.path] = node.column
+            return node.column
+
+
+METRICS = MetricIndex(extra=ApiConfig().metric_extra_columns)
+
+
+class MetricRing:
+    """Last ``size`` flattened samples of one machine as a float matrix.
+
+    Row ``i`` holds one sample with NaN for metrics it did not report;
+    columns grow when the index gains metrics. ``series`` returns one
+    metric's points as a column slice.
+    """
+
+    def __init__(self, size: int, columns: int) -> None:
+        self.size = size
+        self.values = np.full((size, columns), np.nan)
+        self.seconds = np.full(size, np.nan)
+        self.timestamps: List[datetime | None] = [None] * size
+        self.head = 0
+
+    def append(self, timestamp: datetime, sample: FlatSample) -> None:
+        columns, values = sample
+        if columns and max(columns) >= self.values.shape[1]:
+            width = max(max(columns) + 1, len(METRICS))
+            grown = np.full((self.size, width), np.nan)
+            grown[:, : self.values.shape[1]] = self.values
+            self.values = grown
+        row = self.head % self.size
+        self.values[row] = np.nan
+        self.values[row, columns] = values
+        self.timestamps[row] = timestamp
+        self.seconds[row] = timestamp.timestamp()
+        self.head += 1
+
+    def frame(self, columns: Sequence[int | None]) -> MetricFrame:
+        """Held samples of ``columns``; unknown (``None``) columns are all NaN."""
+
+        order = self._order()
+        values = np.full((len(order), len(columns)), np.nan)
+        width = self.values.shape[1]
+        known = [j for j, c in enumerate(columns) if c is not None and c < width]
+        if known:
+            picked = [columns[j] for j in known]
+            values[:, known] = self.values[np.ix_(order, picked)]
+        return self.seconds[order], values
+
+    def series(self, column: int) -> List[Tuple[datetime, float]]:
+        """``(timestamp, value)`` of every held sample reporting ``column``."""
+
+        if column >= self.values.shape[1]:
+            return []
+        order = self._order()
+        values = self.values[order, column]
+        present = np.flatnonzero(~np.isnan(values))
+        rows = order[present].tolist()
+        timestamps = self.timestamps
+        return [
+            (timestamps[row], value)
+            for row, value in zip(rows, values[present].tolist())
+        ]
+
+    def _order(self) -> np.ndarray:
+        count = min(self.head, self.size)
+        return np.arange(self.head - count, self.head) % self.size
+
+
+def empty_frame(metrics: int) -> MetricFrame:
+    return np.empty(0), np.empty((0, metrics))
+
+
+class FrameRollup(NamedTuple):
+    """Buckets of a ``rollup_frames`` call as parallel arrays.
+
+    Row ``i`` is bucket ``bucket_start[i]`` of frame ``owner[i]``; the
+    ``(buckets, k)`` matrices hold one column per metric, with ``count`` 0
+    where a metric has no samples in that bucket.
+    """
+
+    owner: np.ndarray
+    bucket_start: np.ndarray
+    count: np.ndarray
+    min_value: np.ndarray
+    max_value: np.ndarray
+    total: np.ndarray
+
+
+def rollup_frames(
+    frames: Sequence[MetricFrame], metrics: int, window: Window
+) -> FrameRollup:
+    """Roll up the ``metrics`` columns of every frame into ``window`` buckets.
+
+    Buckets match ``dt_shared.rollup.rollup`` per frame and metric, ordered
+    by frame then bucket start. Samples reporting none of the metrics are
+    dropped rather than opening empty buckets.
+    """
+
+    size = WINDOW_SECONDS[window]
+    seconds = np.concatenate([np.empty(0)] + [f[0] for f in frames])
+    values = np.concatenate([np.empty((0, metrics))] + [f[1] for f in frames])
+    owner = np.repeat(np.arange(len(frames)), [len(f[0]) for f in frames])
+
+    present = ~np.isnan(values)
+    keep = present.any(axis=1)
+    seconds, values, owner, present = (
+        seconds[keep],
+        values[keep],
+        owner[keep],
+        present[keep],
+    )
+    # int() truncation, as rollup() floors timestamps.
+    starts = seconds.astype(np.int64)
+    starts -= starts % size
+    base = int(starts.min()) if len(starts) else 0
+    span = (int(starts.max()) - base) // size + 1 if len(starts) else 1
+    keys, inverse = np.unique(
+        owner * span + (starts - base) // size, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+
+    shape = (len(keys), metrics)
+    count = np.zeros(shape, dtype=np.int64)
+    total = np.zeros(shape)
+    low = np.full(shape, np.inf)
+    high = np.full(shape, -np.inf)
+    np.add.at(count, inverse, present)
+    np.add.at(total, inverse, np.where(present, values, 0.0))
+    np.fmin.at(low, inverse, values)
+    np.fmax.at(high, inverse, values)
+    return FrameRollup(
+        owner=keys // span,
+        bucket_start=base + (keys % span) * size,
+        count=count,
+        min_value=low,
+        max_value=high,
+        total=total,
+    )
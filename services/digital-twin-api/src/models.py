@@ -103,3 +103,25 @@ class AggregateRequest(BaseModel):
         default_factory=lambda: ["1min"]
     )
     window_minutes: Optional[Literal[1, 5, 60]] = None
+    # "local" rolls up this service's history in-process; "remote" forwards
+    # it to data-aggregator.
+    mode: Literal["local", "remote"] = "local"
+
+
+class FleetAggregateRequest(BaseModel):
+    """Rollups of several metrics over the machines matching every selector.
+
+    An empty selector matches all machines.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    machine_ids: List[str] = Field(default_factory=list)
+    locations: List[str] = Field(default_factory=list)
+    models: List[str] = Field(default_factory=list)
+    metrics: List[str] = Field(
+        default_factory=lambda: ["spindle.temperature_c"], min_length=1
+    )
+    windows: List[Literal["1min", "5min", "1hour"]] = Field(
+        default_factory=lambda: ["1min"], min_length=1
+    )
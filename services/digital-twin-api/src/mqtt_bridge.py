@@ -0,0 +1,381 @@
+"""MQTT ingestion bridge feeding the store and downstream detectors in bulk."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+import zlib
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from dt_shared.instrumentation import Instrumentation
+from dt_shared.telemetry import BINARY_MAGIC, decode_binary
+from models import Machine, Telemetry
+from store import InMemoryStore
+
+try:
+    import paho.mqtt.client as mqtt
+except Exception:  # pragma: no cover - optional for tests
+    mqtt = None
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOPICS: Tuple[str, ...] = ("dt/cnc/+/telemetry", "dt/cnc/+/telemetry/batch")
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_STOP = object()
+
+# Receives each flushed micro-batch of raw sample dicts.
+BatchSink = Callable[[List[Dict[str, Any]]], None]
+
+
+def decode_payload(payload: bytes) -> List[Dict[str, Any]]:
+    """Decode one message into raw sample dicts.
+
+    A message is a JSON sample, a (gzip/zstd) JSON array batch, or a
+    ``dt_shared.telemetry`` binary batch, validated against the full schema.
+    """
+
+    if payload.startswith(BINARY_MAGIC):
+        return [item.model_dump(mode="json") for item in decode_binary(payload)]
+    if payload.startswith(_GZIP_MAGIC):
+        payload = gzip.decompress(payload)
+    elif payload.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for zstd payloads")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    decoded = json.loads(payload)
+    return decoded if isinstance(decoded, list) else [decoded]
+
+
+@dataclass
+class _TopicStats:
+    messages: int = 0
+    samples: int = 0
+    lag_s: float = 0.0
+    max_lag_s: float = 0.0
+
+
+@dataclass
+class MQTTBridge:
+    """Subscribe to simulator telemetry and ingest it in micro-batches.
+
+    The MQTT network thread only enqueues raw messages. Each topic is pinned
+    to one of ``workers`` decode threads (so per-machine order is kept),
+    which decompress and parse payloads and collect samples into batches of
+    up to ``batch_size``, flushed at the latest ``batch_max_delay_s`` after
+    their first sample. A flush writes the batch to the store and hands the
+    stored samples to every sink (e.g. one bulk ``/detect`` call) at once.
+
+    Worker queues are bounded by ``queue_size``: when a queue is full the
+    network thread blocks for up to ``enqueue_timeout_s``, which stops it
+    reading from the socket and pushes back on the broker, before dropping
+    the message. ``stats`` reports per-topic lag (flush time minus the
+    newest sample timestamp), queue depth, drops and errors.
+    """
+
+    store: InMemoryStore
+    sinks: Sequence[BatchSink] = ()
+    broker_host: str = "localhost"
+    broker_port: int = 1883
+    topics: Sequence[str] = DEFAULT_TOPICS
+    workers: int = 4
+    batch_size: int = 500
+    batch_max_delay_s: float = 0.2
+    queue_size: int = 10_000
+    enqueue_timeout_s: float = 1.0
+    client_factory: Callable[[], object] | None = None
+
+    client: object | None = field(default=None, init=False)
+    _queues: List[queue.Queue] = field(default_factory=list, init=False)
+    _threads: List[threading.Thread] = field(default_factory=list, init=False)
+    _topics: Dict[str, _TopicStats] = field(default_factory=dict, init=False)
+    _counters: Dict[str, int] = field(init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self) -> None:
+        if self.workers <= 0 or self.batch_size <= 0 or self.queue_size <= 0:
+            raise ValueError("workers, batch_size and queue_size must be positive")
+        if self.client_factory is None:
+            if mqtt is None:
+                raise RuntimeError("paho-mqtt is required to create a client")
+            self.client_factory = _paho_client
+        self._counters = {
+            "received": 0,
+            "dropped": 0,
+            "decode_errors": 0,
+            "store_errors": 0,
+            "sink_errors": 0,
+            "batches": 0,
+            "samples": 0,
+        }
+
+    def start(self) -> None:
+        per_worker = max(1, self.queue_size // self.workers)
+        self._queues = [queue.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._threads = [
+            threading.Thread(
+                target=self._work, args=(inbox,), name=f"mqtt-bridge-{i}", daemon=True
+            )
+            for i, inbox in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.client = self.client_factory()
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self._on_message
+        self.client.connect(self.broker_host, self.broker_port, keepalive=60)
+        if hasattr(self.client, "loop_start"):
+            self.client.loop_start()
+
+    def stop(self) -> None:
+        """Disconnect, then let the workers flush everything already queued."""
+
+        if self.client is not None:
+            if hasattr(self.client, "loop_stop"):
+                self.client.loop_stop()
+            if hasattr(self.client, "disconnect"):
+                self.client.disconnect()
+        for inbox in self._queues:
+            inbox.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            topics = {
+                topic: {
+                    "messages": item.messages,
+                    "samples": item.samples,
+                    "lag_s": round(item.lag_s, 3),
+                    "max_lag_s": round(item.max_lag_s, 3),
+                }
+                for topic, item in self._topics.items()
+            }
+            return {
+                **self._counters,
+                "queued": sum(inbox.qsize() for inbox in self._queues),
+                "topics": topics,
+            }
+
+    def _on_connect(self, client: object, userdata: object, *args: object) -> None:
+        # Subscribing here (not in start) restores subscriptions on reconnect.
+        for topic in self.topics:
+            client.subscribe(topic, qos=0)
+
+    def _on_message(self, client: object, userdata: object, message: object) -> None:
+        topic = message.topic
+        inbox = self._queues[zlib.crc32(topic.encode()) % len(self._queues)]
+        with self._lock:
+            self._counters["received"] += 1
+        try:
+            inbox.put((topic, message.payload), timeout=self.enqueue_timeout_s)
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped"] += 1
+
+    def _work(self, inbox: queue.Queue) -> None:
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = inbox.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _STOP:
+                topic, payload = item
+                self._count_message(topic)
+                try:
+                    samples = decode_payload(payload)
+                except Exception:
+                    with self._lock:
+                        self._counters["decode_errors"] += 1
+                    samples = []
+                if samples and not batch:
+                    deadline = time.monotonic() + self.batch_max_delay_s
+                batch.extend((topic, sample) for sample in samples)
+            due = item is None or item is _STOP or time.monotonic() >= deadline
+            if batch and (due or len(batch) >= self.batch_size):
+                self._flush(batch)
+                batch = []
+            if item is _STOP:
+                return
+
+    def _count_message(self, topic: str) -> None:
+        with self._lock:
+            stats = self._topics.get(topic)
+            if stats is None:
+                stats = self._topics[topic] = _TopicStats()
+            stats.messages += 1
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        newest: Dict[str, datetime] = {}
+        counts: Dict[str, int] = {}
+        # Only stored samples go to the sinks: strict sinks such as
+        # anomaly-detection reject a whole batch for one invalid sample.
+        stored: List[Dict[str, Any]] = []
+        for topic, sample in batch:
+            counts[topic] = counts.get(topic, 0) + 1
+            try:
+                telemetry = Telemetry(
+                    timestamp=sample["timestamp"],
+                    machine_id=sample["machine_id"],
+                    data={
+                        key: value
+                        for key, value in sample.items()
+                        if key not in ("timestamp", "machine_id")
+                    },
+                )
+            except Exception:
+                with self._lock:
+                    self._counters["decode_errors"] += 1
+                continue
+            machine_id = telemetry.machine_id
+            try:
+                if not self.store.get_machine(machine_id):
+                    self.store.add_machine(
+                        Machine(id=machine_id, name=machine_id, location="demo")
+                    )
+                self.store.add_telemetry(telemetry)
+            except ValueError:
+                # Fixed-size stores reject oversized records or extra machines.
+                with self._lock:
+                    self._counters["store_errors"] += 1
+                continue
+            stored.append(sample)
+            if topic not in newest or telemetry.timestamp > newest[topic]:
+                newest[topic] = telemetry.timestamp
+
+        for sink in self.sinks if stored else ():
+            try:
+                sink(stored)
+            except Exception:
+                logger.exception("MQTT bridge sink failed")
+                with self._lock:
+                    self._counters["sink_errors"] += 1
+
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["samples"] += len(stored)
+            for topic, count in counts.items():
+                stats = self._topics[topic]
+                stats.samples += count
+                if topic in newest:
+                    stats.lag_s = max(0.0, (now - newest[topic]).total_seconds())
+                    stats.max_lag_s = max(stats.max_lag_s, stats.lag_s)
+
+
+def anomaly_detection_sink(
+    base_url: str,
+    timeout_s: float = 3.0,
+    client: object | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> BatchSink:
+    """Forward each micro-batch to anomaly-detection ``/detect`` in one POST."""
+
+    return _post_sink(
+        base_url,
+        "/detect",
+        lambda batch: {"telemetry": batch},
+        ("anomaly-detection", "detect"),
+        timeout_s,
+        client,
+        instrumentation,
+    )
+
+
+def predictive_maintenance_sink(
+    base_url: str,
+    timeout_s: float = 3.0,
+    client: object | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> BatchSink:
+    """Feed spindle vibration and temperature to predictive-maintenance.
+
+    Samples without both readings are skipped; the rest of each micro-batch
+    goes to ``POST /telemetry`` in one call, which keeps the service's
+    per-machine trends current.
+    """
+
+    def to_payload(batch: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+        samples = []
+        for sample in batch:
+            spindle = sample.get("spindle")
+            if not isinstance(spindle, dict):
+                continue
+            vibration = spindle.get("vibration_mm_s")
+            temperature = spindle.get("temperature_c")
+            if not all(
+                isinstance(value, (int, float)) and value >= 0
+                for value in (vibration, temperature)
+            ):
+                continue
+            samples.append(
+                {
+                    "machine_id": sample["machine_id"],
+                    "timestamp": sample["timestamp"],
+                    "vibration_mm_s": vibration,
+                    "temperature_c": temperature,
+                }
+            )
+        return {"samples": samples} if samples else None
+
+    return _post_sink(
+        base_url,
+        "/telemetry",
+        to_payload,
+        ("predictive-maintenance", "telemetry"),
+        timeout_s,
+        client,
+        instrumentation,
+    )
+
+
+def _post_sink(
+    base_url: str,
+    path: str,
+    to_payload: Callable[[List[Dict[str, Any]]], Dict[str, Any] | None],
+    operation: Tuple[str, str],
+    timeout_s: float,
+    client: object | None,
+    instrumentation: Instrumentation | None,
+) -> BatchSink:
+    if client is None:
+        import httpx
+
+        client = httpx.Client(base_url=base_url, timeout=timeout_s)
+
+    def send(batch: List[Dict[str, Any]]) -> None:
+        payload = to_payload(batch)
+        if payload is None:
+            return
+        timed = (
+            nullcontext()
+            if instrumentation is None
+            else instrumentation.downstream(*operation)
+        )
+        with timed:
+            response = client.post(path, json=payload)
+            response.raise_for_status()
+
+    return send
+
+
+def _paho_client() -> object:
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    return mqtt.Client()
@@ -2,19 +2,28 @@
 
 from __future__ import annotations
 
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any
+from typing import Any, ContextManager
 
 import httpx
 from config import ApiConfig
-from models import Telemetry
+from dt_shared.instrumentation import Instrumentation
 
 
 class ServiceClient:
     """HTTP wrapper for alerting-service and data-aggregator."""
 
-    def __init__(self, config: ApiConfig) -> None:
+    def __init__(
+        self, config: ApiConfig, instrumentation: Instrumentation | None = None
+    ) -> None:
         self._config = config
+        self._instrumentation = instrumentation
+
+    def _timed(self, target: str, operation: str) -> ContextManager[None]:
+        if self._instrumentation is None:
+            return nullcontext()
+        return self._instrumentation.downstream(target, operation)
 
     async def send_alert(
         self,
@@ -34,50 +43,43 @@ class ServiceClient:
             "metric": metric,
             "value": value,
         }
-        async with httpx.AsyncClient(timeout=self._config.service_timeout_s) as client:
-            response = await client.post(
-                f"{self._config.alerting_service_url}/alerts", json=payload
-            )
-            response.raise_for_status()
-            return response.json()
+        with self._timed("alerting-service", "send_alert"):
+            async with httpx.AsyncClient(
+                timeout=self._config.service_timeout_s
+            ) as client:
+                response = await client.post(
+                    f"{self._config.alerting_service_url}/alerts", json=payload
+                )
+                response.raise_for_status()
+                return response.json()
 
     async def aggregate(
         self,
         *,
         machine_id: str,
-        points: list[Telemetry],
+        points: list[tuple[datetime, float]],
         metric: str,
         windows: list[str],
     ) -> dict[str, Any]:
-        telemetry_points = []
-        for point in points:
-            value = self._extract_metric(point.data, metric)
-            if value is None:
-                continue
-            telemetry_points.append(
-                {
-                    "machine_id": machine_id,
-                    "metric": metric,
-                    "timestamp": point.timestamp.isoformat(),
-                    "value": value,
-                }
-            )
+        """Send one metric's ``(timestamp, value)`` series to data-aggregator."""
 
-        payload = {"points": telemetry_points, "windows": windows}
-        async with httpx.AsyncClient(timeout=self._config.service_timeout_s) as client:
-            response = await client.post(
-                f"{self._config.data_aggregator_url}/aggregate", json=payload
-            )
-            response.raise_for_status()
-            return response.json()
+        telemetry_points = [
+            {
+                "machine_id": machine_id,
+                "metric": metric,
+                "timestamp": timestamp.isoformat(),
+                "value": value,
+            }
+            for timestamp, value in points
+        ]
 
-    @staticmethod
-    def _extract_metric(data: dict[str, Any], metric: str) -> float | None:
-        current: Any = data
-        for part in metric.split("."):
-            if not isinstance(current, dict) or part not in current:
-                return None
-            current = current[part]
-        if isinstance(current, (int, float)):
-            return float(current)
-        return None
+        payload = {"points": telemetry_points, "windows": windows}
+        with self._timed("data-aggregator", "aggregate"):
+            async with httpx.AsyncClient(
+                timeout=self._config.service_timeout_s
+            ) as client:
+                response = await client.post(
+                    f"{self._config.data_aggregator_url}/aggregate", json=payload
+                )
+                response.raise_for_status()
+                return response.json()
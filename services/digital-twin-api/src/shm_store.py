@@ -0,0 +1,489 @@
+"""Shared-memory telemetry store shared by every API worker process."""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from dt_shared.profiling import Stopwatch, stage_timer
+from metric_columns import (
+    METRICS,
+    SCHEMA_METRICS,
+    FlatSample,
+    MetricFrame,
+    MetricRing,
+)
+from models import Machine, Telemetry
+from store import InMemoryStore
+
+_MAGIC = b"DTSHM002"
+# magic, max machines, history per machine, record payload bytes, metric
+# columns, machine count
+_HEADER = struct.Struct("<8sIIIII")
+# seqlock, records written, machine id, machine JSON length
+_MACHINE = struct.Struct("<QQ64sI")
+_MACHINE_JSON_BYTES = 512
+_MACHINE_SIZE = _MACHINE.size + _MACHINE_JSON_BYTES
+# seqlock, record index, payload length
+_RECORD = struct.Struct("<QQI")
+_SEQ = struct.Struct("<Q")
+# Schema metrics have the same column ids in every process; paths interned
+# later may not, so only these are stored as columns.
+_COLUMNS = len(SCHEMA_METRICS)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# A reader retries a record the writer is changing: first by spinning, then
+# sleeping, and gives up once a crashed writer has clearly left it half done.
+_READ_SPINS = 64
+_READ_ATTEMPTS = 164
+_READ_BACKOFF_S = 0.001
+
+_SHM_SERIALIZE = stage_timer("shm_store.telemetry.serialize")
+_SHM_LOCK = stage_timer("shm_store.telemetry.lock")
+_SHM_WRITE = stage_timer("shm_store.telemetry.write")
+
+
+def _micros(timestamp: datetime) -> int:
+    # Naive timestamps are local time, as ``datetime.timestamp`` assumes.
+    return (timestamp.astimezone(timezone.utc) - _EPOCH) // timedelta(microseconds=1)
+
+
+class _LappedRead(Exception):
+    """The writer overwrote a record before it was read."""
+
+
+class ShmReadError(RuntimeError):
+    """A record stayed mid-update, e.g. because its writer process died."""
+
+
+@dataclass
+class SharedMemoryStore(InMemoryStore):
+    """Telemetry ring buffers in ``multiprocessing.shared_memory``.
+
+    The segment holds a table of ``max_machines`` machine slots and, per
+    machine, a ring of ``history_size`` fixed-size records (``record_bytes`` of
+    JSON each). Next to each record the schema metrics are stored flattened,
+    as one row of float columns plus the timestamp in microseconds, so
+    ``metric_series`` and ``metric_frame`` slice numpy views of the segment
+    instead of parsing JSON. The first process creates it; every other
+    uvicorn worker attaches by ``name`` and reads the same buffers in place.
+
+    Writes are serialized across processes by a file lock, so there is a
+    single writer at a time. Readers take no lock: each machine slot and
+    record is guarded by a sequence counter that the writer makes odd
+    before and even after changing it, and a reader retries when the
+    counter was odd or moved during its copy. Each record also stores its
+    index, so a history read overtaken by the writer is detected and retried.
+    Reads give up with ``ShmReadError`` after a bounded number of retries,
+    and the next writer repairs counters left odd by a writer that died.
+
+    Predictions and anomalies are not written by any ingestion path and
+    stay in process memory.
+    """
+
+    name: str = "dt-telemetry"
+    max_machines: int = 128
+    history_size: int = 200
+    record_bytes: int = 1536
+
+    _shm: shared_memory.SharedMemory = field(init=False, repr=False)
+    _buf: memoryview = field(init=False, repr=False)
+    _slots: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _write_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _lock_fd: int = field(init=False, repr=False)
+    _leader_fd: int | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_machines <= 0 or self.history_size <= 0 or self.record_bytes <= 0:
+            raise ValueError(
+                "max_machines, history_size and record_bytes must be positive"
+            )
+        self._record_size = _RECORD.size + self.record_bytes
+        self._records_offset = _HEADER.size + self.max_machines * _MACHINE_SIZE
+        rows = self.max_machines * self.history_size
+        records_end = self._records_offset + rows * self._record_size
+        columns_offset = -(-records_end // 8) * 8
+        size = columns_offset + rows * 8 * (1 + _COLUMNS)
+        lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._writing():
+            try:
+                self._shm = shared_memory.SharedMemory(
+                    name=self.name, create=True, size=size
+                )
+                created = True
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=self.name)
+                created = False
+            # Python < 3.13 tracks attached segments too and unlinks them when
+            # any worker exits; the segment must outlive single workers.
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+            self._buf = self._shm.buf
+            if created:
+                _HEADER.pack_into(
+                    self._buf,
+                    0,
+                    _MAGIC,
+                    self.max_machines,
+                    self.history_size,
+                    self.record_bytes,
+                    _COLUMNS,
+                    0,
+                )
+        self._check_layout()
+        shape = (self.max_machines, self.history_size)
+        self._micros = np.ndarray(
+            shape, dtype="<i8", buffer=self._buf, offset=columns_offset
+        )
+        self._columns = np.ndarray(
+            shape + (_COLUMNS,),
+            dtype="<f8",
+            buffer=self._buf,
+            offset=columns_offset + rows * 8,
+        )
+        # Strided views of every record's seqlock counter and stored index.
+        strides = (self.history_size * self._record_size, self._record_size)
+        self._record_seqs = np.ndarray(
+            shape,
+            dtype="<u8",
+            buffer=self._buf,
+            offset=self._records_offset,
+            strides=strides,
+        )
+        self._record_indexes = np.ndarray(
+            shape,
+            dtype="<u8",
+            buffer=self._buf,
+            offset=self._records_offset + 8,
+            strides=strides,
+        )
+
+    def close(self) -> None:
+        """Detach this process; the segment stays for the other workers."""
+
+        # The views export the buffer, which must be released first.
+        del self._micros, self._columns, self._record_seqs, self._record_indexes
+        self._buf.release()
+        self._shm.close()
+        os.close(self._lock_fd)
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+    def try_lead(self) -> bool:
+        """Claim the one-per-segment leader role (e.g. for the MQTT bridge).
+
+        The claim is a non-blocking file lock held until ``close`` or
+        process exit, so exactly one live worker holds it.
+        """
+
+        if self._leader_fd is not None:
+            return True
+        path = os.path.join(tempfile.gettempdir(), f"{self.name}.leader")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        return True
+
+    def unlink(self) -> None:
+        """Remove the segment (once every worker has stopped)."""
+
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+    def add_machine(self, machine: Machine) -> None:
+        payload = machine.model_dump_json().encode()
+        if len(payload) > _MACHINE_JSON_BYTES:
+            raise ValueError(f"machine exceeds {_MACHINE_JSON_BYTES} bytes")
+        with self._writing():
+            slot = self._find_slot(machine.id)
+            if slot is None:
+                slot = self._allocate_slot(machine.id)
+            offset = self._machine_offset(slot)
+            seq, head, machine_id, _ = _MACHINE.unpack_from(self._buf, offset)
+            seq += seq % 2
+            _SEQ.pack_into(self._buf, offset, seq + 1)
+            _MACHINE.pack_into(
+                self._buf, offset, seq + 1, head, machine_id, len(payload)
+            )
+            start = offset + _MACHINE.size
+            self._buf[start : start + len(payload)] = payload
+            _SEQ.pack_into(self._buf, offset, seq + 2)
+
+    def list_machines(self) -> List[Machine]:
+        count = self._machine_count()
+        return [self._read_machine(slot)[1] for slot in range(count)]
+
+    def get_machine(self, machine_id: str) -> Machine | None:
+        slot = self._find_slot(machine_id)
+        return None if slot is None else self._read_machine(slot)[1]
+
+    def add_telemetry(
+        self, item: Telemetry, max_items: int = 200, flat: FlatSample | None = None
+    ) -> None:
+        """Append to the machine's ring (``history_size`` slots, not ``max_items``).
+
+        ``flat`` is ``METRICS.flatten(item.data)`` if the caller has it.
+        """
+
+        watch = Stopwatch()
+        payload = item.model_dump_json().encode()
+        if len(payload) > self.record_bytes:
+            raise ValueError(f"telemetry record exceeds {self.record_bytes} bytes")
+        columns, values = METRICS.flatten(item.data) if flat is None else flat
+        row = np.full(_COLUMNS, np.nan)
+        for column, value in zip(columns, values):
+            if column < _COLUMNS:
+                row[column] = value
+        micros = _micros(item.timestamp)
+        watch.lap(_SHM_SERIALIZE)
+        with self._writing():
+            watch.lap(_SHM_LOCK)
+            slot = self._find_slot(item.machine_id)
+            if slot is None:
+                slot = self._allocate_slot(item.machine_id)
+            machine_offset = self._machine_offset(slot)
+            seq, head, machine_id, json_len = _MACHINE.unpack_from(
+                self._buf, machine_offset
+            )
+            # Under the write lock an odd counter was left by a dead writer.
+            seq += seq % 2
+            offset = self._record_offset(slot, head)
+            record_seq = _SEQ.unpack_from(self._buf, offset)[0]
+            record_seq += record_seq % 2
+            _SEQ.pack_into(self._buf, offset, record_seq + 1)
+            _RECORD.pack_into(self._buf, offset, record_seq + 1, head, len(payload))
+            start = offset + _RECORD.size
+            self._buf[start : start + len(payload)] = payload
+            ring_row = head % self.history_size
+            self._micros[slot, ring_row] = micros
+            self._columns[slot, ring_row] = row
+            _SEQ.pack_into(self._buf, offset, record_seq + 2)
+            # Publish the record by advancing the machine's head.
+            _SEQ.pack_into(self._buf, machine_offset, seq + 1)
+            _MACHINE.pack_into(
+                self._buf, machine_offset, seq + 1, head + 1, machine_id, json_len
+            )
+            _SEQ.pack_into(self._buf, machine_offset, seq + 2)
+        watch.lap(_SHM_WRITE)
+
+    def latest_telemetry(self, machine_id: str) -> Telemetry | None:
+        items = self._read_records(machine_id, limit=1)
+        return items[-1] if items else None
+
+    def history(self, machine_id: str) -> List[Telemetry]:
+        return self._read_records(machine_id, limit=self.history_size)
+
+    def metric_series(
+        self, machine_id: str, metric: str
+    ) -> List[Tuple[datetime, float]]:
+        """``(timestamp, value)`` of every stored sample reporting ``metric``.
+
+        Timestamps come back in UTC.
+        """
+
+        column = METRICS.get(metric)
+        if column is None:
+            return []
+        micros, values = self._read_columns(machine_id, [column])
+        present = np.flatnonzero(~np.isnan(values[:, 0]))
+        return [
+            (_EPOCH + timedelta(microseconds=us), value)
+            for us, value in zip(micros[present].tolist(), values[present, 0].tolist())
+        ]
+
+    def metric_frame(
+        self, machine_id: str, columns: Sequence[int | None]
+    ) -> MetricFrame:
+        micros, values = self._read_columns(machine_id, columns)
+        return micros / 1e6, values
+
+    def telemetry_count(self) -> int:
+        return sum(
+            min(self._read_head(slot), self.history_size)
+            for slot in range(self._machine_count())
+        )
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._write_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _read_columns(
+        self, machine_id: str, columns: Sequence[int | None]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if any(c is not None and c >= _COLUMNS for c in columns):
+            return self._flatten_history(machine_id, columns)
+        slot = self._find_slot(machine_id)
+        if slot is None:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(columns)))
+        known = [j for j, c in enumerate(columns) if c is not None]
+        picked = [columns[j] for j in known]
+        for _ in self._attempts():
+            head = self._read_head(slot)
+            indexes = np.arange(max(0, head - self.history_size), head)
+            rows = indexes % self.history_size
+            # Column rows share their record's seqlock: keep the rows whose
+            # counter was even and unchanged across the copy and that still
+            # hold the expected sample (the writer may have lapped the oldest).
+            seqs = self._record_seqs[slot, rows]
+            micros = self._micros[slot, rows]
+            values = np.full((len(rows), len(columns)), np.nan)
+            if known:
+                values[:, known] = self._columns[slot][np.ix_(rows, picked)]
+            intact = (
+                (seqs % 2 == 0)
+                & (self._record_seqs[slot, rows] == seqs)
+                & (self._record_indexes[slot, rows] == indexes)
+            )
+            if intact.all() or (len(intact) and intact[-1]):
+                return micros[intact], values[intact]
+
+    def _flatten_history(
+        self, machine_id: str, columns: Sequence[int | None]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Metrics outside the schema are only in the JSON records.
+        history = self.history(machine_id)
+        if not history:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(columns)))
+        ring = MetricRing(len(history), len(METRICS))
+        for item in history:
+            ring.append(item.timestamp, METRICS.flatten(item.data))
+        _, values = ring.frame(columns)
+        micros = [_micros(item.timestamp) for item in history]
+        return np.array(micros, dtype=np.int64), values
+
+    def _attempts(self) -> Iterator[int]:
+        for attempt in range(_READ_ATTEMPTS):
+            if attempt >= _READ_SPINS:
+                time.sleep(_READ_BACKOFF_S)
+            yield attempt
+        raise ShmReadError(
+            f"shared memory {self.name!r}: a record stayed mid-update "
+            f"after {_READ_ATTEMPTS} reads"
+        )
+
+    def _check_layout(self) -> None:
+        magic, machines, history, record_bytes, columns, _ = _HEADER.unpack_from(
+            self._buf, 0
+        )
+        if magic != _MAGIC:
+            raise RuntimeError(f"shared memory {self.name!r} is not a telemetry store")
+        if (machines, history, record_bytes, columns) != (
+            self.max_machines,
+            self.history_size,
+            self.record_bytes,
+            _COLUMNS,
+        ):
+            raise RuntimeError(
+                f"shared memory {self.name!r} has a different layout: "
+                f"{machines} machines x {history} records x {record_bytes} bytes"
+            )
+
+    def _machine_count(self) -> int:
+        return _HEADER.unpack_from(self._buf, 0)[5]
+
+    def _machine_offset(self, slot: int) -> int:
+        return _HEADER.size + slot * _MACHINE_SIZE
+
+    def _record_offset(self, slot: int, index: int) -> int:
+        ring_index = slot * self.history_size + index % self.history_size
+        return self._records_offset + ring_index * self._record_size
+
+    def _find_slot(self, machine_id: str) -> int | None:
+        slot = self._slots.get(machine_id)
+        if slot is not None:
+            return slot
+        # Slots never move once assigned, so cache every id seen.
+        encoded = machine_id.encode()
+        for index in range(len(self._slots), self._machine_count()):
+            offset = self._machine_offset(index) + 16
+            stored = bytes(self._buf[offset : offset + 64]).rstrip(b"\0")
+            self._slots[stored.decode()] = index
+            if stored == encoded:
+                return index
+        return None
+
+    def _allocate_slot(self, machine_id: str) -> int:
+        encoded = machine_id.encode()
+        if len(encoded) > 64:
+            raise ValueError("machine id exceeds 64 bytes")
+        count = self._machine_count()
+        if count >= self.max_machines:
+            raise ValueError(f"shared store is full ({self.max_machines} machines)")
+        offset = self._machine_offset(count)
+        placeholder = Machine(id=machine_id, name=machine_id, location="unknown")
+        payload = placeholder.model_dump_json().encode()
+        _MACHINE.pack_into(self._buf, offset, 0, 0, encoded, len(payload))
+        start = offset + _MACHINE.size
+        self._buf[start : start + len(payload)] = payload
+        # Readers only look at slots below the count, so bump it last.
+        header = list(_HEADER.unpack_from(self._buf, 0))
+        header[5] = count + 1
+        _HEADER.pack_into(self._buf, 0, *header)
+        self._slots[machine_id] = count
+        return count
+
+    def _read_machine(self, slot: int) -> Tuple[int, Machine]:
+        offset = self._machine_offset(slot)
+        for _ in self._attempts():
+            seq, head, _, json_len = _MACHINE.unpack_from(self._buf, offset)
+            start = offset + _MACHINE.size
+            payload = bytes(self._buf[start : start + json_len])
+            if seq % 2 == 0 and _SEQ.unpack_from(self._buf, offset)[0] == seq:
+                return head, Machine.model_validate_json(payload)
+
+    def _read_head(self, slot: int) -> int:
+        offset = self._machine_offset(slot)
+        for _ in self._attempts():
+            seq, head, _, _ = _MACHINE.unpack_from(self._buf, offset)
+            if seq % 2 == 0 and _SEQ.unpack_from(self._buf, offset)[0] == seq:
+                return head
+
+    def _read_records(self, machine_id: str, limit: int) -> List[Telemetry]:
+        slot = self._find_slot(machine_id)
+        if slot is None:
+            return []
+        for _ in self._attempts():
+            head = self._read_head(slot)
+            start = max(0, head - min(limit, self.history_size))
+            try:
+                # Copy the raw window first, parse after: a writer that laps
+                # the copy restarts it from the new head.
+                payloads = [self._read_record(slot, i) for i in range(start, head)]
+            except _LappedRead:
+                continue
+            return [Telemetry.model_validate_json(payload) for payload in payloads]
+
+    def _read_record(self, slot: int, index: int) -> bytes:
+        offset = self._record_offset(slot, index)
+        for _ in self._attempts():
+            seq, stored_index, length = _RECORD.unpack_from(self._buf, offset)
+            start = offset + _RECORD.size
+            payload = bytes(self._buf[start : start + length])
+            if seq % 2 or _SEQ.unpack_from(self._buf, offset)[0] != seq:
+                continue
+            if stored_index != index:
+                # The writer lapped this reader; the record is gone.
+                raise _LappedRead
+            return payload
@@ -2,22 +2,49 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List
+from datetime import datetime
+from typing import Deque, Dict, List, Sequence, Tuple
 
+from dt_shared.profiling import stage_timer
+from metric_columns import (
+    METRICS,
+    FlatSample,
+    MetricFrame,
+    MetricRing,
+    empty_frame,
+)
 from models import AnomalyRecord, Machine, PredictionRecord, Telemetry
 
+_TELEMETRY_FLATTEN = stage_timer("store.telemetry.flatten")
+_TELEMETRY_WRITE = stage_timer("store.telemetry.write")
+
 
 @dataclass
 class InMemoryStore:
+    """Machines, telemetry, predictions and anomalies in process memory.
+
+    Telemetry is flattened once on ingest into per-machine ``MetricRing``
+    columns, so reading one metric's series is a column slice. The MQTT
+    bridge writes from its worker threads while handlers read on the event
+    loop, so telemetry reads and writes hold ``_lock``.
+    """
+
     machines: Dict[str, Machine] = field(default_factory=dict)
     telemetry: Dict[str, Deque[Telemetry]] = field(default_factory=dict)
+    metric_rings: Dict[str, MetricRing] = field(default_factory=dict)
     predictions: Dict[str, List[PredictionRecord]] = field(default_factory=dict)
     anomalies: Dict[str, List[AnomalyRecord]] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
 
     def add_machine(self, machine: Machine) -> None:
-        self.machines[machine.id] = machine
+        with self._lock:
+            self.machines[machine.id] = machine
 
     def list_machines(self) -> List[Machine]:
         return list(self.machines.values())
@@ -25,17 +52,61 @@ class InMemoryStore:
     def get_machine(self, machine_id: str) -> Machine | None:
         return self.machines.get(machine_id)
 
-    def add_telemetry(self, item: Telemetry, max_items: int = 200) -> None:
-        q = self.telemetry.setdefault(item.machine_id, deque(maxlen=max_items))
-        q.append(item)
+    def add_telemetry(
+        self, item: Telemetry, max_items: int = 200, flat: FlatSample | None = None
+    ) -> None:
+        """Store ``item``; ``flat`` is its ``METRICS.flatten(item.data)`` if known."""
+
+        start = time.perf_counter_ns()
+        if flat is None:
+            flat = METRICS.flatten(item.data)
+        flattened = time.perf_counter_ns()
+        _TELEMETRY_FLATTEN.observe_ns(flattened - start)
+        with self._lock:
+            q = self.telemetry.setdefault(item.machine_id, deque(maxlen=max_items))
+            q.append(item)
+            ring = self.metric_rings.get(item.machine_id)
+            if ring is None:
+                ring = MetricRing(max_items, len(METRICS))
+                self.metric_rings[item.machine_id] = ring
+            ring.append(item.timestamp, flat)
+        _TELEMETRY_WRITE.observe_ns(time.perf_counter_ns() - flattened)
 
     def latest_telemetry(self, machine_id: str) -> Telemetry | None:
         q = self.telemetry.get(machine_id)
         return q[-1] if q else None
 
     def history(self, machine_id: str) -> List[Telemetry]:
-        q = self.telemetry.get(machine_id)
-        return list(q) if q else []
+        with self._lock:
+            q = self.telemetry.get(machine_id)
+            return list(q) if q else []
+
+    def metric_series(
+        self, machine_id: str, metric: str
+    ) -> List[Tuple[datetime, float]]:
+        """``(timestamp, value)`` of every stored sample reporting ``metric``."""
+
+        column = METRICS.get(metric)
+        with self._lock:
+            ring = self.metric_rings.get(machine_id)
+            if ring is None or column is None:
+                return []
+            return ring.series(column)
+
+    def metric_frame(
+        self, machine_id: str, columns: Sequence[int | None]
+    ) -> MetricFrame:
+        """Stored samples of the metric ``columns`` of one machine as arrays."""
+
+        with self._lock:
+            ring = self.metric_rings.get(machine_id)
+            if ring is None:
+                return empty_frame(len(columns))
+            return ring.frame(columns)
+
+    def telemetry_count(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self.telemetry.values())
 
     def add_prediction(self, record: PredictionRecord) -> None:
         self.predictions.setdefault(record.machine_id, []).append(record)
@@ -1,6 +1,6 @@
 import asyncio
 import sys
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
@@ -90,7 +90,9 @@ def test_aggregate_endpoint_uses_data_aggregator(monkeypatch):
 
     response = asyncio.run(
         main.aggregate_machine(
-            "TEST-003", AggregateRequest(windows=["1min"]), x_api_key="dev-key"
+            "TEST-003",
+            AggregateRequest(windows=["1min"], mode="remote"),
+            x_api_key="dev-key",
         )
     )
     assert response.status == "success"
@@ -98,6 +100,121 @@ def test_aggregate_endpoint_uses_data_aggregator(monkeypatch):
     assert response.data["buckets"][0]["count"] == 1
 
 
+def test_aggregate_rolls_up_history_locally(monkeypatch):
+    import main
+    from models import AggregateRequest, Telemetry
+
+    async def fail_aggregate(**_):
+        raise AssertionError("local rollups must not call data-aggregator")
+
+    def fail_series(*_):
+        raise AssertionError("local rollups read the metric column, not points")
+
+    monkeypatch.setattr(main.service_client, "aggregate", fail_aggregate)
+    monkeypatch.setattr(main.store, "metric_series", fail_series)
+    start = datetime(2026, 2, 4, 10, 0, tzinfo=timezone.utc)
+    for offset, temperature in ((5, 40.0), (50, 50.0), (70, 60.0)):
+        telemetry = Telemetry(
+            timestamp=start + timedelta(seconds=offset),
+            machine_id="TEST-006",
+            data={"spindle": {"temperature_c": temperature}},
+        )
+        asyncio.run(main.ingest_telemetry("TEST-006", telemetry, x_api_key="dev-key"))
+
+    response = asyncio.run(
+        main.aggregate_machine(
+            "TEST-006",
+            AggregateRequest(windows=["5min", "1min", "5min"]),
+            x_api_key="dev-key",
+        )
+    )
+    buckets = response.data["buckets"]
+
+    assert [(b["window"], b["count"]) for b in buckets] == [
+        ("1min", 2),
+        ("1min", 1),
+        ("5min", 3),
+    ]
+    assert buckets[0]["machine_id"] == "TEST-006"
+    assert buckets[0]["metric"] == "spindle.temperature_c"
+    assert buckets[0]["bucket_start"] == start
+    assert buckets[0]["avg_value"] == 45.0
+    assert buckets[2]["min_value"] == 40.0
+    assert buckets[2]["max_value"] == 60.0
+
+
+def test_fleet_aggregate_returns_columnar_rollups_for_selected_machines():
+    import main
+    from models import FleetAggregateRequest, Machine, Telemetry
+
+    start = datetime(2026, 2, 4, 10, 0, tzinfo=timezone.utc)
+    for machine_id, location, model in (
+        ("FLEET-001", "hall-a", "DMU-50"),
+        ("FLEET-002", "hall-a", "DMU-65"),
+        ("FLEET-003", "hall-b", "DMU-50"),
+    ):
+        main.store.add_machine(
+            Machine(id=machine_id, name=machine_id, location=location, model=model)
+        )
+        for offset, temperature in ((5, 40.0), (50, 50.0), (70, 60.0)):
+            data = {"spindle": {"temperature_c": temperature}}
+            if offset == 70:
+                data["power"] = {"kw": 7.5}
+            telemetry = Telemetry(
+                timestamp=start + timedelta(seconds=offset),
+                machine_id=machine_id,
+                data=data,
+            )
+            asyncio.run(
+                main.ingest_telemetry(machine_id, telemetry, x_api_key="dev-key")
+            )
+
+    req = FleetAggregateRequest(
+        locations=["hall-a", "hall-b"],
+        models=["DMU-50"],
+        metrics=["spindle.temperature_c", "power.kw"],
+        windows=["1min", "5min"],
+    )
+    data = asyncio.run(main.aggregate_fleet(req, x_api_key="dev-key")).data
+
+    bucket, minute = start, timedelta(minutes=1)
+    assert data["machine_id"] == [
+        "FLEET-001",
+        "FLEET-001",
+        "FLEET-003",
+        "FLEET-003",
+        "FLEET-001",
+        "FLEET-003",
+    ]
+    assert data["window"] == ["1min"] * 4 + ["5min"] * 2
+    assert data["bucket_start"] == [bucket, bucket + minute] * 2 + [bucket] * 2
+    temperature = data["metrics"]["spindle.temperature_c"]
+    assert temperature["count"] == [2, 1, 2, 1, 3, 3]
+    assert temperature["avg_value"][:2] == [45.0, 60.0]
+    assert temperature["min_value"][4:] == [40.0, 40.0]
+    power = data["metrics"]["power.kw"]
+    assert power["count"] == [0, 1, 0, 1, 1, 1]
+    assert power["max_value"][:2] == [None, 7.5]
+
+
+def test_fleet_aggregate_with_no_matching_machines_is_empty():
+    import main
+    from models import FleetAggregateRequest
+
+    req = FleetAggregateRequest(
+        locations=["nowhere"], metrics=["spindle.temperature_c", "power.kw"]
+    )
+    data = asyncio.run(main.aggregate_fleet(req, x_api_key="dev-key")).data
+
+    assert data["machine_id"] == data["window"] == data["bucket_start"] == []
+    assert data["metrics"]["power.kw"] == {
+        "count": [],
+        "min_value": [],
+        "max_value": [],
+        "avg_value": [],
+    }
+
+
 def test_alert_endpoint_accepts_warning_alias(monkeypatch):
     import main
     from models import AlertRequest
@@ -139,7 +256,9 @@ def test_aggregate_accepts_window_minutes_legacy(monkeypatch):
     monkeypatch.setattr(main.service_client, "aggregate", fake_aggregate)
     response = asyncio.run(
         main.aggregate_machine(
-            "TEST-005", AggregateRequest(window_minutes=5), x_api_key="dev-key"
+            "TEST-005",
+            AggregateRequest(window_minutes=5, mode="remote"),
+            x_api_key="dev-key",
         )
     )
 
@@ -153,3 +272,30 @@ def test_aggregate_rejects_unsupported_window_minutes():
 
     with pytest.raises(ValidationError):
         AggregateRequest(window_minutes=7)
+
+
+def test_metrics_report_store_sizes_and_downstream_latency(monkeypatch):
+    import httpx
+    import main
+    from models import Telemetry
+
+    async def unreachable(self, url, **kwargs):
+        raise httpx.ConnectError("alerting-service down")
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", unreachable)
+    telemetry = Telemetry(
+        timestamp=datetime.now(timezone.utc),
+        machine_id="TEST-009",
+        data={"spindle": {"temperature_c": 95.0}},
+    )
+    asyncio.run(main.ingest_telemetry("TEST-009", telemetry, x_api_key="dev-key"))
+
+    registry = main.instrumentation.registry
+    assert registry.get_sample_value("store_items", {"store": "machines"}) == 1
+    assert registry.get_sample_value("store_items", {"store": "telemetry"}) == 1
+    labels = {"target": "alerting-service", "operation": "send_alert"}
+    errors = {**labels, "outcome": "error"}
+    assert (
+        registry.get_sample_value("downstream_request_duration_seconds_count", errors)
+        == 1
+    )
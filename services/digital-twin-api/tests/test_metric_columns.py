@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+
+def test_flatten_interns_schema_and_new_paths():
+    from metric_columns import SCHEMA_METRICS, MetricIndex
+
+    index = MetricIndex()
+    temperature = index.get("spindle.temperature_c")
+    assert temperature == SCHEMA_METRICS.index("spindle.temperature_c")
+
+    columns, values = index.flatten(
+        {
+            "spindle": {"temperature_c": 41, "rpm": 9000.5, "state": "run"},
+            "probe": {"offset_mm": 0.25},
+        }
+    )
+    probe = index.get("probe.offset_mm")
+    assert probe == len(SCHEMA_METRICS)
+    assert dict(zip(columns, values)) == {
+        temperature: 41.0,
+        index.get("spindle.rpm"): 9000.5,
+        probe: 0.25,
+    }
+    # Ids are stable once assigned.
+    assert index.flatten({"probe": {"offset_mm": 1}}) == ([probe], [1.0])
+
+
+def test_index_is_bounded_and_counts_dropped_paths():
+    from metric_columns import SCHEMA_METRICS, MetricIndex
+
+    index = MetricIndex(extra=2)
+    junk = {f"junk_{n}": {"value": n, "label": "x"} for n in range(1000)}
+    columns, values = index.flatten({"spindle": {"rpm": 100}, **junk})
+
+    assert len(index) == len(SCHEMA_METRICS) + 2
+    assert index.dropped == 998
+    assert dict(zip(columns, values)) == {
+        index.get("spindle.rpm"): 100.0,
+        index.get("junk_0.value"): 0.0,
+        index.get("junk_1.value"): 1.0,
+    }
+    assert index.get("junk_2.value") is None
+    assert index.column("junk_2.value") is None
+    # Paths that never got a column leave nothing behind in the trie.
+    assert (
+        len(index._root.children) == len({p.split(".")[0] for p in SCHEMA_METRICS}) + 2
+    )
+
+
+def test_dotted_and_nested_keys_share_a_column():
+    from metric_columns import MetricIndex
+
+    for first, second in (
+        ({"probe.offset_mm": 1}, {"probe": {"offset_mm": 2}}),
+        ({"probe": {"offset_mm": 1}}, {"probe.offset_mm": 2}),
+    ):
+        index = MetricIndex()
+        one, _ = index.flatten(first)
+        two, _ = index.flatten(second)
+        assert one == two == [index.get("probe.offset_mm")]
+        assert index.flatten({"spindle.rpm": 5}) == ([index.get("spindle.rpm")], [5.0])
+
+
+def test_store_metric_series_is_a_column_slice_over_the_ring():
+    from models import Telemetry
+    from store import InMemoryStore
+
+    store = InMemoryStore()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for second in range(8):
+        data = {"spindle": {"temperature_c": 30.0 + second}}
+        if second % 3 == 0:
+            data = {"spindle": {"rpm": 1000.0}, "extra": {"value": second}}
+        store.add_telemetry(
+            Telemetry(
+                timestamp=start + timedelta(seconds=second),
+                machine_id="CNC-001",
+                data=data,
+            ),
+            max_items=5,
+        )
+
+    series = store.metric_series("CNC-001", "spindle.temperature_c")
+    assert series == [
+        (start + timedelta(seconds=second), 30.0 + second) for second in (4, 5, 7)
+    ]
+    assert store.metric_series("CNC-001", "extra.value") == [
+        (start + timedelta(seconds=second), float(second)) for second in (3, 6)
+    ]
+    assert store.metric_series("CNC-001", "unknown.metric") == []
+    assert store.metric_series("CNC-404", "spindle.temperature_c") == []
+
+
+def test_rollup_frames_matches_per_series_rollup():
+    from dt_shared.rollup import rollup
+    from metric_columns import METRICS, rollup_frames
+    from models import Telemetry
+    from store import InMemoryStore
+
+    store = InMemoryStore()
+    start = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+    for machine, offset in (("CNC-001", 0.0), ("CNC-002", 5.0)):
+        for second in range(0, 150, 7):
+            data = {"spindle": {"temperature_c": 40.0 + offset + second % 11}}
+            if second % 2:
+                data["coolant"] = {"flow_l_min": 9.0 - second / 100}
+            store.add_telemetry(
+                Telemetry(
+                    timestamp=start + timedelta(seconds=second + offset),
+                    machine_id=machine,
+                    data=data,
+                )
+            )
+    metrics = ["spindle.temperature_c", "coolant.flow_l_min", "unknown.metric"]
+    columns = [METRICS.get(metric) for metric in metrics]
+    frames = [store.metric_frame(m, columns) for m in ("CNC-001", "CNC-002")]
+
+    result = rollup_frames(frames, len(metrics), "1min")
+    for j, metric in enumerate(metrics):
+        got = [
+            (owner, start_s, count, low, high, total / count)
+            for owner, start_s, count, low, high, total in zip(
+                result.owner.tolist(),
+                result.bucket_start.tolist(),
+                result.count[:, j].tolist(),
+                result.min_value[:, j].tolist(),
+                result.max_value[:, j].tolist(),
+                result.total[:, j].tolist(),
+            )
+            if count
+        ]
+        expected = [
+            (owner, int(b.bucket_start.timestamp()), b.count)
+            + (b.min_value, b.max_value, b.avg_value)
+            for owner, machine in enumerate(("CNC-001", "CNC-002"))
+            for b in rollup(store.metric_series(machine, metric), "1min")
+        ]
+        assert got == expected
+    assert result.count[:, 2].sum() == 0
+    empty = rollup_frames([], len(metrics), "5min")
+    assert empty.owner.size == 0
+    assert empty.count.shape == (0, len(metrics))
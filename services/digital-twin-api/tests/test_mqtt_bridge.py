@@ -0,0 +1,280 @@
+import gzip
+import json
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+
+
+def _matches(pattern, topic):
+    pattern_parts, topic_parts = pattern.split("/"), topic.split("/")
+    for index, part in enumerate(pattern_parts):
+        if part == "#":
+            return True
+        if index >= len(topic_parts) or part not in ("+", topic_parts[index]):
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+class FakeBroker:
+    """In-process broker delivering messages synchronously to subscribers."""
+
+    def __init__(self):
+        self.clients = []
+
+    def client(self):
+        client = FakeBrokerClient(self)
+        self.clients.append(client)
+        return client
+
+    def publish(self, topic, payload):
+        for client in self.clients:
+            if client.connected and any(
+                _matches(pattern, topic) for pattern in client.subscriptions
+            ):
+                message = SimpleNamespace(topic=topic, payload=payload)
+                client.on_message(client, None, message)
+
+
+class FakeBrokerClient:
+    def __init__(self, broker):
+        self.broker = broker
+        self.connected = False
+        self.subscriptions = []
+        self.on_connect = None
+        self.on_message = None
+
+    def connect(self, host, port, keepalive=60):
+        self.connected = True
+        self.on_connect(self, None, {}, 0, None)
+
+    def subscribe(self, topic, qos=0):
+        self.subscriptions.append(topic)
+
+    def disconnect(self):
+        self.connected = False
+
+
+def _sample(machine_id, seconds, temperature=40.0):
+    timestamp = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "machine_id": machine_id,
+        "spindle": {"rpm": 12000.0, "temperature_c": temperature},
+    }
+
+
+def test_bridge_ingests_wildcard_topics_in_micro_batches():
+    from mqtt_bridge import MQTTBridge
+    from store import InMemoryStore
+
+    broker = FakeBroker()
+    store = InMemoryStore()
+    batches = []
+    bridge = MQTTBridge(
+        store=store,
+        sinks=[batches.append],
+        client_factory=broker.client,
+        workers=3,
+        batch_size=50,
+        batch_max_delay_s=0.05,
+    )
+    bridge.start()
+    assert broker.clients[0].subscriptions == [
+        "dt/cnc/+/telemetry",
+        "dt/cnc/+/telemetry/batch",
+    ]
+
+    for second in range(100):
+        for machine_id in ("CNC-001", "CNC-002"):
+            sample = _sample(machine_id, second)
+            broker.publish(
+                f"dt/cnc/{machine_id}/telemetry", json.dumps(sample).encode()
+            )
+    gateway_batch = [_sample("CNC-003", second) for second in range(100)]
+    broker.publish(
+        "dt/cnc/gateway/telemetry/batch",
+        gzip.compress(json.dumps(gateway_batch).encode()),
+    )
+    broker.publish("dt/cnc/other/status", b"{}")
+    bridge.stop()
+
+    assert sum(len(batch) for batch in batches) == 300
+    assert len(batches) < 300 / 10
+    for machine_id in ("CNC-001", "CNC-002", "CNC-003"):
+        history = store.history(machine_id)
+        assert len(history) == 100
+        assert [t.timestamp for t in history] == sorted(t.timestamp for t in history)
+        assert history[-1].data["spindle"]["rpm"] == 12000.0
+        assert store.get_machine(machine_id) is not None
+
+    stats = bridge.stats()
+    assert stats["received"] == 201
+    assert stats["samples"] == 300
+    assert stats["dropped"] == stats["decode_errors"] == 0
+    gateway = stats["topics"]["dt/cnc/gateway/telemetry/batch"]
+    assert gateway["messages"] == 1 and gateway["samples"] == 100
+    assert stats["topics"]["dt/cnc/CNC-001/telemetry"]["lag_s"] > 0
+
+
+def test_bridge_applies_backpressure_and_counts_bad_messages():
+    from mqtt_bridge import MQTTBridge
+    from store import InMemoryStore
+
+    release = threading.Event()
+    flushed = []
+
+    def slow_sink(batch):
+        release.wait(timeout=5)
+        flushed.extend(batch)
+
+    broker = FakeBroker()
+    bridge = MQTTBridge(
+        store=InMemoryStore(),
+        sinks=[slow_sink],
+        client_factory=broker.client,
+        workers=1,
+        batch_size=1,
+        queue_size=2,
+        enqueue_timeout_s=0.01,
+    )
+    bridge.start()
+    topic = "dt/cnc/CNC-001/telemetry"
+    broker.publish(topic, b"not json")
+    for second in range(10):
+        broker.publish(topic, json.dumps(_sample("CNC-001", second)).encode())
+    release.set()
+    bridge.stop()
+
+    stats = bridge.stats()
+    assert stats["decode_errors"] == 1
+    assert stats["dropped"] > 0
+    assert len(flushed) == 10 - stats["dropped"]
+    assert stats["queued"] == 0
+
+
+def test_bridge_forwards_only_stored_samples():
+    from mqtt_bridge import MQTTBridge
+    from store import InMemoryStore
+
+    broker = FakeBroker()
+    batches = []
+    bridge = MQTTBridge(
+        store=InMemoryStore(),
+        sinks=[batches.append],
+        client_factory=broker.client,
+        workers=1,
+        batch_size=10,
+    )
+    bridge.start()
+    invalid = {"timestamp": "not a time", "machine_id": "CNC-001"}
+    batch = [_sample("CNC-001", 0), invalid, _sample("CNC-001", 1)]
+    broker.publish("dt/cnc/gateway/telemetry/batch", json.dumps(batch).encode())
+    broker.publish("dt/cnc/gateway/telemetry/batch", json.dumps([invalid]).encode())
+    bridge.stop()
+
+    assert batches == [[batch[0], batch[2]]]
+    assert bridge.stats()["decode_errors"] == 2
+
+
+def test_store_writes_from_bridge_threads_are_consistent():
+    from models import Telemetry
+    from store import InMemoryStore
+
+    store = InMemoryStore()
+
+    def write(offset):
+        for second in range(300):
+            sample = _sample("CNC-001", offset + second)
+            store.add_telemetry(
+                Telemetry(
+                    timestamp=sample["timestamp"],
+                    machine_id="CNC-001",
+                    data={"spindle": sample["spindle"]},
+                ),
+                max_items=50,
+            )
+            store.metric_series("CNC-001", "spindle.temperature_c")
+
+    threads = [threading.Thread(target=write, args=(i * 1000,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.history("CNC-001")) == 50
+    assert len(store.metric_series("CNC-001", "spindle.temperature_c")) == 50
+    assert len(store.metric_rings) == 1
+
+
+def test_predictive_maintenance_sink_posts_spindle_readings():
+    from mqtt_bridge import predictive_maintenance_sink
+
+    posted = []
+
+    class FakeClient:
+        def post(self, path, json):
+            posted.append((path, json))
+            return SimpleNamespace(raise_for_status=lambda: None)
+
+    sink = predictive_maintenance_sink("http://pm", client=FakeClient())
+    sample = _sample("CNC-001", 0)
+    sample["spindle"]["vibration_mm_s"] = 1.5
+    sink([sample, _sample("CNC-002", 0)])
+    sink([_sample("CNC-002", 1)])
+
+    assert posted == [
+        (
+            "/telemetry",
+            {
+                "samples": [
+                    {
+                        "machine_id": "CNC-001",
+                        "timestamp": sample["timestamp"],
+                        "vibration_mm_s": 1.5,
+                        "temperature_c": 40.0,
+                    }
+                ]
+            },
+        )
+    ]
+
+
+def test_api_exposes_bridge_stats_and_alerts_on_overheat(monkeypatch):
+    import asyncio
+
+    import main
+
+    disabled = asyncio.run(main.mqtt_ingest_stats(x_api_key="dev-key"))
+    assert disabled.data == {"enabled": False}
+
+    sent = []
+
+    async def fake_send_alert(**payload):
+        sent.append(payload)
+        return {"status": "sent"}
+
+    monkeypatch.setattr(main.service_client, "send_alert", fake_send_alert)
+
+    async def scenario():
+        sink = main._alert_sink(asyncio.get_running_loop())
+        sink([_sample("CNC-009", 0, temperature=95.0), _sample("CNC-010", 0)])
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert [alert["machine_id"] for alert in sent] == ["CNC-009"]
+    assert sent[0]["severity"] == "critical"
+
+
+def test_decode_payload_accepts_shared_binary_batches():
+    from dt_shared.telemetry import Telemetry, encode_binary
+    from mqtt_bridge import decode_payload
+
+    sample = Telemetry.example()
+    decoded = decode_payload(encode_binary([sample, sample]))
+
+    assert decoded == [sample.model_dump(mode="json")] * 2
@@ -0,0 +1,140 @@
+import multiprocessing
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+
+START = datetime(2026, 2, 4, tzinfo=timezone.utc)
+
+
+def _sample(machine_id, index):
+    from models import Telemetry
+
+    return Telemetry(
+        timestamp=START + timedelta(seconds=index),
+        machine_id=machine_id,
+        data={"index": index, "spindle": {"rpm": 1000.0 + index}},
+    )
+
+
+def test_workers_share_one_view_of_telemetry():
+    from models import Machine
+    from shm_store import SharedMemoryStore
+
+    name = f"dt-test-{uuid.uuid4().hex[:8]}"
+    writer = SharedMemoryStore(name=name, max_machines=4, history_size=5)
+    reader = SharedMemoryStore(name=name, max_machines=4, history_size=5)
+    try:
+        writer.add_machine(Machine(id="CNC-001", name="Mill", location="Hall 1"))
+        for index in range(8):
+            writer.add_telemetry(_sample("CNC-001", index))
+        writer.add_telemetry(_sample("CNC-002", 0))
+
+        assert [m.id for m in reader.list_machines()] == ["CNC-001", "CNC-002"]
+        assert reader.get_machine("CNC-001").location == "Hall 1"
+        # The ring keeps the newest ``history_size`` samples, oldest first.
+        assert [t.data["index"] for t in reader.history("CNC-001")] == [3, 4, 5, 6, 7]
+        assert reader.latest_telemetry("CNC-001").data["index"] == 7
+        assert reader.history("CNC-404") == []
+
+        with pytest.raises(ValueError):
+            writer.add_telemetry(
+                _sample("CNC-001", 0).model_copy(update={"data": {"blob": "x" * 4096}})
+            )
+        with pytest.raises(RuntimeError):
+            SharedMemoryStore(name=name, max_machines=8, history_size=5)
+        assert writer.try_lead()
+    finally:
+        reader.close()
+        writer.unlink()
+        writer.close()
+
+
+def test_metric_reads_use_stored_columns():
+    from metric_columns import METRICS
+    from shm_store import SharedMemoryStore
+
+    name = f"dt-test-{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryStore(name=name, max_machines=2, history_size=4)
+    try:
+        for index in range(6):
+            store.add_telemetry(_sample("CNC-001", index))
+        rpm = [(START + timedelta(seconds=i), 1000.0 + i) for i in range(2, 6)]
+
+        assert store.metric_series("CNC-001", "spindle.rpm") == rpm
+        # ``index`` is not a schema metric, so it is read from the JSON records.
+        assert store.metric_series("CNC-001", "index") == [
+            (START + timedelta(seconds=i), float(i)) for i in range(2, 6)
+        ]
+        seconds, values = store.metric_frame(
+            "CNC-001", [METRICS.get("spindle.rpm"), None]
+        )
+        assert seconds.tolist() == [START.timestamp() + i for i in range(2, 6)]
+        assert values[:, 0].tolist() == [value for _, value in rpm]
+        assert np.isnan(values[:, 1]).all()
+        assert store.metric_series("CNC-404", "spindle.rpm") == []
+    finally:
+        store.unlink()
+        store.close()
+
+
+def test_reads_give_up_on_a_crashed_writer_until_the_next_write():
+    from shm_store import _SEQ, SharedMemoryStore, ShmReadError
+
+    name = f"dt-test-{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryStore(name=name, max_machines=2, history_size=4)
+    try:
+        store.add_telemetry(_sample("CNC-001", 0))
+        # A writer that died between its two counter updates.
+        offset = store._machine_offset(0)
+        _SEQ.pack_into(store._buf, offset, _SEQ.unpack_from(store._buf, offset)[0] + 1)
+
+        with pytest.raises(ShmReadError):
+            store.history("CNC-001")
+        store.add_telemetry(_sample("CNC-001", 1))
+        assert [t.data["index"] for t in store.history("CNC-001")] == [0, 1]
+    finally:
+        store.unlink()
+        store.close()
+
+
+def test_readers_never_see_torn_records_while_another_process_writes():
+    from shm_store import SharedMemoryStore
+
+    name = f"dt-test-{uuid.uuid4().hex[:8]}"
+    reader = SharedMemoryStore(name=name, max_machines=2, history_size=16)
+    total = 2000
+
+    def write():
+        writer = SharedMemoryStore(name=name, max_machines=2, history_size=16)
+        for index in range(total):
+            writer.add_telemetry(_sample("CNC-001", index))
+        writer.close()
+
+    process = multiprocessing.get_context("fork").Process(target=write)
+    process.start()
+    try:
+        last = -1
+        while process.is_alive() or last < total - 1:
+            items = reader.history("CNC-001")
+            indexes = [t.data["index"] for t in items]
+            assert indexes == sorted(indexes)
+            for item in items:
+                assert item.data["spindle"]["rpm"] == 1000.0 + item.data["index"]
+            if indexes:
+                assert indexes[-1] >= last
+                last = indexes[-1]
+            for timestamp, rpm in reader.metric_series("CNC-001", "spindle.rpm"):
+                assert rpm == 1000.0 + (timestamp - START).total_seconds()
+        process.join()
+        assert process.exitcode == 0
+        assert last == total - 1
+    finally:
+        reader.unlink()
+        reader.close()
@@ -1,38 +1,78 @@
-"""Train a simple linear regression model for tool RUL (demo stub)."""
+"""Train the tool RUL regression model and write a versioned artifact."""
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
 from pathlib import Path
 
 import numpy as np
 from sklearn.linear_model import LinearRegression
 
-DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "tool_rul_sample.csv"
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT_DIR / "data" / "tool_rul_sample.csv"
+OUTPUT_PATH = ROOT_DIR / "artifacts" / "tool_rul_model.json"
+FEATURES = ("wear_percent", "runtime_minutes", "cutting_speed_m_min")
+TARGET = "minutes_remaining"
+
+
+def load_dataset(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    with path.open() as fh:
+        rows = list(csv.DictReader(fh))
+    X = np.array([[float(r[name]) for name in FEATURES] for r in rows])
+    y = np.array([float(r[TARGET]) for r in rows])
+    return X, y
+
+
+def build_artifact(model: LinearRegression, X: np.ndarray, y: np.ndarray) -> dict:
+    residuals = model.predict(X) - y
+    coefficients = [float(c) for c in model.coef_]
+    intercept = float(model.intercept_)
+    digest = hashlib.sha256(
+        json.dumps([coefficients, intercept, X.tolist(), y.tolist()]).encode()
+    ).hexdigest()
+    trained_at = datetime.now(timezone.utc)
+    return {
+        "kind": "linear",
+        "version": f"{trained_at:%Y%m%d%H%M%S}-{digest[:8]}",
+        "trained_at": trained_at.isoformat(),
+        "features": list(FEATURES),
+        "coefficients": coefficients,
+        "intercept": intercept,
+        "metrics": {
+            "rows": int(len(y)),
+            "rmse": float(np.sqrt(np.mean(residuals**2))),
+            "mae": float(np.mean(np.abs(residuals))),
+        },
+    }
+
+
+def write_artifact(artifact: dict, output: Path) -> None:
+    # Write then rename so a serving process never reads a partial file.
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(output.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(artifact, indent=2) + "\n")
+    os.replace(tmp_path, output)
 
 
 def main() -> None:
-    rows = []
-    with DATA_PATH.open() as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            rows.append(row)
-
-    X = np.array(
-        [
-            [
-                float(r["wear_percent"]),
-                float(r["runtime_minutes"]),
-                float(r["cutting_speed_m_min"]),
-            ]
-            for r in rows
-        ]
-    )
-    y = np.array([float(r["minutes_remaining"]) for r in rows])
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args()
 
+    X, y = load_dataset(args.data)
     model = LinearRegression().fit(X, y)
-    print("coefficients:", model.coef_)
-    print("intercept:", model.intercept_)
+    artifact = build_artifact(model, X, y)
+    write_artifact(artifact, args.output)
+    print(f"wrote {args.output} (version {artifact['version']})")
+    print("coefficients:", artifact["coefficients"])
+    print("intercept:", artifact["intercept"])
+    print("metrics:", artifact["metrics"])
 
 
 if __name__ == "__main__":
@@ -14,3 +14,10 @@ class PredictorConfig:
     max_tool_life_minutes: float = float(os.getenv("PM_MAX_TOOL_LIFE_MIN", "300"))
     spindle_temp_limit_c: float = float(os.getenv("PM_SPINDLE_TEMP_LIMIT", "80"))
     spindle_vibration_limit: float = float(os.getenv("PM_SPINDLE_VIBRATION_LIMIT", "6"))
+    trend_window_size: int = int(os.getenv("PM_TREND_WINDOW_SIZE", "120"))
+    prediction_history_size: int = int(os.getenv("PM_PREDICTION_HISTORY_SIZE", "100"))
+    prediction_spill_path: str | None = os.getenv("PM_PREDICTION_SPILL_PATH")
+    schedule_cache_size: int = int(os.getenv("PM_SCHEDULE_CACHE_SIZE", "1024"))
+    schedule_cache_ttl_s: float = float(os.getenv("PM_SCHEDULE_CACHE_TTL_S", "30"))
+    tool_rul_model_path: str | None = os.getenv("PM_TOOL_RUL_MODEL_PATH")
+    model_reload_interval_s: float = float(os.getenv("PM_MODEL_RELOAD_INTERVAL_S", "5"))
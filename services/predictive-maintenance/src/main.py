@@ -2,26 +2,58 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import List
 
-from fastapi import FastAPI
+from config import PredictorConfig
+from dt_shared.instrumentation import Instrumentation
+from fastapi import FastAPI, HTTPException
 from models import (
+    FleetPlanRequest,
+    FleetPlanResponse,
+    MachineTrendResponse,
     MaintenanceScheduleResponse,
     PredictionRecord,
     SpindleHealthRequest,
     SpindleHealthResponse,
+    TelemetrySampleBatch,
     ToolRULRequest,
     ToolRULResponse,
 )
+from planner import plan_fleet_maintenance
+from prediction_history import PredictionHistory
 from predictor import (
     build_maintenance_schedule,
     predict_spindle_health,
     predict_tool_rul,
 )
+from rul_model import DEFAULT_MODEL_PATH, ToolRULModelStore
+from schedule_cache import ScheduleCache
+from telemetry_state import MachineTelemetryState, TelemetryStateStore
 
 app = FastAPI(title="Predictive Maintenance Service", version="0.1.0")
+instrumentation = Instrumentation()
+instrumentation.instrument_app(app)
 
-_recent_predictions: List[PredictionRecord] = []
+_config = PredictorConfig()
+_model_store = ToolRULModelStore(
+    path=_config.tool_rul_model_path or DEFAULT_MODEL_PATH,
+    check_interval_s=_config.model_reload_interval_s,
+)
+_telemetry_state = TelemetryStateStore(window_size=_config.trend_window_size)
+_schedule_cache = ScheduleCache(
+    max_entries=_config.schedule_cache_size, ttl_s=_config.schedule_cache_ttl_s
+)
+
+_prediction_history = PredictionHistory(
+    max_per_machine=_config.prediction_history_size,
+    spill_path=_config.prediction_spill_path,
+)
+instrumentation.track_cache("schedule", _schedule_cache.stats)
+instrumentation.track_size("telemetry_machines", lambda: len(_telemetry_state))
+instrumentation.track_size(
+    "prediction_history_machines", _prediction_history.machine_count
+)
 
 
 @app.get("/health")
@@ -31,7 +63,28 @@ async def health() -> dict:
 
 @app.get("/ready")
 async def ready() -> dict:
-    return {"status": "ready"}
+    return {"status": "ready", "tool_rul_model": _model_store.version}
+
+
+@app.post("/telemetry")
+async def ingest_telemetry(batch: TelemetrySampleBatch) -> List[MachineTrendResponse]:
+    updated: dict[str, MachineTelemetryState] = {}
+    for sample in batch.samples:
+        updated[sample.machine_id] = _telemetry_state.update(
+            machine_id=sample.machine_id,
+            timestamp=sample.timestamp,
+            vibration_mm_s=sample.vibration_mm_s,
+            temperature_c=sample.temperature_c,
+        )
+    return [_trend_response(machine_id, state) for machine_id, state in updated.items()]
+
+
+@app.get("/telemetry/{machine_id}/trend")
+async def telemetry_trend(machine_id: str) -> MachineTrendResponse:
+    state = _telemetry_state.get(machine_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="No telemetry for machine")
+    return _trend_response(machine_id, state)
 
 
 @app.post("/predict/tool-rul")
@@ -41,8 +94,9 @@ async def predict_tool(req: ToolRULRequest) -> ToolRULResponse:
         runtime_minutes=req.runtime_minutes,
         cutting_speed_m_min=req.cutting_speed_m_min,
         machine_id=req.machine_id,
+        model=_model_store.get(),
     )
-    _recent_predictions.append(
+    _prediction_history.add(
         PredictionRecord(
             machine_id=req.machine_id,
             result_type="tool_rul",
@@ -54,13 +108,28 @@ async def predict_tool(req: ToolRULRequest) -> ToolRULResponse:
 
 @app.post("/predict/spindle-health")
 async def predict_spindle(req: SpindleHealthRequest) -> SpindleHealthResponse:
+    state = _telemetry_state.get(req.machine_id)
+    vibration = req.vibration_mm_s
+    temperature = req.temperature_c
+    trend_slope = req.trend_slope
+    if state is not None:
+        vibration = state.vibration_mm_s if vibration is None else vibration
+        temperature = state.temperature_c if temperature is None else temperature
+        trend_slope = state.trend_slope if trend_slope is None else trend_slope
+    if vibration is None or temperature is None:
+        # Nothing stored to fill in from, so the request itself is incomplete.
+        raise HTTPException(
+            status_code=422,
+            detail="vibration_mm_s and temperature_c are required: "
+            "no telemetry stored for machine",
+        )
     result = predict_spindle_health(
         machine_id=req.machine_id,
-        vibration_mm_s=req.vibration_mm_s,
-        temperature_c=req.temperature_c,
-        trend_slope=req.trend_slope,
+        vibration_mm_s=vibration,
+        temperature_c=temperature,
+        trend_slope=trend_slope or 0.0,
     )
-    _recent_predictions.append(
+    _prediction_history.add(
         PredictionRecord(
             machine_id=req.machine_id,
             result_type="spindle_health",
@@ -72,20 +141,40 @@ async def predict_spindle(req: SpindleHealthRequest) -> SpindleHealthResponse:
 
 @app.post("/predict/maintenance-schedule")
 async def predict_schedule(req: ToolRULRequest) -> MaintenanceScheduleResponse:
-    tool_rul = predict_tool_rul(
+    model = _model_store.get()
+    state = _telemetry_state.get(req.machine_id)
+    vibration = state.vibration_mm_s if state else 1.0
+    temperature = state.temperature_c if state else 40.0
+    trend_slope = state.trend_slope if state else 0.0
+    now = datetime.now(timezone.utc)
+    cache_key = _schedule_cache.key(
+        machine_id=req.machine_id,
+        model_version=model.version if model else None,
         wear_percent=req.wear_percent,
         runtime_minutes=req.runtime_minutes,
         cutting_speed_m_min=req.cutting_speed_m_min,
-        machine_id=req.machine_id,
+        vibration_mm_s=vibration,
+        temperature_c=temperature,
+        trend_slope=trend_slope,
     )
-    spindle = predict_spindle_health(
-        machine_id=req.machine_id,
-        vibration_mm_s=1.0,
-        temperature_c=40.0,
-        trend_slope=0.0,
-    )
-    schedule = build_maintenance_schedule(req.machine_id, tool_rul, spindle)
-    _recent_predictions.append(
+    schedule = _schedule_cache.get(cache_key, now)
+    if schedule is None:
+        tool_rul = predict_tool_rul(
+            wear_percent=req.wear_percent,
+            runtime_minutes=req.runtime_minutes,
+            cutting_speed_m_min=req.cutting_speed_m_min,
+            machine_id=req.machine_id,
+            model=model,
+        )
+        spindle = predict_spindle_health(
+            machine_id=req.machine_id,
+            vibration_mm_s=vibration,
+            temperature_c=temperature,
+            trend_slope=trend_slope,
+        )
+        schedule = build_maintenance_schedule(req.machine_id, tool_rul, spindle, now)
+        _schedule_cache.put(cache_key, schedule)
+    _prediction_history.add(
         PredictionRecord(
             machine_id=req.machine_id,
             result_type="maintenance_schedule",
@@ -95,6 +184,35 @@ async def predict_schedule(req: ToolRULRequest) -> MaintenanceScheduleResponse:
     return schedule
 
 
+@app.post("/plan/fleet")
+async def plan_fleet(req: FleetPlanRequest) -> FleetPlanResponse:
+    return plan_fleet_maintenance(req)
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    return {"schedule": _schedule_cache.stats()}
+
+
 @app.get("/predictions/{machine_id}")
-async def predictions(machine_id: str) -> List[PredictionRecord]:
-    return [p for p in _recent_predictions if p.machine_id == machine_id][-100:]
+async def predictions(
+    machine_id: str, limit: int = 100, archived: bool = False
+) -> List[PredictionRecord]:
+    recent = _prediction_history.recent(machine_id, limit)
+    if archived and len(recent) < limit:
+        older = _prediction_history.archived(machine_id, limit - len(recent))
+        return older + recent
+    return recent
+
+
+def _trend_response(
+    machine_id: str, state: MachineTelemetryState
+) -> MachineTrendResponse:
+    return MachineTrendResponse(
+        machine_id=machine_id,
+        samples=state.samples,
+        last_timestamp=state.last_timestamp,
+        vibration_mm_s=state.vibration_mm_s,
+        temperature_c=state.temperature_c,
+        trend_slope=state.trend_slope,
+    )
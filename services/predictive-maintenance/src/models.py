@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class ToolRULRequest(BaseModel):
@@ -29,9 +29,9 @@ class SpindleHealthRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     machine_id: str
-    vibration_mm_s: float = Field(..., ge=0)
-    temperature_c: float = Field(..., ge=0)
-    trend_slope: float = Field(0.0)
+    vibration_mm_s: Optional[float] = Field(None, ge=0)
+    temperature_c: Optional[float] = Field(None, ge=0)
+    trend_slope: Optional[float] = None
 
 
 class SpindleHealthResponse(BaseModel):
@@ -42,6 +42,32 @@ class SpindleHealthResponse(BaseModel):
     days_to_maintenance: float = Field(..., ge=0)
 
 
+class TelemetrySample(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    machine_id: str
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    vibration_mm_s: float = Field(..., ge=0)
+    temperature_c: float = Field(..., ge=0)
+
+
+class TelemetrySampleBatch(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    samples: List[TelemetrySample]
+
+
+class MachineTrendResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    machine_id: str
+    samples: int
+    last_timestamp: Optional[datetime] = None
+    vibration_mm_s: float
+    temperature_c: float
+    trend_slope: float
+
+
 class MaintenancePrediction(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -51,6 +77,16 @@ class MaintenancePrediction(BaseModel):
     estimated_time: str
     confidence: float = Field(..., ge=0, le=1)
 
+    @field_validator("estimated_time")
+    @classmethod
+    def _iso_utc(cls, value: str) -> str:
+        # Planning subtracts this from aware times: require ISO 8601 and take
+        # a naive time as UTC.
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc).isoformat()
+        return value
+
 
 class MaintenanceScheduleResponse(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -60,6 +96,64 @@ class MaintenanceScheduleResponse(BaseModel):
     predictions: List[MaintenancePrediction]
 
 
+class FleetPlanRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    schedules: List[MaintenanceScheduleResponse]
+    technicians: int = Field(..., ge=1)
+    shift_start: Optional[datetime] = None
+    shift_hours: float = Field(8.0, gt=0, le=24)
+    shift_count: int = Field(3, ge=1)
+    task_minutes: Dict[str, float] = Field(
+        default_factory=lambda: {"Tool": 15.0, "Spindle Bearings": 60.0}
+    )
+    default_task_minutes: float = Field(30.0, gt=0)
+
+    @field_validator("shift_start")
+    @classmethod
+    def _assume_utc(cls, value: datetime | None) -> datetime | None:
+        # Due times are timezone-aware, so a naive start is taken as UTC.
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class PlannedTask(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    machine_id: str
+    component: str
+    action: str
+    urgency: Literal["low", "medium", "high"]
+    confidence: float = Field(..., ge=0, le=1)
+    technician: int = Field(..., ge=0)
+    shift: int = Field(..., ge=0)
+    start: datetime
+    end: datetime
+    due: datetime
+    late: bool
+
+
+class UnscheduledTask(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    machine_id: str
+    component: str
+    action: str
+    urgency: Literal["low", "medium", "high"]
+    due: datetime
+    reason: Literal["capacity", "exceeds_shift", "after_horizon"]
+
+
+class FleetPlanResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    assignments: List[PlannedTask]
+    unscheduled: List[UnscheduledTask]
+    utilization: float = Field(..., ge=0, le=1)
+
+
 class PredictionRecord(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
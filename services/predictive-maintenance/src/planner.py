@@ -0,0 +1,125 @@
+"""Capacity-aware maintenance planning across a machine fleet."""
+
+from __future__ import annotations
+
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from models import (
+    FleetPlanRequest,
+    FleetPlanResponse,
+    MaintenancePrediction,
+    PlannedTask,
+    UnscheduledTask,
+)
+
+_URGENCY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# (urgency rank, due seconds, -confidence, sequence, machine_id, prediction)
+_TaskEntry = Tuple[int, float, float, int, str, MaintenancePrediction]
+
+
+def plan_fleet_maintenance(
+    request: FleetPlanRequest, now: datetime | None = None
+) -> FleetPlanResponse:
+    """Greedily pack maintenance tasks into technician shifts.
+
+    Tasks are taken from a priority queue ordered by urgency, then due time,
+    then confidence. Each one goes to the technician who frees up first
+    (a second heap), moving to the next shift when it would overrun the
+    current one. Tasks due after the planning horizon are deferred. Cost is
+    O(T log T + T log K) for T tasks and K technicians.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    horizon_start = request.shift_start or now
+    shift_s = request.shift_hours * 3600.0
+    horizon_s = shift_s * request.shift_count
+
+    tasks: List[_TaskEntry] = []
+    sequence = 0
+    for schedule in request.schedules:
+        for prediction in schedule.predictions:
+            due = datetime.fromisoformat(prediction.estimated_time)
+            tasks.append(
+                (
+                    _URGENCY_RANK[prediction.urgency],
+                    (due - horizon_start).total_seconds(),
+                    -prediction.confidence,
+                    sequence,
+                    schedule.machine_id,
+                    prediction,
+                )
+            )
+            sequence += 1
+    heapq.heapify(tasks)
+
+    technicians: List[Tuple[float, int]] = [
+        (0.0, tech) for tech in range(request.technicians)
+    ]
+    busy_s = 0.0
+    assignments: List[PlannedTask] = []
+    unscheduled: List[UnscheduledTask] = []
+
+    while tasks:
+        _, due_s, _, _, machine_id, prediction = heapq.heappop(tasks)
+        duration_s = 60.0 * request.task_minutes.get(
+            prediction.component, request.default_task_minutes
+        )
+        if due_s >= horizon_s and prediction.urgency == "low":
+            unscheduled.append(_unscheduled(machine_id, prediction, "after_horizon"))
+            continue
+        if duration_s > shift_s:
+            unscheduled.append(_unscheduled(machine_id, prediction, "exceeds_shift"))
+            continue
+
+        free_s, tech = technicians[0]
+        shift = int(free_s // shift_s)
+        start_s = free_s
+        if start_s + duration_s > (shift + 1) * shift_s:
+            shift += 1
+            start_s = shift * shift_s
+        if shift >= request.shift_count:
+            unscheduled.append(_unscheduled(machine_id, prediction, "capacity"))
+            continue
+
+        end_s = start_s + duration_s
+        heapq.heapreplace(technicians, (end_s, tech))
+        busy_s += duration_s
+        assignments.append(
+            PlannedTask(
+                machine_id=machine_id,
+                component=prediction.component,
+                action=prediction.action,
+                urgency=prediction.urgency,
+                confidence=prediction.confidence,
+                technician=tech,
+                shift=shift,
+                start=horizon_start + timedelta(seconds=start_s),
+                end=horizon_start + timedelta(seconds=end_s),
+                due=datetime.fromisoformat(prediction.estimated_time),
+                late=end_s > due_s,
+            )
+        )
+
+    capacity_s = horizon_s * request.technicians
+    return FleetPlanResponse(
+        generated_at=now,
+        assignments=assignments,
+        unscheduled=unscheduled,
+        utilization=min(1.0, busy_s / capacity_s),
+    )
+
+
+def _unscheduled(
+    machine_id: str, prediction: MaintenancePrediction, reason: str
+) -> UnscheduledTask:
+    return UnscheduledTask(
+        machine_id=machine_id,
+        component=prediction.component,
+        action=prediction.action,
+        urgency=prediction.urgency,
+        due=datetime.fromisoformat(prediction.estimated_time),
+        reason=reason,
+    )
@@ -0,0 +1,89 @@
+"""Bounded per-machine prediction history with optional disk spill."""
+
+from __future__ import annotations
+
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO, Deque, Dict, List
+
+from models import PredictionRecord
+
+
+@dataclass
+class PredictionHistory:
+    """Keep the newest predictions per machine in fixed-size rings.
+
+    Records are appended in arrival order, so each ring is time-ordered and
+    the last ``k`` records are read in O(k). When ``spill_path`` is set,
+    records evicted from a full ring are appended to that file as JSON
+    lines instead of being discarded.
+    """
+
+    max_per_machine: int = 100
+    spill_path: Path | None = None
+
+    _rings: Dict[str, Deque[PredictionRecord]] = field(default_factory=dict, init=False)
+    _spill: IO[str] | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if self.spill_path is not None:
+            self.spill_path = Path(self.spill_path)
+
+    def add(self, record: PredictionRecord) -> None:
+        ring = self._rings.get(record.machine_id)
+        if ring is None:
+            ring = deque(maxlen=self.max_per_machine)
+            self._rings[record.machine_id] = ring
+        if self.spill_path is not None and len(ring) == ring.maxlen:
+            self._write_spill(ring[0])
+        ring.append(record)
+
+    def recent(
+        self, machine_id: str, limit: int | None = None
+    ) -> List[PredictionRecord]:
+        ring = self._rings.get(machine_id)
+        if not ring:
+            return []
+        if limit is None or limit >= len(ring):
+            return list(ring)
+        if limit <= 0:
+            return []
+        newest_first = list(islice(reversed(ring), limit))
+        newest_first.reverse()
+        return newest_first
+
+    def archived(self, machine_id: str, limit: int) -> List[PredictionRecord]:
+        """Return up to ``limit`` spilled records for a machine, oldest first."""
+
+        if self.spill_path is None or limit <= 0:
+            return []
+        if self._spill is not None:
+            self._spill.flush()
+        if not self.spill_path.exists():
+            return []
+        matches: Deque[PredictionRecord] = deque(maxlen=limit)
+        needle = f'"machine_id":{json.dumps(machine_id)}'
+        with self.spill_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                if needle in line:
+                    record = PredictionRecord.model_validate_json(line)
+                    if record.machine_id == machine_id:
+                        matches.append(record)
+        return list(matches)
+
+    def machine_count(self) -> int:
+        return len(self._rings)
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _write_spill(self, record: PredictionRecord) -> None:
+        if self._spill is None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = self.spill_path.open("a", encoding="utf-8")
+        self._spill.write(record.model_dump_json() + "\n")
@@ -11,6 +11,7 @@ from models import (
     SpindleHealthResponse,
     ToolRULResponse,
 )
+from rul_model import ToolRULModel
 
 
 def predict_tool_rul(
@@ -19,15 +20,21 @@ def predict_tool_rul(
     cutting_speed_m_min: float,
     machine_id: str = "",
     config: PredictorConfig | None = None,
+    model: ToolRULModel | None = None,
 ) -> ToolRULResponse:
     cfg = config or PredictorConfig()
     wear_factor = max(0.0, min(100.0, wear_percent)) / 100.0
-    speed_factor = max(0.0, cutting_speed_m_min) / 300.0
-    base_life = cfg.max_tool_life_minutes * cfg.safety_factor
-    consumed = (
-        (runtime_minutes * 0.6) + (wear_factor * base_life) + (speed_factor * 20.0)
-    )
-    remaining = max(0.0, base_life - consumed)
+    if model is not None:
+        remaining = max(
+            0.0, model.predict(wear_percent, runtime_minutes, cutting_speed_m_min)
+        )
+    else:
+        speed_factor = max(0.0, cutting_speed_m_min) / 300.0
+        base_life = cfg.max_tool_life_minutes * cfg.safety_factor
+        consumed = (
+            (runtime_minutes * 0.6) + (wear_factor * base_life) + (speed_factor * 20.0)
+        )
+        remaining = max(0.0, base_life - consumed)
     confidence = max(0.3, 1.0 - wear_factor)
     return ToolRULResponse(
         machine_id=machine_id, minutes_remaining=remaining, confidence=confidence
@@ -60,8 +67,9 @@ def build_maintenance_schedule(
     machine_id: str,
     tool_rul: ToolRULResponse,
     spindle_health: SpindleHealthResponse,
+    now: datetime | None = None,
 ) -> MaintenanceScheduleResponse:
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
     predictions = []
 
     tool_urgency = (
@@ -98,4 +106,6 @@ def build_maintenance_schedule(
         )
     )
 
-    return MaintenanceScheduleResponse(machine_id=machine_id, predictions=predictions)
+    return MaintenanceScheduleResponse(
+        machine_id=machine_id, generated_at=now, predictions=predictions
+    )
@@ -0,0 +1,118 @@
+"""Trained tool RUL model artifacts and hot-swappable serving."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+FEATURES = ("wear_percent", "runtime_minutes", "cutting_speed_m_min")
+DEFAULT_MODEL_PATH = (
+    Path(__file__).resolve().parents[1] / "artifacts" / "tool_rul_model.json"
+)
+
+
+@dataclass(frozen=True)
+class ToolRULModel:
+    """Linear tool RUL model compiled to a coefficient dot product."""
+
+    version: str
+    coefficients: tuple[float, float, float]
+    intercept: float
+
+    @classmethod
+    def from_artifact(cls, artifact: dict) -> "ToolRULModel":
+        kind = artifact.get("kind")
+        if kind != "linear":
+            raise ValueError(f"Unsupported tool RUL model kind: {kind!r}")
+        features = tuple(artifact["features"])
+        if features != FEATURES:
+            raise ValueError(f"Unexpected feature order: {features}")
+        wear, runtime, speed = (float(c) for c in artifact["coefficients"])
+        return cls(
+            version=str(artifact["version"]),
+            coefficients=(wear, runtime, speed),
+            intercept=float(artifact["intercept"]),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ToolRULModel":
+        with Path(path).open() as fh:
+            return cls.from_artifact(json.load(fh))
+
+    def predict(
+        self, wear_percent: float, runtime_minutes: float, cutting_speed_m_min: float
+    ) -> float:
+        wear, runtime, speed = self.coefficients
+        return (
+            self.intercept
+            + wear * wear_percent
+            + runtime * runtime_minutes
+            + speed * cutting_speed_m_min
+        )
+
+    def predict_batch(self, rows: Sequence[Sequence[float]]) -> np.ndarray:
+        """Predict many feature rows ordered as ``FEATURES`` at once."""
+
+        features = np.asarray(rows, dtype=float).reshape(-1, len(FEATURES))
+        return features @ np.asarray(self.coefficients) + self.intercept
+
+
+@dataclass
+class ToolRULModelStore:
+    """Hold the active model and hot-swap it when the artifact changes.
+
+    The artifact is loaded once on construction. ``get`` re-checks the file
+    modification time at most every ``check_interval_s`` seconds, so the
+    request path normally costs a single clock read.
+    """
+
+    path: Path = DEFAULT_MODEL_PATH
+    check_interval_s: float = 5.0
+
+    _model: ToolRULModel | None = field(default=None, init=False)
+    _mtime_ns: int | None = field(default=None, init=False)
+    _next_check: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        self.path = Path(self.path)
+        self.reload()
+
+    @property
+    def version(self) -> str | None:
+        return self._model.version if self._model else None
+
+    def get(self) -> ToolRULModel | None:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval_s
+            self.reload()
+        return self._model
+
+    def reload(self) -> bool:
+        """Load the artifact if it changed on disk; return True on swap."""
+
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._mtime_ns:
+            return False
+        self._mtime_ns = mtime_ns
+        try:
+            model = ToolRULModel.load(self.path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Keep serving the previous model if a new artifact is broken.
+            LOG.exception("Failed to load tool RUL model from %s", self.path)
+            return False
+        self._model = model
+        LOG.info("Loaded tool RUL model %s", model.version)
+        return True
@@ -0,0 +1,122 @@
+"""LRU/TTL cache for maintenance schedules keyed on quantized inputs."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, List, Tuple
+
+from models import MaintenancePrediction, MaintenanceScheduleResponse
+
+ScheduleKey = Tuple[Hashable, ...]
+
+
+@dataclass(frozen=True)
+class _CachedSchedule:
+    expires_at: float
+    machine_id: str
+    # Predictions with their estimated_time stored relative to generation.
+    predictions: Tuple[Tuple[MaintenancePrediction, timedelta], ...]
+
+
+@dataclass
+class ScheduleCache:
+    """Memoize schedules for inputs that differ only by sensor noise.
+
+    Inputs are snapped to fixed steps before being used as the key, so
+    dashboards polling with effectively identical readings share an entry.
+    Estimated times are cached as offsets from generation and re-based on
+    every hit, keeping absolute timestamps correct for the caller.
+    """
+
+    max_entries: int = 1024
+    ttl_s: float = 30.0
+    wear_step: float = 0.5
+    runtime_step: float = 1.0
+    speed_step: float = 5.0
+    vibration_step: float = 0.05
+    temperature_step: float = 0.5
+    slope_step: float = 0.01
+    clock: Callable[[], float] = time.monotonic
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    _entries: OrderedDict[ScheduleKey, _CachedSchedule] = field(
+        default_factory=OrderedDict, init=False
+    )
+
+    def key(
+        self,
+        *,
+        machine_id: str,
+        model_version: str | None,
+        wear_percent: float,
+        runtime_minutes: float,
+        cutting_speed_m_min: float,
+        vibration_mm_s: float,
+        temperature_c: float,
+        trend_slope: float,
+    ) -> ScheduleKey:
+        return (
+            machine_id,
+            model_version,
+            round(wear_percent / self.wear_step),
+            round(runtime_minutes / self.runtime_step),
+            round(cutting_speed_m_min / self.speed_step),
+            round(vibration_mm_s / self.vibration_step),
+            round(temperature_c / self.temperature_step),
+            round(trend_slope / self.slope_step),
+        )
+
+    def get(
+        self, key: ScheduleKey, now: datetime
+    ) -> MaintenanceScheduleResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self.clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        predictions: List[MaintenancePrediction] = [
+            prediction.model_copy(update={"estimated_time": (now + offset).isoformat()})
+            for prediction, offset in entry.predictions
+        ]
+        return MaintenanceScheduleResponse(
+            machine_id=entry.machine_id, generated_at=now, predictions=predictions
+        )
+
+    def put(self, key: ScheduleKey, schedule: MaintenanceScheduleResponse) -> None:
+        generated_at = schedule.generated_at
+        self._entries[key] = _CachedSchedule(
+            expires_at=self.clock() + self.ttl_s,
+            machine_id=schedule.machine_id,
+            predictions=tuple(
+                (
+                    prediction,
+                    datetime.fromisoformat(prediction.estimated_time) - generated_at,
+                )
+                for prediction in schedule.predictions
+            ),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,130 @@
+"""Per-machine rolling telemetry state for server-side trend computation."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict
+
+_SECONDS_PER_HOUR = 3600.0
+
+
+@dataclass
+class RollingTrend:
+    """Least-squares slope over a sliding window, updated in O(1).
+
+    The regression sums are maintained incrementally as samples enter and
+    leave the window. X values are kept relative to an origin that is
+    re-based (with an exact recompute of the sums) once per full window
+    turnover, which bounds floating point drift at amortised O(1) cost.
+    """
+
+    window_size: int = 120
+
+    _points: Deque[tuple[float, float]] = field(default_factory=deque, init=False)
+    _origin: float = field(default=0.0, init=False)
+    _sum_x: float = field(default=0.0, init=False)
+    _sum_y: float = field(default=0.0, init=False)
+    _sum_xx: float = field(default=0.0, init=False)
+    _sum_xy: float = field(default=0.0, init=False)
+    _evictions: int = field(default=0, init=False)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def push(self, x: float, y: float) -> None:
+        if not self._points:
+            self._origin = x
+        if len(self._points) >= self.window_size:
+            old_x, old_y = self._points.popleft()
+            self._accumulate(old_x, old_y, -1.0)
+            self._evictions += 1
+        self._points.append((x, y))
+        self._accumulate(x, y, 1.0)
+        if self._evictions >= self.window_size:
+            self._rebase()
+
+    def slope(self) -> float:
+        n = len(self._points)
+        if n < 2:
+            return 0.0
+        denom = n * self._sum_xx - self._sum_x * self._sum_x
+        if denom <= 1e-12:
+            return 0.0
+        return (n * self._sum_xy - self._sum_x * self._sum_y) / denom
+
+    def _accumulate(self, x: float, y: float, sign: float) -> None:
+        dx = x - self._origin
+        self._sum_x += sign * dx
+        self._sum_y += sign * y
+        self._sum_xx += sign * dx * dx
+        self._sum_xy += sign * dx * y
+
+    def _rebase(self) -> None:
+        self._origin = self._points[0][0]
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+        for x, y in self._points:
+            self._accumulate(x, y, 1.0)
+        self._evictions = 0
+
+
+@dataclass
+class MachineTelemetryState:
+    """Latest spindle readings and vibration trend for one machine."""
+
+    window_size: int = 120
+    last_timestamp: datetime | None = None
+    vibration_mm_s: float = 0.0
+    temperature_c: float = 0.0
+    samples: int = 0
+    vibration_trend: RollingTrend = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.vibration_trend = RollingTrend(window_size=self.window_size)
+
+    def update(
+        self, timestamp: datetime, vibration_mm_s: float, temperature_c: float
+    ) -> None:
+        # Slope is expressed in mm/s of vibration per hour.
+        self.vibration_trend.push(
+            timestamp.timestamp() / _SECONDS_PER_HOUR, vibration_mm_s
+        )
+        self.last_timestamp = timestamp
+        self.vibration_mm_s = vibration_mm_s
+        self.temperature_c = temperature_c
+        self.samples += 1
+
+    @property
+    def trend_slope(self) -> float:
+        return self.vibration_trend.slope()
+
+
+@dataclass
+class TelemetryStateStore:
+    """Rolling telemetry state keyed by machine id."""
+
+    window_size: int = 120
+    _machines: Dict[str, MachineTelemetryState] = field(
+        default_factory=dict, init=False
+    )
+
+    def update(
+        self,
+        machine_id: str,
+        timestamp: datetime,
+        vibration_mm_s: float,
+        temperature_c: float,
+    ) -> MachineTelemetryState:
+        state = self._machines.get(machine_id)
+        if state is None:
+            state = MachineTelemetryState(window_size=self.window_size)
+            self._machines[machine_id] = state
+        state.update(timestamp, vibration_mm_s, temperature_c)
+        return state
+
+    def get(self, machine_id: str) -> MachineTelemetryState | None:
+        return self._machines.get(machine_id)
+
+    def __len__(self) -> int:
+        return len(self._machines)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+START = datetime(2026, 2, 4, 6, 0, tzinfo=timezone.utc)
+
+
+def _schedule(machine_id, tool_minutes, spindle_days, urgency="high"):
+    from models import MaintenancePrediction, MaintenanceScheduleResponse
+
+    return MaintenanceScheduleResponse(
+        machine_id=machine_id,
+        generated_at=START,
+        predictions=[
+            MaintenancePrediction(
+                component="Tool",
+                action="Replace",
+                urgency=urgency,
+                estimated_time=(START + timedelta(minutes=tool_minutes)).isoformat(),
+                confidence=0.8,
+            ),
+            MaintenancePrediction(
+                component="Spindle Bearings",
+                action="Inspect",
+                urgency="low",
+                estimated_time=(START + timedelta(days=spindle_days)).isoformat(),
+                confidence=0.7,
+            ),
+        ],
+    )
+
+
+def test_plan_orders_by_urgency_and_respects_capacity():
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    request = FleetPlanRequest(
+        schedules=[
+            _schedule("CNC-001", 120, 10, urgency="medium"),
+            _schedule("CNC-002", 20, 0.1),
+        ],
+        technicians=1,
+        shift_start=START,
+        shift_hours=1,
+        shift_count=2,
+    )
+    plan = plan_fleet_maintenance(request, now=START)
+
+    first = plan.assignments[0]
+    assert (first.machine_id, first.component) == ("CNC-002", "Tool")
+    assert first.start == START
+    starts = [(a.technician, a.start, a.end) for a in plan.assignments]
+    for (_, _, end), (_, start, _) in zip(starts, starts[1:]):
+        assert start >= end
+    assert all(a.end <= START + timedelta(hours=2) for a in plan.assignments)
+    reasons = {(u.machine_id, u.component): u.reason for u in plan.unscheduled}
+    assert reasons[("CNC-001", "Spindle Bearings")] == "after_horizon"
+
+
+def test_plan_moves_overrunning_task_to_next_shift():
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    request = FleetPlanRequest(
+        schedules=[_schedule(f"CNC-{i:03d}", 10, 0.01) for i in range(3)],
+        technicians=1,
+        shift_start=START,
+        shift_hours=1.5,
+        shift_count=4,
+    )
+    plan = plan_fleet_maintenance(request, now=START)
+
+    bearing_tasks = [a for a in plan.assignments if a.component == "Spindle Bearings"]
+    assert [a.shift for a in bearing_tasks] == [1, 2, 3]
+    assert bearing_tasks[0].start == START + timedelta(hours=1.5)
+    assert any(a.late for a in plan.assignments)
+
+
+def test_plan_scales_to_thousands_of_machines():
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    request = FleetPlanRequest(
+        schedules=[
+            _schedule(f"CNC-{i:05d}", i % 600, (i % 40) / 10) for i in range(5000)
+        ],
+        technicians=40,
+        shift_start=START,
+    )
+    started = time.perf_counter()
+    plan = plan_fleet_maintenance(request, now=START)
+    elapsed = time.perf_counter() - started
+
+    assert len(plan.assignments) + len(plan.unscheduled) == 10000
+    assert 0 < plan.utilization <= 1
+    assert elapsed < 0.5
+
+
+def test_plan_treats_naive_shift_start_as_utc():
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    request = FleetPlanRequest.model_validate(
+        {
+            "schedules": [_schedule("CNC-001", 30, 1).model_dump(mode="json")],
+            "technicians": 1,
+            "shift_start": "2026-02-04T06:00:00",
+        }
+    )
+    plan = plan_fleet_maintenance(request, now=START)
+
+    assert request.shift_start == START
+    assert plan.assignments[0].start == START
+
+
+def test_plan_treats_naive_due_time_as_utc_and_rejects_bad_ones():
+    import httpx
+    import main
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    schedule = _schedule("CNC-001", 30, 1).model_dump(mode="json")
+    schedule["predictions"][0]["estimated_time"] = "2026-02-04T06:30:00"
+    request = FleetPlanRequest.model_validate(
+        {"schedules": [schedule], "technicians": 1, "shift_start": START}
+    )
+    plan = plan_fleet_maintenance(request, now=START)
+    tool = next(a for a in plan.assignments if a.component == "Tool")
+    assert tool.due == START + timedelta(minutes=30)
+
+    schedule["predictions"][0]["estimated_time"] = "soon"
+
+    async def post():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post(
+                "/plan/fleet", json={"schedules": [schedule], "technicians": 1}
+            )
+
+    assert asyncio.run(post()).status_code == 422
+
+
+def test_plan_marks_task_finishing_after_its_due_time_late():
+    from models import FleetPlanRequest
+    from planner import plan_fleet_maintenance
+
+    # The 15 minute tool change starts at once but ends 5 minutes past due.
+    request = FleetPlanRequest(
+        schedules=[_schedule("CNC-001", 10, 1)], technicians=1, shift_start=START
+    )
+    plan = plan_fleet_maintenance(request, now=START)
+
+    tool = next(a for a in plan.assignments if a.component == "Tool")
+    assert tool.start == START
+    assert tool.late
+
+
+def test_plan_fleet_endpoint():
+    import main
+    from models import FleetPlanRequest
+
+    request = FleetPlanRequest(
+        schedules=[_schedule("CNC-001", 30, 1)], technicians=2, shift_start=START
+    )
+    plan = asyncio.run(main.plan_fleet(request))
+    assert plan.assignments
@@ -0,0 +1,58 @@
+import asyncio
+
+
+def _record(machine_id, index):
+    from models import PredictionRecord
+
+    return PredictionRecord(
+        machine_id=machine_id, result_type="tool_rul", payload={"index": index}
+    )
+
+
+def test_history_is_bounded_per_machine():
+    from prediction_history import PredictionHistory
+
+    history = PredictionHistory(max_per_machine=3)
+    for index in range(5):
+        history.add(_record("CNC-001", index))
+    history.add(_record("CNC-002", 0))
+
+    recent = history.recent("CNC-001")
+    assert [r.payload["index"] for r in recent] == [2, 3, 4]
+    assert [r.payload["index"] for r in history.recent("CNC-001", 2)] == [3, 4]
+    assert len(history.recent("CNC-002")) == 1
+    assert history.recent("CNC-404") == []
+
+
+def test_evicted_records_spill_to_file(tmp_path):
+    from prediction_history import PredictionHistory
+
+    spill = tmp_path / "predictions.jsonl"
+    history = PredictionHistory(max_per_machine=2, spill_path=spill)
+    for index in range(5):
+        history.add(_record("CNC-001", index))
+        history.add(_record("CNC-002", index))
+
+    archived = history.archived("CNC-001", limit=10)
+    assert [r.payload["index"] for r in archived] == [0, 1, 2]
+    assert [r.payload["index"] for r in history.archived("CNC-001", 1)] == [2]
+    history.close()
+    assert len(spill.read_text().splitlines()) == 6
+
+
+def test_predictions_endpoint_returns_latest():
+    import main
+    from models import ToolRULRequest
+
+    req = ToolRULRequest(
+        machine_id="HIST-001",
+        wear_percent=20,
+        runtime_minutes=60,
+        cutting_speed_m_min=150,
+    )
+    for _ in range(3):
+        asyncio.run(main.predict_tool(req))
+
+    records = asyncio.run(main.predictions("HIST-001", limit=2))
+    assert len(records) == 2
+    assert all(r.result_type == "tool_rul" for r in records)
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+
+def _write_artifact(path, version, intercept, mtime_ns=None):
+    path.write_text(
+        json.dumps(
+            {
+                "kind": "linear",
+                "version": version,
+                "features": ["wear_percent", "runtime_minutes", "cutting_speed_m_min"],
+                "coefficients": [-1.0, -0.5, -0.1],
+                "intercept": intercept,
+            }
+        )
+    )
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_model_predict_matches_batch(tmp_path):
+    from rul_model import ToolRULModel
+
+    artifact = tmp_path / "model.json"
+    _write_artifact(artifact, "v1", 300.0)
+    model = ToolRULModel.load(artifact)
+
+    single = model.predict(20, 60, 150)
+    assert single == pytest.approx(300.0 - 20.0 - 30.0 - 15.0)
+    batch = model.predict_batch([[20, 60, 150], [40, 60, 150]])
+    assert batch[0] == pytest.approx(single)
+    assert batch[1] < batch[0]
+
+
+def test_store_hot_swaps_changed_artifact(tmp_path):
+    from rul_model import ToolRULModelStore
+
+    artifact = tmp_path / "model.json"
+    _write_artifact(artifact, "v1", 300.0, mtime_ns=1_000_000_000)
+    store = ToolRULModelStore(path=artifact, check_interval_s=0.0)
+    assert store.version == "v1"
+
+    _write_artifact(artifact, "v2", 250.0, mtime_ns=2_000_000_000)
+    assert store.get().version == "v2"
+
+    artifact.write_text("{not json")
+    os.utime(artifact, ns=(3_000_000_000, 3_000_000_000))
+    assert store.get().version == "v2"
+
+
+def test_predict_tool_rul_uses_model(tmp_path):
+    from predictor import predict_tool_rul
+    from rul_model import ToolRULModel
+
+    artifact = tmp_path / "model.json"
+    _write_artifact(artifact, "v1", 300.0)
+    model = ToolRULModel.load(artifact)
+
+    result = predict_tool_rul(
+        wear_percent=20, runtime_minutes=60, cutting_speed_m_min=150, model=model
+    )
+    assert result.minutes_remaining == pytest.approx(235.0)
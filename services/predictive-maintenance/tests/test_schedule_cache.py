@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+
+def _schedule(now):
+    from predictor import (
+        build_maintenance_schedule,
+        predict_spindle_health,
+        predict_tool_rul,
+    )
+
+    tool = predict_tool_rul(
+        wear_percent=20, runtime_minutes=60, cutting_speed_m_min=150, machine_id="C1"
+    )
+    spindle = predict_spindle_health("C1", 1.0, 40.0, 0.0)
+    return build_maintenance_schedule("C1", tool, spindle, now)
+
+
+def _key(cache, wear=20.0, version="v1"):
+    return cache.key(
+        machine_id="C1",
+        model_version=version,
+        wear_percent=wear,
+        runtime_minutes=60,
+        cutting_speed_m_min=150,
+        vibration_mm_s=1.0,
+        temperature_c=40.0,
+        trend_slope=0.0,
+    )
+
+
+def test_cache_hit_rebases_estimated_time():
+    from schedule_cache import ScheduleCache
+
+    cache = ScheduleCache()
+    start = datetime(2026, 2, 4, 8, 0, tzinfo=timezone.utc)
+    original = _schedule(start)
+    cache.put(_key(cache), original)
+
+    later = start + timedelta(minutes=10)
+    cached = cache.get(_key(cache, wear=20.1), later)
+
+    assert cached is not None
+    assert cached.generated_at == later
+    for before, after in zip(original.predictions, cached.predictions):
+        shift = datetime.fromisoformat(after.estimated_time) - datetime.fromisoformat(
+            before.estimated_time
+        )
+        assert shift == timedelta(minutes=10)
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_misses_on_model_version_and_expiry():
+    from schedule_cache import ScheduleCache
+
+    clock = {"now": 0.0}
+    cache = ScheduleCache(ttl_s=5.0, clock=lambda: clock["now"])
+    now = datetime.now(timezone.utc)
+    cache.put(_key(cache), _schedule(now))
+
+    assert cache.get(_key(cache, version="v2"), now) is None
+    clock["now"] = 6.0
+    assert cache.get(_key(cache), now) is None
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 2,
+        "evictions": 0,
+        "size": 0,
+        "hit_ratio": 0.0,
+    }
+
+
+def test_cache_evicts_least_recently_used():
+    from schedule_cache import ScheduleCache
+
+    cache = ScheduleCache(max_entries=2)
+    now = datetime.now(timezone.utc)
+    for wear in (10.0, 20.0, 30.0):
+        cache.put(_key(cache, wear=wear), _schedule(now))
+
+    assert cache.get(_key(cache, wear=10.0), now) is None
+    assert cache.get(_key(cache, wear=30.0), now) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_schedule_endpoint_reports_cache_hits():
+    import main
+    from models import ToolRULRequest
+
+    req = ToolRULRequest(
+        machine_id="CACHE-001",
+        wear_percent=35,
+        runtime_minutes=90,
+        cutting_speed_m_min=160,
+    )
+    first = asyncio.run(main.predict_schedule(req))
+    second = asyncio.run(main.predict_schedule(req))
+
+    assert [p.component for p in first.predictions] == [
+        p.component for p in second.predictions
+    ]
+    stats = asyncio.run(main.cache_stats())["schedule"]
+    assert stats["hits"] >= 1
+
+
+def test_schedule_cache_stats_are_exported_as_metrics():
+    import main
+    from models import ToolRULRequest
+
+    request = ToolRULRequest(
+        machine_id="C1", wear_percent=20, runtime_minutes=60, cutting_speed_m_min=150
+    )
+    asyncio.run(main.predict_schedule(request))
+    asyncio.run(main.predict_schedule(request))
+
+    registry = main.instrumentation.registry
+    assert registry.get_sample_value("cache_hits_total", {"cache": "schedule"}) == 1
+    assert registry.get_sample_value("cache_misses_total", {"cache": "schedule"}) == 1
+    assert registry.get_sample_value("store_items", {"store": "schedule"}) == 1
+    assert any(getattr(route, "path", "") == "/metrics" for route in main.app.routes)
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def test_rolling_trend_matches_least_squares():
+    from telemetry_state import RollingTrend
+
+    trend = RollingTrend(window_size=5)
+    for x in range(20):
+        trend.push(float(x), 2.0 * x + 1.0)
+    assert len(trend) == 5
+    assert trend.slope() == pytest.approx(2.0)
+
+    for x in range(20, 25):
+        trend.push(float(x), 10.0)
+    assert trend.slope() == pytest.approx(0.0, abs=1e-9)
+
+
+def test_state_store_tracks_vibration_trend_per_hour():
+    from telemetry_state import TelemetryStateStore
+
+    store = TelemetryStateStore(window_size=10)
+    start = datetime(2026, 2, 4, 8, 0, tzinfo=timezone.utc)
+    for hour in range(4):
+        store.update("CNC-001", start + timedelta(hours=hour), 1.0 + 0.5 * hour, 40.0)
+
+    state = store.get("CNC-001")
+    assert state.samples == 4
+    assert state.vibration_mm_s == pytest.approx(2.5)
+    assert state.trend_slope == pytest.approx(0.5)
+    assert store.get("CNC-002") is None
+
+
+def test_spindle_health_uses_server_side_trend():
+    import main
+    from models import SpindleHealthRequest, TelemetrySample, TelemetrySampleBatch
+
+    start = datetime(2026, 2, 4, 8, 0, tzinfo=timezone.utc)
+    samples = [
+        TelemetrySample(
+            machine_id="TREND-001",
+            timestamp=start + timedelta(hours=hour),
+            vibration_mm_s=1.0 + 2.0 * hour,
+            temperature_c=50.0,
+        )
+        for hour in range(3)
+    ]
+    trends = asyncio.run(main.ingest_telemetry(TelemetrySampleBatch(samples=samples)))
+    assert trends[0].trend_slope == pytest.approx(2.0)
+
+    derived = asyncio.run(
+        main.predict_spindle(SpindleHealthRequest(machine_id="TREND-001"))
+    )
+    explicit = asyncio.run(
+        main.predict_spindle(
+            SpindleHealthRequest(
+                machine_id="TREND-001",
+                vibration_mm_s=5.0,
+                temperature_c=50.0,
+                trend_slope=2.0,
+            )
+        )
+    )
+    assert derived.health_score == pytest.approx(explicit.health_score)
+
+
+def test_spindle_health_without_readings_or_state_is_unprocessable():
+    import main
+    from fastapi import HTTPException
+    from models import SpindleHealthRequest
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(main.predict_spindle(SpindleHealthRequest(machine_id="NEW-001")))
+
+    assert exc_info.value.status_code == 422
@@ -0,0 +1 @@
+"""Code shared by the digital twin services."""
@@ -0,0 +1,23 @@
+"""Token check for operator-only endpoints."""
+
+from __future__ import annotations
+
+import hmac
+
+from fastapi import HTTPException
+
+# Request header carrying the admin token.
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+def require_admin_token(expected: str, provided: str | None) -> None:
+    """Raise 401 unless ``provided`` matches the configured ``expected`` token.
+
+    An empty ``expected`` token rejects every request. The comparison runs in
+    constant time so response timing does not leak the token.
+    """
+
+    if not expected or not hmac.compare_digest(
+        (provided or "").encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
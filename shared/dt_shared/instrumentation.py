@@ -0,0 +1,282 @@
+"""Prometheus instrumentation shared by every service."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, MutableMapping, Tuple
+
+from dt_shared.profiling import install_profiler, stage_timers
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    PlatformCollector,
+    ProcessCollector,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.openmetrics import exposition as openmetrics
+from prometheus_client.registry import Collector
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# Dense below 100 ms, where API latency targets live, so exemplars land in
+# buckets narrow enough to pick out the slow traces.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+UNMATCHED_ROUTE = "unmatched"
+# W3C trace ids are 32 lowercase hex digits and never all zeros.
+_TRACE_ID = re.compile(r"(?!0{32})[0-9a-f]{32}")
+
+
+def _trace_id(headers: list) -> str | None:
+    # W3C ``traceparent``: version-traceid-spanid-flags.
+    for name, value in headers:
+        if name == b"traceparent":
+            parts = value.decode("latin-1").split("-")
+            # Anything else would become an unbounded exemplar label.
+            if len(parts) == 4 and _TRACE_ID.fullmatch(parts[1]):
+                return parts[1]
+            return None
+    return None
+
+
+class Instrumentation:
+    """Request, downstream, size and event-loop metrics for one service.
+
+    Every service owns a separate ``CollectorRegistry`` (with process and
+    platform collectors), so importing a service twice never registers a
+    metric twice. ``instrument_app`` adds an ASGI middleware that times
+    each request by route template, tracks in-flight requests and, during
+    the app's lifespan, samples event-loop lag; it also mounts
+    ``/metrics``. Request latencies carry the ``traceparent`` trace id as
+    an exemplar, exposed when the scraper asks for OpenMetrics. Store sizes,
+    queue depths and cache counters are read from callbacks at scrape time,
+    so the hot path never updates them.
+    """
+
+    def __init__(self, registry: CollectorRegistry | None = None) -> None:
+        self.registry = registry or CollectorRegistry()
+        ProcessCollector(registry=self.registry)
+        PlatformCollector(registry=self.registry)
+        self.request_latency = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ["route", "method", "status"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.in_flight = Gauge(
+            "http_requests_in_flight",
+            "HTTP requests being served",
+            registry=self.registry,
+        )
+        self.downstream_latency = Histogram(
+            "downstream_request_duration_seconds",
+            "Latency of calls to other services",
+            ["target", "operation", "outcome"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.loop_lag = Histogram(
+            "event_loop_lag_seconds",
+            "Delay of a scheduled event-loop wakeup past its deadline",
+            buckets=LOOP_LAG_BUCKETS,
+            registry=self.registry,
+        )
+        self.sizes = Gauge(
+            "store_items",
+            "Items held by in-process stores, caches and queues",
+            ["store"],
+            registry=self.registry,
+        )
+        self._caches = _CacheCollector()
+        self.registry.register(self._caches)
+        self.registry.register(_StageCollector())
+
+    def instrument_app(self, app: Any, loop_lag_interval_s: float = 0.5) -> None:
+        """Add the metrics middleware, ``GET /metrics`` and the opt-in profiler."""
+
+        app.add_middleware(
+            MetricsMiddleware, instrumentation=self, loop_interval_s=loop_lag_interval_s
+        )
+        app.add_api_route(
+            "/metrics", self._metrics_endpoint, methods=["GET"], include_in_schema=False
+        )
+        install_profiler(app)
+
+    def track_size(self, store: str, measure: Callable[[], float]) -> None:
+        """Report ``measure()`` as ``store_items{store=...}`` at scrape time."""
+
+        self.sizes.labels(store).set_function(measure)
+
+    def track_cache(self, cache: str, stats: Callable[[], Dict[str, float]]) -> None:
+        """Export a cache's ``stats()`` (hits, misses, evictions, size)."""
+
+        self._caches.caches[cache] = stats
+        self.track_size(cache, lambda: stats()["size"])
+
+    @contextmanager
+    def downstream(self, target: str, operation: str) -> Iterator[None]:
+        """Time one call to another service, labelled by outcome."""
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.downstream_latency.labels(target, operation, outcome).observe(
+                time.perf_counter() - start
+            )
+
+    async def monitor_event_loop(self, interval_s: float = 0.5) -> None:
+        """Record how late each ``interval_s`` sleep wakes up, until cancelled."""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval_s)
+            self.loop_lag.observe(max(0.0, loop.time() - start - interval_s))
+
+    def render(self, accept: str = "") -> tuple[bytes, str]:
+        """Exposition body and content type (OpenMetrics if accepted)."""
+
+        if "application/openmetrics-text" in accept:
+            return (
+                openmetrics.generate_latest(self.registry),
+                openmetrics.CONTENT_TYPE_LATEST,
+            )
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+    async def _metrics_endpoint(self, request: Request) -> Response:
+        body, content_type = self.render(request.headers.get("accept", ""))
+        return Response(body, media_type=content_type)
+
+
+class _CacheCollector(Collector):
+    """Read hit/miss/eviction counters from caches at scrape time."""
+
+    COUNTERS = ("hits", "misses", "evictions")
+
+    def __init__(self) -> None:
+        self.caches: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def describe(self) -> Iterator[CounterMetricFamily]:
+        for counter in self.COUNTERS:
+            yield CounterMetricFamily(f"cache_{counter}", f"Cache {counter}")
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        families = {
+            counter: CounterMetricFamily(
+                f"cache_{counter}", f"Cache {counter}", labels=["cache"]
+            )
+            for counter in self.COUNTERS
+        }
+        for cache, stats in self.caches.items():
+            values = stats()
+            for counter, family in families.items():
+                family.add_metric([cache], values.get(counter, 0))
+        yield from families.values()
+
+
+class _StageCollector(Collector):
+    """Export the process-wide hot-path stage timers as one histogram."""
+
+    def describe(self) -> Iterator[HistogramMetricFamily]:
+        yield HistogramMetricFamily("stage_duration_seconds", "Hot-path stage time")
+
+    def collect(self) -> Iterator[HistogramMetricFamily]:
+        family = HistogramMetricFamily(
+            "stage_duration_seconds", "Hot-path stage time", labels=["stage"]
+        )
+        for timer in stage_timers():
+            family.add_metric([timer.name], list(timer.buckets()), timer.total_ns / 1e9)
+        yield family
+
+
+class MetricsMiddleware:
+    """Time requests as pure ASGI (no ``BaseHTTPMiddleware`` task per request)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        instrumentation: Instrumentation,
+        loop_interval_s: float = 0.5,
+    ) -> None:
+        self.app = app
+        self.instrumentation = instrumentation
+        self.loop_interval_s = loop_interval_s
+        # Label lookups take a lock; resolve each (route, method, status) once.
+        self._children: Dict[Tuple[str, str, int], Any] = {}
+        # A plain counter read at scrape time avoids a lock per request.
+        self._in_flight = 0
+        instrumentation.in_flight.set_function(lambda: self._in_flight)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(scope, receive, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._in_flight -= 1
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            key = (route, scope["method"], status)
+            histogram = self._children.get(key)
+            if histogram is None:
+                histogram = self._children[key] = (
+                    self.instrumentation.request_latency.labels(
+                        route, scope["method"], str(status)
+                    )
+                )
+            trace_id = _trace_id(scope["headers"])
+            histogram.observe(elapsed, {"trace_id": trace_id} if trace_id else None)
+
+    async def _lifespan(self, scope: Scope, receive: Receive, send: Send) -> None:
+        monitor = asyncio.create_task(
+            self.instrumentation.monitor_event_loop(self.loop_interval_s)
+        )
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            monitor.cancel()
@@ -0,0 +1,213 @@
+"""Hot-path stage timers and an on-demand sampling profiler."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Tuple
+
+from dt_shared.admin import require_admin_token
+from fastapi import Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the stage histogram buckets, in nanoseconds (1 us .. 1 s).
+STAGE_BUCKETS_NS: Tuple[int, ...] = tuple(
+    int(base * 10**exp) for exp in range(3, 9) for base in (1, 2.5, 5)
+) + (10**9,)
+
+MAX_PROFILE_SECONDS = 60.0
+
+
+class StageTimer:
+    """Histogram of one stage's wall time, kept as plain integer counters.
+
+    ``observe_ns`` is a bisect and two additions, cheap enough for per-sample
+    code; counts may lose an increment when several threads race on the
+    same stage, which is acceptable for diagnostics.
+    """
+
+    __slots__ = ("name", "counts", "total_ns")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts = [0] * (len(STAGE_BUCKETS_NS) + 1)
+        self.total_ns = 0
+
+    def observe_ns(self, elapsed_ns: int) -> None:
+        self.counts[bisect.bisect_left(STAGE_BUCKETS_NS, elapsed_ns)] += 1
+        self.total_ns += elapsed_ns
+
+    def buckets(self) -> Iterator[Tuple[str, int]]:
+        """Cumulative ``(le, count)`` pairs in seconds, ending with ``+Inf``."""
+
+        cumulative = 0
+        for bound, count in zip(STAGE_BUCKETS_NS, self.counts):
+            cumulative += count
+            yield repr(bound / 1e9), cumulative
+        yield "+Inf", cumulative + self.counts[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "total_s": self.total_ns / 1e9,
+            "mean_us": self.total_ns / count / 1e3 if count else 0.0,
+        }
+
+
+class Stopwatch:
+    """Split one call into consecutive stages.
+
+    Bind timers once at import (``_PARSE = stage_timer("svc.parse")``) and
+    call ``lap(_PARSE)`` as each stage ends, so the hot path does no name
+    formatting or dictionary lookups.
+    """
+
+    __slots__ = ("_last",)
+
+    def __init__(self) -> None:
+        self._last = time.perf_counter_ns()
+
+    def lap(self, timer: StageTimer) -> None:
+        now = time.perf_counter_ns()
+        timer.observe_ns(now - self._last)
+        self._last = now
+
+
+_STAGES: Dict[str, StageTimer] = {}
+_STAGES_LOCK = threading.Lock()
+
+
+def stage_timer(name: str) -> StageTimer:
+    """Process-wide timer for ``name`` (created on first use)."""
+
+    timer = _STAGES.get(name)
+    if timer is None:
+        with _STAGES_LOCK:
+            timer = _STAGES.setdefault(name, StageTimer(name))
+    return timer
+
+
+def stage_timers() -> List[StageTimer]:
+    return list(_STAGES.values())
+
+
+class SamplingProfiler:
+    """Sample every thread's Python stack at a fixed interval.
+
+    A background thread reads ``sys._current_frames()`` every
+    ``interval_s`` and counts identical stacks; the profiled code runs
+    unmodified, so the cost is the sampler's own time slices (about one
+    stack walk per thread per interval). Results are collapsed stacks
+    (``outer;inner count``), the input format of flamegraph tools.
+    """
+
+    def __init__(self, interval_s: float = 0.005) -> None:
+        if interval_s <= 0:
+            raise ValueError("interval_s must be positive")
+        self.interval_s = interval_s
+        self.samples = 0
+        self.stacks: Counter[Tuple[str, ...]] = Counter()
+
+    def run(self, duration_s: float) -> "SamplingProfiler":
+        own = threading.get_ident()
+        deadline = time.monotonic() + duration_s
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self.stacks[_stack(frame)] += 1
+            self.samples += 1
+            time.sleep(self.interval_s)
+        return self
+
+    def collapsed(self) -> str:
+        lines = [
+            f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def tree(self) -> Dict[str, Any]:
+        """Nested ``{name, value, children}`` flamegraph data (d3-flame-graph)."""
+
+        root: Dict[str, Any] = {"name": "all", "value": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            root["value"] += count
+            node = root
+            for frame in stack:
+                node = node["children"].setdefault(
+                    frame, {"name": frame, "value": 0, "children": {}}
+                )
+                node["value"] += count
+        return _listify(root)
+
+
+def _stack(frame: Any) -> Tuple[str, ...]:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        frames.append(f"{code.co_qualname} ({filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _listify(node: Dict[str, Any]) -> Dict[str, Any]:
+    children = sorted(node["children"].values(), key=lambda child: -child["value"])
+    return {
+        "name": node["name"],
+        "value": node["value"],
+        "children": [_listify(child) for child in children],
+    }
+
+
+def install_profiler(app: Any) -> bool:
+    """Mount ``GET /admin/profile`` when ``PROFILER_ENABLED`` is set.
+
+    Requests must send ``PROFILER_TOKEN`` in ``x-admin-token``; without a
+    token configured the endpoint is not mounted. One profile runs at a time;
+    it samples in a worker thread, so the service keeps handling the live
+    traffic being profiled.
+    """
+
+    enabled = os.getenv("PROFILER_ENABLED", "false").lower() in {"1", "true", "yes"}
+    if not enabled:
+        return False
+    token = os.getenv("PROFILER_TOKEN", "")
+    if not token:
+        logger.warning("PROFILER_ENABLED is set without PROFILER_TOKEN; not mounted")
+        return False
+    running = asyncio.Lock()
+
+    async def profile(
+        seconds: float = Query(5.0, gt=0, le=MAX_PROFILE_SECONDS),
+        interval_ms: float = Query(5.0, ge=1, le=1000),
+        output: str = Query("collapsed", alias="format", pattern="^(collapsed|json)$"),
+        x_admin_token: str | None = Header(default=None),
+    ) -> Any:
+        require_admin_token(token, x_admin_token)
+        if running.locked():
+            raise HTTPException(status_code=409, detail="A profile is already running")
+        async with running:
+            profiler = SamplingProfiler(interval_s=interval_ms / 1000.0)
+            await asyncio.to_thread(profiler.run, seconds)
+        if output == "json":
+            return {
+                "samples": profiler.samples,
+                "interval_ms": interval_ms,
+                "flamegraph": profiler.tree(),
+                "stages": {t.name: t.snapshot() for t in stage_timers()},
+            }
+        return PlainTextResponse(profiler.collapsed())
+
+    app.add_api_route(
+        "/admin/profile", profile, methods=["GET"], include_in_schema=False
+    )
+    return True
@@ -0,0 +1,63 @@
+"""Fixed-window rollups of one metric series, usable in-process.
+
+data-aggregator serves these over HTTP for arbitrary point sets;
+digital-twin-api calls ``rollup`` directly on a machine's stored history
+instead of shipping it to data-aggregator as JSON.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Literal, NamedTuple, Tuple
+
+Window = Literal["1min", "5min", "1hour"]
+
+WINDOW_SECONDS: Dict[str, int] = {
+    "1min": 60,
+    "5min": 300,
+    "1hour": 3600,
+}
+
+
+class Rollup(NamedTuple):
+    """Summary of the points of one series falling into one window."""
+
+    bucket_start: datetime
+    count: int
+    min_value: float
+    max_value: float
+    avg_value: float
+
+
+def rollup(points: Iterable[Tuple[datetime, float]], window: Window) -> List[Rollup]:
+    """Bucket ``(timestamp, value)`` points of one series, oldest bucket first.
+
+    Points may arrive in any order. Raises ``KeyError`` for unknown windows.
+    """
+
+    size = WINDOW_SECONDS[window]
+    # floored epoch second -> [count, min, max, total, tzinfo]
+    acc: Dict[int, list] = {}
+    for timestamp, value in points:
+        seconds = int(timestamp.timestamp())
+        key = seconds - seconds % size
+        bucket = acc.get(key)
+        if bucket is None:
+            acc[key] = [1, value, value, value, timestamp.tzinfo]
+            continue
+        bucket[0] += 1
+        if value < bucket[1]:
+            bucket[1] = value
+        elif value > bucket[2]:
+            bucket[2] = value
+        bucket[3] += value
+    return [
+        Rollup(
+            bucket_start=datetime.fromtimestamp(key, tz=tzinfo),
+            count=count,
+            min_value=low,
+            max_value=high,
+            avg_value=total / count,
+        )
+        for key, (count, low, high, total, tzinfo) in sorted(acc.items())
+    ]
@@ -0,0 +1,427 @@
+"""Telemetry schema shared by the simulator and the services.
+
+One pydantic model tree describes a CNC sample. Besides JSON, samples have
+a compact binary encoding (``encode_binary`` / ``decode_binary``) for hops
+between services: fixed-width little-endian numbers, enum codes and short
+length-prefixed strings, about a third of the JSON size.
+"""
+
+from __future__ import annotations
+
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Literal, Tuple, get_args
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from pydantic_core import to_json
+
+ToolType = Literal["end_mill", "drill", "tap", "boring_bar"]
+MachineMode = Literal["AUTO", "MDI", "JOG", "REF"]
+
+
+class SpindleTelemetry(BaseModel):
+    """Spindle-related telemetry metrics."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    rpm: float = Field(0.0, ge=0, le=24000)
+    load_percent: float = Field(0.0, ge=0, le=100)
+    temperature_c: float = Field(20.0, ge=0, le=120)
+    vibration_mm_s: float = Field(0.0, ge=0, le=20)
+
+
+class AxisState(BaseModel):
+    """Axis position and velocity state."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    position_mm: float = 0.0
+    velocity_mm_min: float = 0.0
+
+
+class AxesTelemetry(BaseModel):
+    """X/Y/Z axes telemetry."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    x: AxisState
+    y: AxisState
+    z: AxisState
+
+
+class ToolTelemetry(BaseModel):
+    """Tool state and wear telemetry."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    type: ToolType
+    diameter_mm: float = Field(..., gt=0)
+    wear_percent: float = Field(0.0, ge=0, le=100)
+    runtime_minutes: float = Field(0.0, ge=0)
+
+
+class CoolantTelemetry(BaseModel):
+    """Coolant system telemetry."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    flow_rate_lpm: float = Field(0.0, ge=0, le=20)
+    temperature_c: float = Field(20.0, ge=0, le=60)
+    pressure_bar: float = Field(0.0, ge=0, le=10)
+
+
+class PowerTelemetry(BaseModel):
+    """Power consumption telemetry."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    total_kw: float = Field(0.0, ge=0)
+    spindle_kw: float = Field(0.0, ge=0)
+    servo_kw: float = Field(0.0, ge=0)
+
+
+class StatusTelemetry(BaseModel):
+    """Machine status telemetry."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    mode: MachineMode
+    program: str
+    block: str
+    cycle_time_s: int = Field(0, ge=0)
+
+
+class Telemetry(BaseModel):
+    """Full telemetry payload for a CNC machine."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    timestamp: datetime
+    machine_id: str
+    spindle: SpindleTelemetry
+    axes: AxesTelemetry
+    tool: ToolTelemetry
+    coolant: CoolantTelemetry
+    power: PowerTelemetry
+    status: StatusTelemetry
+
+    @classmethod
+    def example(cls) -> "Telemetry":
+        """Return a realistic example telemetry snapshot."""
+
+        return cls(
+            timestamp=datetime.now(timezone.utc),
+            machine_id="CNC-001",
+            spindle=SpindleTelemetry(
+                rpm=12000, load_percent=45.2, temperature_c=38.5, vibration_mm_s=0.8
+            ),
+            axes=AxesTelemetry(
+                x=AxisState(position_mm=150.234, velocity_mm_min=5000),
+                y=AxisState(position_mm=75.891, velocity_mm_min=5000),
+                z=AxisState(position_mm=-25.5, velocity_mm_min=2000),
+            ),
+            tool=ToolTelemetry(
+                id="T01",
+                type="end_mill",
+                diameter_mm=10,
+                wear_percent=23.5,
+                runtime_minutes=145,
+            ),
+            coolant=CoolantTelemetry(
+                flow_rate_lpm=12.5, temperature_c=22.3, pressure_bar=4.2
+            ),
+            power=PowerTelemetry(total_kw=8.5, spindle_kw=5.2, servo_kw=2.8),
+            status=StatusTelemetry(
+                mode="AUTO", program="O1234", block="N0150", cycle_time_s=234
+            ),
+        )
+
+
+# Trusted fast path: the simulator produces a flat tuple per sample in this
+# order and serializes it straight to JSON bytes, with no model objects.
+# (``model_construct`` is no shortcut: it is slower than validation.)
+TELEMETRY_ROW_FIELDS: Tuple[str, ...] = (
+    "timestamp",
+    "machine_id",
+    "spindle.rpm",
+    "spindle.load_percent",
+    "spindle.temperature_c",
+    "spindle.vibration_mm_s",
+    "axes.x.position_mm",
+    "axes.x.velocity_mm_min",
+    "axes.y.position_mm",
+    "axes.y.velocity_mm_min",
+    "axes.z.position_mm",
+    "axes.z.velocity_mm_min",
+    "tool.id",
+    "tool.type",
+    "tool.diameter_mm",
+    "tool.wear_percent",
+    "tool.runtime_minutes",
+    "coolant.flow_rate_lpm",
+    "coolant.temperature_c",
+    "coolant.pressure_bar",
+    "power.total_kw",
+    "power.spindle_kw",
+    "power.servo_kw",
+    "status.mode",
+    "status.program",
+    "status.block",
+    "status.cycle_time_s",
+)
+
+
+def telemetry_row_json(row: tuple) -> bytes:
+    """Encode a ``TELEMETRY_ROW_FIELDS`` tuple as compact JSON bytes.
+
+    The nested dict is serialized by pydantic-core's JSON encoder without
+    any validation; the output matches ``Telemetry.model_dump_json``.
+    """
+
+    return to_json(telemetry_row_payload(row))
+
+
+def telemetry_row_payload(row: tuple) -> dict:
+    """Nested telemetry dict for a ``TELEMETRY_ROW_FIELDS`` tuple."""
+
+    (
+        timestamp,
+        machine_id,
+        rpm,
+        load_percent,
+        spindle_temp,
+        vibration,
+        x_pos,
+        x_vel,
+        y_pos,
+        y_vel,
+        z_pos,
+        z_vel,
+        tool_id,
+        tool_type,
+        diameter,
+        wear,
+        runtime,
+        flow,
+        coolant_temp,
+        pressure,
+        total_kw,
+        spindle_kw,
+        servo_kw,
+        mode,
+        program,
+        block,
+        cycle_time_s,
+    ) = row
+    return {
+        "timestamp": timestamp,
+        "machine_id": machine_id,
+        "spindle": {
+            "rpm": rpm,
+            "load_percent": load_percent,
+            "temperature_c": spindle_temp,
+            "vibration_mm_s": vibration,
+        },
+        "axes": {
+            "x": {"position_mm": x_pos, "velocity_mm_min": x_vel},
+            "y": {"position_mm": y_pos, "velocity_mm_min": y_vel},
+            "z": {"position_mm": z_pos, "velocity_mm_min": z_vel},
+        },
+        "tool": {
+            "id": tool_id,
+            "type": tool_type,
+            "diameter_mm": diameter,
+            "wear_percent": wear,
+            "runtime_minutes": runtime,
+        },
+        "coolant": {
+            "flow_rate_lpm": flow,
+            "temperature_c": coolant_temp,
+            "pressure_bar": pressure,
+        },
+        "power": {
+            "total_kw": total_kw,
+            "spindle_kw": spindle_kw,
+            "servo_kw": servo_kw,
+        },
+        "status": {
+            "mode": mode,
+            "program": program,
+            "block": block,
+            "cycle_time_s": cycle_time_s,
+        },
+    }
+
+
+def telemetry_from_row(row: tuple) -> Telemetry:
+    """Validate a row into ``Telemetry`` with one call for all nested models."""
+
+    return Telemetry.model_validate(telemetry_row_payload(row))
+
+
+def telemetry_json(telemetry: Telemetry) -> bytes:
+    """Serialize telemetry to compact JSON bytes without an intermediate dict."""
+
+    return telemetry.__pydantic_serializer__.to_json(telemetry)
+
+
+TelemetryList = TypeAdapter(List[Telemetry])
+
+
+def decode_telemetry(data: bytes | str) -> Telemetry:
+    """Parse and validate one JSON sample in a single pydantic-core pass."""
+
+    return Telemetry.model_validate_json(data)
+
+
+def decode_telemetry_list(data: bytes | str) -> List[Telemetry]:
+    """Parse and validate a JSON array of samples with a cached validator."""
+
+    return TelemetryList.validate_json(data)
+
+
+# Binary encoding. A batch is ``BINARY_MAGIC``, a uint32 record count and the
+# records back to back. A record is ``_BINARY_FIXED`` (timestamp in
+# microseconds since the epoch, the 19 float fields in row order, cycle
+# time, tool type and mode codes) followed by machine id, tool id, program
+# and block, each as a uint8 length and UTF-8 bytes.
+BINARY_MAGIC = b"DTB1"
+BINARY_CONTENT_TYPE = "application/vnd.dt.telemetry-batch"
+_BINARY_COUNT = struct.Struct("<I")
+_BINARY_FIXED = struct.Struct("<q19dIBB")
+_TOOL_TYPES: Tuple[str, ...] = get_args(ToolType)
+_MODES: Tuple[str, ...] = get_args(MachineMode)
+_TOOL_TYPE_CODES = {name: code for code, name in enumerate(_TOOL_TYPES)}
+_MODE_CODES = {name: code for code, name in enumerate(_MODES)}
+# Row positions of the float fields, in ``TELEMETRY_ROW_FIELDS`` order.
+_FLOAT_FIELDS = tuple(range(2, 12)) + tuple(range(14, 23))
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _microseconds(timestamp: datetime | str) -> int:
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def _pack_str(value: str) -> bytes:
+    encoded = value.encode()
+    if len(encoded) > 255:
+        raise ValueError(f"string field exceeds 255 bytes: {value[:32]!r}...")
+    return bytes((len(encoded),)) + encoded
+
+
+def encode_row_binary(row: tuple) -> bytes:
+    """Encode a ``TELEMETRY_ROW_FIELDS`` tuple as one binary record."""
+
+    fixed = _BINARY_FIXED.pack(
+        _microseconds(row[0]),
+        *(row[index] for index in _FLOAT_FIELDS),
+        row[26],
+        _TOOL_TYPE_CODES[row[13]],
+        _MODE_CODES[row[23]],
+    )
+    strings = (row[1], row[12], row[24], row[25])
+    return fixed + b"".join(_pack_str(value) for value in strings)
+
+
+def telemetry_row(telemetry: Telemetry) -> tuple:
+    """The ``TELEMETRY_ROW_FIELDS`` tuple of a validated sample."""
+
+    s, a, t, c, p, m = (
+        telemetry.spindle,
+        telemetry.axes,
+        telemetry.tool,
+        telemetry.coolant,
+        telemetry.power,
+        telemetry.status,
+    )
+    return (
+        telemetry.timestamp,
+        telemetry.machine_id,
+        s.rpm,
+        s.load_percent,
+        s.temperature_c,
+        s.vibration_mm_s,
+        a.x.position_mm,
+        a.x.velocity_mm_min,
+        a.y.position_mm,
+        a.y.velocity_mm_min,
+        a.z.position_mm,
+        a.z.velocity_mm_min,
+        t.id,
+        t.type,
+        t.diameter_mm,
+        t.wear_percent,
+        t.runtime_minutes,
+        c.flow_rate_lpm,
+        c.temperature_c,
+        c.pressure_bar,
+        p.total_kw,
+        p.spindle_kw,
+        p.servo_kw,
+        m.mode,
+        m.program,
+        m.block,
+        m.cycle_time_s,
+    )
+
+
+def encode_binary(records: Iterable[Telemetry]) -> bytes:
+    """Encode validated samples as one binary batch."""
+
+    return encode_rows_binary(telemetry_row(item) for item in records)
+
+
+def encode_rows_binary(rows: Iterable[tuple]) -> bytes:
+    """Encode ``TELEMETRY_ROW_FIELDS`` tuples as one binary batch."""
+
+    encoded = [encode_row_binary(row) for row in rows]
+    return BINARY_MAGIC + _BINARY_COUNT.pack(len(encoded)) + b"".join(encoded)
+
+
+def decode_binary_rows(data: bytes) -> List[tuple]:
+    """Decode a binary batch into ``TELEMETRY_ROW_FIELDS`` tuples (unvalidated)."""
+
+    if data[:4] != BINARY_MAGIC:
+        raise ValueError("not a binary telemetry batch")
+    view = memoryview(data)
+    rows = []
+    try:
+        (count,) = _BINARY_COUNT.unpack_from(view, 4)
+        offset = 4 + _BINARY_COUNT.size
+        for _ in range(count):
+            fixed = _BINARY_FIXED.unpack_from(view, offset)
+            offset += _BINARY_FIXED.size
+            strings = []
+            for _ in range(4):
+                end = offset + 1 + view[offset]
+                if end > len(view):
+                    raise IndexError
+                strings.append(str(view[offset + 1 : end], "utf-8"))
+                offset = end
+            machine_id, tool_id, program, block = strings
+            floats = fixed[1:20]
+            rows.append(
+                (_EPOCH + timedelta(microseconds=fixed[0]), machine_id)
+                + floats[:10]
+                + (tool_id, _TOOL_TYPES[fixed[21]])
+                + floats[10:]
+                + (_MODES[fixed[22]], program, block, fixed[20])
+            )
+    except (struct.error, IndexError) as exc:
+        raise ValueError("truncated or malformed binary telemetry batch") from exc
+    if offset != len(data):
+        raise ValueError("trailing bytes after binary telemetry batch")
+    return rows
+
+
+def decode_binary(data: bytes) -> List[Telemetry]:
+    """Decode and validate a binary batch with the cached list validator."""
+
+    return TelemetryList.validate_python(
+        [telemetry_row_payload(row) for row in decode_binary_rows(data)]
+    )
@@ -0,0 +1,84 @@
+"""Measure the per-request cost of the metrics middleware on a FastAPI app."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+SHARED_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SHARED_DIR))
+
+from dt_shared.instrumentation import Instrumentation  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/machines/{machine_id}")
+    async def machine(machine_id: str) -> dict:
+        return {"id": machine_id}
+
+    if instrumented:
+        Instrumentation().instrument_app(app)
+    return app
+
+
+async def _run(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/machines/CNC-001",
+        "raw_path": b"/machines/CNC-001",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    # ASGI calls Starlette's middleware-stack build lazily; warm it up.
+    for _ in range(100):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    apps = {False: _app(instrumented=False), True: _app(instrumented=True)}
+    # Interleave the variants and keep each one's best round to damp noise.
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.rounds):
+        for variant, app in apps.items():
+            best[variant] = min(best[variant], asyncio.run(_run(app, args.requests)))
+    plain, instrumented = best[False], best[True]
+    print(f"{args.requests} in-process requests, best of {args.rounds} rounds")
+    print(f"{'plain':<14} {plain * 1e6:>8.1f} us/request")
+    print(f"{'instrumented':<14} {instrumented * 1e6:>8.1f} us/request")
+    print(
+        f"{'overhead':<14} {(instrumented - plain) * 1e6:>8.1f} us/request "
+        f"({(instrumented / plain - 1) * 100:.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+
+def _app():
+    from dt_shared.instrumentation import Instrumentation
+
+    app = FastAPI()
+    instrumentation = Instrumentation()
+
+    @app.get("/machines/{machine_id}")
+    async def machine(machine_id: str) -> dict:
+        with instrumentation.downstream("data-aggregator", "aggregate"):
+            pass
+        return {"id": machine_id}
+
+    instrumentation.instrument_app(app)
+    instrumentation.track_size("machines", lambda: 3)
+    instrumentation.track_cache(
+        "schedule", lambda: {"hits": 4, "misses": 1, "evictions": 0, "size": 1}
+    )
+    return app, instrumentation
+
+
+async def _get(app, *paths, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return [await c.get(path, headers=headers) for path in paths]
+
+
+def test_requests_are_timed_by_route_template():
+    app, instrumentation = _app()
+
+    asyncio.run(_get(app, "/machines/A", "/machines/B", "/missing"))
+    (metrics,) = asyncio.run(_get(app, "/metrics"))
+
+    text = metrics.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/machines/{machine_id}",status="200"} 2.0'
+    ) in text
+    assert 'route="unmatched",status="404"' in text
+    assert 'downstream_request_duration_seconds_count{operation="aggregate",' in text
+    assert 'store_items{store="machines"} 3.0' in text
+    assert 'cache_hits_total{cache="schedule"} 4.0' in text
+    # The scrape itself is the only request in flight.
+    assert "http_requests_in_flight 1.0" in text
+    assert instrumentation.registry.get_sample_value("process_cpu_seconds_total")
+
+
+def test_openmetrics_exposes_trace_exemplars():
+    app, _ = _app()
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+    asyncio.run(_get(app, "/machines/A", headers={"traceparent": traceparent}))
+    (metrics,) = asyncio.run(
+        _get(app, "/metrics", headers={"accept": "application/openmetrics-text"})
+    )
+
+    assert metrics.headers["content-type"].startswith("application/openmetrics-text")
+    assert '# {trace_id="4bf92f3577b34da6a3ce929d0e0e4736"}' in metrics.text
+
+
+def test_malformed_traceparent_is_recorded_without_exemplar():
+    app, instrumentation = _app()
+    malformed = ["00-" + "a" * 200 + "-00f067aa0ba902b7-01", "00-4BF92F35-00-01"]
+
+    for traceparent in malformed:
+        asyncio.run(_get(app, "/machines/A", headers={"traceparent": traceparent}))
+    (metrics,) = asyncio.run(
+        _get(app, "/metrics", headers={"accept": "application/openmetrics-text"})
+    )
+
+    assert "trace_id" not in metrics.text
+    assert (
+        instrumentation.registry.get_sample_value(
+            "http_request_duration_seconds_count",
+            {"method": "GET", "route": "/machines/{machine_id}", "status": "200"},
+        )
+        == 2
+    )
+
+
+def test_event_loop_lag_is_sampled():
+    from dt_shared.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation()
+
+    async def run():
+        monitor = asyncio.create_task(instrumentation.monitor_event_loop(0.01))
+        await asyncio.sleep(0.015)
+        # Block the loop so the next wakeup is late.
+        import time
+
+        time.sleep(0.05)
+        await asyncio.sleep(0.02)
+        monitor.cancel()
+
+    asyncio.run(run())
+
+    registry = instrumentation.registry
+    assert registry.get_sample_value("event_loop_lag_seconds_count") >= 1
+    assert registry.get_sample_value("event_loop_lag_seconds_sum") >= 0.03
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from dt_shared import profiling
+from fastapi import FastAPI
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_captures_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,))
+    worker.start()
+    try:
+        profiler = profiling.SamplingProfiler(interval_s=0.002).run(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profiler.samples > 10
+    assert "_busy_loop (test_profiling.py:" in profiler.collapsed()
+    tree = profiler.tree()
+    assert tree["name"] == "all"
+    assert tree["value"] == sum(profiler.stacks.values())
+
+
+def test_stage_timers_are_exported_as_histogram():
+    from dt_shared.instrumentation import Instrumentation
+
+    parse = profiling.stage_timer("test.parse")
+    watch = profiling.Stopwatch()
+    time.sleep(0.002)
+    watch.lap(parse)
+    parse.observe_ns(5_000)
+
+    registry = Instrumentation().registry
+    labels = {"stage": "test.parse"}
+    assert registry.get_sample_value("stage_duration_seconds_count", labels) == 2
+    bucket = dict(labels, le="1e-05")
+    assert registry.get_sample_value("stage_duration_seconds_bucket", bucket) == 1
+    assert registry.get_sample_value("stage_duration_seconds_sum", labels) > 0.002
+    assert parse.snapshot()["count"] == 2
+
+
+def test_profile_endpoint_is_opt_in_and_token_guarded(monkeypatch):
+    monkeypatch.delenv("PROFILER_ENABLED", raising=False)
+    disabled = FastAPI()
+    assert not profiling.install_profiler(disabled)
+    assert "/admin/profile" not in {route.path for route in disabled.routes}
+
+    monkeypatch.setenv("PROFILER_ENABLED", "true")
+    monkeypatch.delenv("PROFILER_TOKEN", raising=False)
+    tokenless = FastAPI()
+    assert not profiling.install_profiler(tokenless)
+    assert "/admin/profile" not in {route.path for route in tokenless.routes}
+
+    monkeypatch.setenv("PROFILER_TOKEN", "secret")
+    app = FastAPI()
+    assert profiling.install_profiler(app)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            url = "/admin/profile?seconds=0.05&interval_ms=1&format=json"
+            denied = await c.get(url)
+            wrong = await c.get(url, headers={"x-admin-token": "secreT"})
+            allowed = await c.get(url, headers={"x-admin-token": "secret"})
+        return denied, wrong, allowed
+
+    denied, wrong, allowed = asyncio.run(run())
+    assert denied.status_code == wrong.status_code == 401
+    assert allowed.status_code == 200
+    body = allowed.json()
+    assert body["samples"] > 0
+    assert body["flamegraph"]["name"] == "all"
+    assert "stages" in body
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def test_rollup_buckets_unordered_points_by_window():
+    from dt_shared.rollup import Rollup, rollup
+
+    start = datetime(2026, 2, 4, 10, 0, tzinfo=timezone.utc)
+    points = [
+        (start + timedelta(seconds=70), 60.0),
+        (start + timedelta(seconds=5), 40.0),
+        (start + timedelta(seconds=50), 50.0),
+    ]
+
+    assert rollup(points, "1min") == [
+        Rollup(start, 2, 40.0, 50.0, 45.0),
+        Rollup(start + timedelta(minutes=1), 1, 60.0, 60.0, 60.0),
+    ]
+    assert rollup(points, "1hour") == [Rollup(start, 3, 40.0, 60.0, 50.0)]
+    assert rollup([], "5min") == []
+    with pytest.raises(KeyError):
+        rollup(points, "2min")
@@ -0,0 +1,36 @@
+import pytest
+from dt_shared import telemetry
+
+
+def test_binary_batch_round_trips_models_and_rows():
+    sample = telemetry.Telemetry.example()
+    other = sample.model_copy(update={"machine_id": "CNC-ÄÖ-002"})
+
+    encoded = telemetry.encode_binary([sample, other])
+    assert encoded.startswith(telemetry.BINARY_MAGIC)
+    assert len(encoded) < len(telemetry.telemetry_json(sample))
+    assert telemetry.decode_binary(encoded) == [sample, other]
+
+    rows = telemetry.decode_binary_rows(encoded)
+    assert rows[0] == telemetry.telemetry_row(sample)
+    assert telemetry.encode_rows_binary(rows) == encoded
+    assert telemetry.telemetry_from_row(rows[1]) == other
+
+
+def test_decoders_reject_malformed_input():
+    from pydantic import ValidationError
+
+    sample = telemetry.Telemetry.example()
+    json_batch = b"[" + telemetry.telemetry_json(sample) + b"]"
+    assert telemetry.decode_telemetry_list(json_batch) == [sample]
+    assert telemetry.decode_telemetry(telemetry.telemetry_json(sample)) == sample
+
+    encoded = telemetry.encode_binary([sample])
+    for bad in (b"XXXX" + encoded[4:], encoded[:-2], encoded + b"\0"):
+        with pytest.raises(ValueError):
+            telemetry.decode_binary_rows(bad)
+
+    row = list(telemetry.telemetry_row(sample))
+    row[telemetry.TELEMETRY_ROW_FIELDS.index("spindle.rpm")] = -1.0
+    with pytest.raises(ValidationError):
+        telemetry.decode_binary(telemetry.encode_rows_binary([tuple(row)]))
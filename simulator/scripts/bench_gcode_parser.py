@@ -0,0 +1,65 @@
+"""Compare line-by-line and streaming G-code parser throughput."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from gcode_parser import GCodeParser  # noqa: E402
+from gcode_stream import StreamingGCodeParser  # noqa: E402
+
+
+def write_program(path: Path, lines: int) -> None:
+    """Write a synthetic mold-style program of zig-zag finishing passes."""
+
+    with path.open("w") as fh:
+        fh.write("(O9000 SYNTHETIC BENCHMARK)\nG21 G90 G17\nT01 M06\nS12000 M03\n")
+        for n in range(lines):
+            x = (n % 500) * 0.2
+            y = (n // 500) * 0.2
+            z = -0.001 * (n % 97)
+            if n % 1000 == 0:
+                fh.write(f"N{n} G01 X{x:.3f} Y{y:.3f} Z{z:.4f} F2400 (PASS)\n")
+            else:
+                fh.write(f"N{n} X{x:.3f} Y{y:.3f} Z{z:.4f}\n")
+        fh.write("M05\nM30\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--program", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.program or Path(tmp) / "bench.nc"
+        if args.program is None:
+            write_program(path, args.lines)
+        size_mb = path.stat().st_size / 1e6
+        total = sum(1 for _ in path.open())
+
+        line_parser = GCodeParser()
+        started = time.perf_counter()
+        with path.open() as fh:
+            for line in fh:
+                line_parser.parse_line(line)
+        baseline_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        columns = StreamingGCodeParser().parse_file(path, modal=True)
+        streaming_s = time.perf_counter() - started
+
+    print(f"program: {total} lines, {size_mb:.1f} MB, {len(columns)} blocks")
+    print(f"GCodeParser.parse_line:      {total / baseline_s:>12,.0f} lines/sec")
+    print(f"StreamingGCodeParser (modal): {total / streaming_s:>12,.0f} lines/sec")
+    print(f"speedup: {baseline_s / streaming_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
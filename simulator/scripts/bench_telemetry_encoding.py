@@ -0,0 +1,51 @@
+"""Compare validated and trusted telemetry serialization for a large fleet."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from config import SimulatorConfig  # noqa: E402
+from fleet import FleetSimulator  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--machines", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    config = SimulatorConfig()
+    fleet = FleetSimulator(size=args.machines, config=config, seed=0)
+    strict = FleetSimulator(
+        size=args.machines, config=replace(config, strict_validation=True), seed=0
+    )
+    paths = {
+        "models + model_dump_json": lambda: [
+            t.model_dump_json().encode() for t in fleet.iter_telemetry()
+        ],
+        "iter_json (strict)": lambda: list(strict.iter_json()),
+        "iter_json (trusted)": lambda: list(fleet.iter_json()),
+    }
+
+    samples = args.machines * args.ticks
+    print(f"{args.machines} machines x {args.ticks} ticks")
+    for name, encode in paths.items():
+        elapsed = 0.0
+        for _ in range(args.ticks):
+            fleet.tick(0.1)
+            strict.tick(0.1)
+            started = time.perf_counter()
+            encode()
+            elapsed += time.perf_counter() - started
+        print(f"{name:<26} {samples / elapsed:>12,.0f} samples/sec")
+
+
+if __name__ == "__main__":
+    main()
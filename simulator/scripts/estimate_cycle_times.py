@@ -0,0 +1,41 @@
+"""Print toolpath distances and estimated cycle times for G-code programs."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from toolpath import MachineLimits, ToolpathAnalyzer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("programs", nargs="+", type=Path)
+    parser.add_argument("--rapid-feed", type=float, default=15000.0)
+    parser.add_argument("--accel", type=float, default=2000.0)
+    parser.add_argument("--tool-change-s", type=float, default=5.0)
+    args = parser.parse_args()
+
+    analyzer = ToolpathAnalyzer(
+        MachineLimits(
+            rapid_feed_mm_min=args.rapid_feed,
+            max_accel_mm_s2=args.accel,
+            tool_change_s=args.tool_change_s,
+        )
+    )
+    print(
+        f"{'program':<12}{'rapid mm':>12}{'feed mm':>12}{'arc mm':>10}{'cycle s':>10}"
+    )
+    for summary in analyzer.analyze_many(args.programs):
+        print(
+            f"{summary.program:<12}{summary.rapid_mm:>12.1f}{summary.feed_mm:>12.1f}"
+            f"{summary.arc_mm:>10.1f}{summary.cycle_time_s:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Record simulator telemetry to a file, or replay a recording into services."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from clock import SimulatedClock  # noqa: E402
+from cnc_machine import CNCMachine  # noqa: E402
+from config import MqttConfig, SimulatorConfig  # noqa: E402
+from mqtt_publisher import MQTTPublisher  # noqa: E402
+from recording import TelemetryRecorder, read_payloads  # noqa: E402
+from replay import (  # noqa: E402
+    AnomalyDetectionSink,
+    DigitalTwinSink,
+    MQTTSink,
+    Replayer,
+)
+
+
+def record(args: argparse.Namespace) -> None:
+    config = SimulatorConfig.from_env()
+    with TelemetryRecorder(args.output) as recorder:
+        for index in range(args.machines):
+            machine = CNCMachine(
+                machine_id=f"CNC-{index + 1:03d}",
+                config=config,
+                clock=SimulatedClock(),
+                seed=args.seed + index,
+            )
+            recorder.write_many(machine.simulate(args.duration_s))
+        count = recorder.count
+    size_kb = args.output.stat().st_size / 1024
+    print(f"recorded {count} samples to {args.output} ({size_kb:.1f} KiB)")
+
+
+def replay(args: argparse.Namespace) -> None:
+    sinks = []
+    if args.digital_twin_url:
+        sinks.append(
+            DigitalTwinSink(base_url=args.digital_twin_url, api_key=args.api_key)
+        )
+    if args.anomaly_url:
+        sinks.append(AnomalyDetectionSink(base_url=args.anomaly_url))
+    if args.mqtt:
+        mqtt = MqttConfig()
+        sinks.append(
+            MQTTSink(lambda machine_id: MQTTPublisher.from_config(machine_id, mqtt))
+        )
+    if not sinks:
+        raise SystemExit(
+            "choose at least one of --digital-twin-url, --anomaly-url, --mqtt"
+        )
+
+    replayer = Replayer(
+        payloads=list(read_payloads(args.recording)),
+        sinks=sinks,
+        speed=None if args.speed == "max" else float(args.speed),
+        clones=args.clones,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+    )
+
+    async def run() -> None:
+        try:
+            reports = await replayer.run()
+        finally:
+            for sink in sinks:
+                await sink.close()
+        for report in reports.values():
+            print(json.dumps(report.as_dict()))
+
+    asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="simulate machines into a recording")
+    rec.add_argument("output", type=Path)
+    rec.add_argument("--machines", type=int, default=10)
+    rec.add_argument("--duration-s", type=float, default=60.0)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.set_defaults(handler=record)
+
+    rep = commands.add_parser("replay", help="replay a recording into services")
+    rep.add_argument("recording", type=Path)
+    rep.add_argument("--digital-twin-url")
+    rep.add_argument("--api-key", default="dev-key")
+    rep.add_argument("--anomaly-url")
+    rep.add_argument("--mqtt", action="store_true", help="publish via MQTT_BROKER")
+    rep.add_argument("--speed", default="1", help="1, N (times faster) or max")
+    rep.add_argument("--clones", type=int, default=1)
+    rep.add_argument("--concurrency", type=int, default=64)
+    rep.add_argument("--batch-size", type=int, default=1)
+    rep.set_defaults(handler=replay)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Clocks driving the simulator: wall time or deterministic fast-forward."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+# Default start of simulated time, so fast-forward runs repeat exactly.
+SIMULATION_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class Clock(Protocol):
+    """Time source used by the simulator loop."""
+
+    def monotonic(self) -> float: ...
+
+    def now(self) -> datetime: ...
+
+    async def sleep(self, seconds: float) -> None: ...
+
+
+class SystemClock:
+    """Real time: wall-clock timestamps and real sleeps."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+@dataclass
+class SimulatedClock:
+    """Virtual time that only moves when advanced.
+
+    ``sleep`` advances the clock instead of waiting, so a loop driven by this
+    clock runs as fast as the CPU allows while timestamps and elapsed time
+    still follow the simulated schedule. Time starts at ``SIMULATION_EPOCH``
+    unless ``start`` is given.
+    """
+
+    start: datetime = SIMULATION_EPOCH
+    _elapsed_s: float = field(default=0.0, init=False)
+
+    @property
+    def elapsed_s(self) -> float:
+        return self._elapsed_s
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("Cannot move a simulated clock backwards")
+        self._elapsed_s += seconds
+
+    def monotonic(self) -> float:
+        return self._elapsed_s
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self._elapsed_s)
+
+    async def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+        # Yield so other tasks still get scheduled between cycles.
+        await asyncio.sleep(0)
@@ -2,24 +2,23 @@
 
 from __future__ import annotations
 
-import asyncio
 import random
-import time
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
 
+from clock import Clock, SimulatedClock, SystemClock
 from config import SimulatorConfig
+from failure_modes import FailureManager
+from gcode_interpreter import GCodeInterpreter, ProgramTrajectory
 from models import (
-    AxesTelemetry,
-    AxisState,
-    CoolantTelemetry,
-    PowerTelemetry,
-    SpindleTelemetry,
-    StatusTelemetry,
     Telemetry,
-    ToolTelemetry,
+    telemetry_from_row,
+    telemetry_json,
+    telemetry_row_json,
 )
 from spindle import Spindle
+from vibration import VibrationBlock, VibrationSynthesizer
 
 
 @dataclass
@@ -29,25 +28,54 @@ class CNCMachine:
     machine_id: str | None = None
     config: SimulatorConfig | None = None
     spindle: Spindle = field(default_factory=Spindle)
+    clock: Clock | None = None
+    seed: int | None = None
+    program: ProgramTrajectory | None = None
+    failures: FailureManager = field(default_factory=FailureManager)
 
+    _rng: random.Random = field(init=False)
     _running: bool = field(default=False, init=False)
     _paused: bool = field(default=False, init=False)
     _last_cycle_ts: float | None = field(default=None, init=False)
     _tool_wear_percent: float = field(default=0.0, init=False)
     _tool_runtime_minutes: float = field(default=0.0, init=False)
+    _program_tick: int = field(default=0, init=False)
+    _last_rpm: float = field(default=0.0, init=False)
+    _last_vibration_mm_s: float = field(default=0.0, init=False)
+    _vibration: VibrationSynthesizer | None = field(default=None, init=False)
 
     def __post_init__(self) -> None:
         if self.config is None:
             self.config = SimulatorConfig.from_env()
         if self.machine_id is None:
             self.machine_id = self.config.machine_id
+        if self.clock is None:
+            if self.config.fast_forward:
+                start = self.config.start_time
+                self.clock = SimulatedClock(start=start) if start else SimulatedClock()
+            else:
+                self.clock = SystemClock()
+        if self.seed is None:
+            self.seed = self.config.seed
+        self._rng = random.Random(self.seed)
+        if self.program is None and self.config.program_path:
+            self.load_program(self.config.program_path)
+
+    def load_program(self, path: str | Path) -> ProgramTrajectory:
+        """Compile a G-code file and drive telemetry from it."""
+
+        self.program = GCodeInterpreter().compile_file(
+            path, cycle_time_s=self.config.cycle_time_s
+        )
+        self._program_tick = 0
+        return self.program
 
     def start(self) -> None:
         """Start the simulator loop."""
 
         self._running = True
         self._paused = False
-        self._last_cycle_ts = time.monotonic()
+        self._last_cycle_ts = self.clock.monotonic()
 
     def stop(self) -> None:
         """Stop the simulator loop."""
@@ -66,26 +94,72 @@ class CNCMachine:
         if self._running:
             self._paused = False
 
-    async def run(self) -> None:
+    async def run(self, max_cycles: int | None = None) -> None:
         """Run the simulator loop asynchronously."""
 
         self.start()
-        while self._running:
+        cycles = 0
+        while self._running and (max_cycles is None or cycles < max_cycles):
             if not self._paused:
-                self.generate_telemetry()
-            await asyncio.sleep(self.config.cycle_time_s)
+                self._next_row()
+            cycles += 1
+            await self.clock.sleep(self.config.cycle_time_s)
+
+    def simulate(self, duration_s: float) -> Iterator[Telemetry]:
+        """Yield telemetry for ``duration_s`` of simulated time, without waiting.
+
+        Requires a ``SimulatedClock``; each sample advances it by one cycle.
+        """
+
+        if not isinstance(self.clock, SimulatedClock):
+            raise TypeError("simulate() requires a SimulatedClock")
+        if self.config.cycle_time_s <= 0:
+            raise ValueError("cycle_time_s must be positive to simulate")
+        self.start()
+        end = self.clock.monotonic() + duration_s
+        while self.clock.monotonic() < end:
+            yield self.generate_telemetry()
+            self.clock.advance(self.config.cycle_time_s)
+
+    def vibration_block(self) -> VibrationBlock:
+        """Synthesize one raw vibration block at the last sample's spindle speed.
+
+        Bearing defect impacts scale with any injected
+        ``SPINDLE_BEARING_DEGRADATION`` severity.
+        """
+
+        if self._vibration is None:
+            self._vibration = VibrationSynthesizer(
+                spindle=self.spindle,
+                sample_rate_hz=self.config.vibration_sample_rate_hz,
+                block_size=self.config.vibration_block_size,
+                seed=self.seed,
+            )
+        severity = self.failures.severities().get("SPINDLE_BEARING_DEGRADATION", 0.0)
+        return VibrationBlock(
+            machine_id=self.machine_id,
+            timestamp=self.clock.now().timestamp(),
+            sample_rate_hz=self._vibration.sample_rate_hz,
+            rpm=self._last_rpm,
+            samples=self._vibration.synthesize(
+                self._last_rpm, severity, self._last_vibration_mm_s
+            ),
+        )
 
     def _advance_state(self, delta_s: float) -> None:
         if delta_s <= 0:
             return
-        self._tool_runtime_minutes += delta_s / 60.0
+        delta_min = delta_s / 60.0
+        self._tool_runtime_minutes += delta_min
+        self.failures.tick(delta_min)
         wear_rate_per_min = 0.05  # conservative demo rate
+        wear_rate_per_min *= self.failures.impacts()["tool_wear_multiplier"]
         self._tool_wear_percent = min(
-            100.0, self._tool_wear_percent + wear_rate_per_min * (delta_s / 60.0)
+            100.0, self._tool_wear_percent + wear_rate_per_min * delta_min
         )
 
     def _elapsed_since_last_cycle(self) -> float:
-        now = time.monotonic()
+        now = self.clock.monotonic()
         if self._last_cycle_ts is None:
             self._last_cycle_ts = now
             return 0.0
@@ -96,67 +170,97 @@ class CNCMachine:
     def generate_telemetry(self) -> Telemetry:
         """Generate a single telemetry snapshot."""
 
-        delta_s = self._elapsed_since_last_cycle() if self._running else 0.0
-        self._advance_state(delta_s)
+        return telemetry_from_row(self._next_row())
 
-        rpm = 0.0 if not self._running or self._paused else random.uniform(3000, 18000)
-        load_percent = 0.0 if rpm == 0 else random.uniform(20.0, 80.0)
-        torque_nm = 6.0 + 0.0005 * rpm
-        spindle_kw = self.spindle.power_kw(rpm=rpm, torque_nm=torque_nm)
+    def generate_json(self) -> bytes:
+        """Generate a single telemetry snapshot as JSON bytes.
 
-        feed = 0.0 if rpm == 0 else random.uniform(500.0, 8000.0)
-        servo_kw = 0.5 + 0.0002 * feed
-        total_kw = spindle_kw + servo_kw
+        This is the hot path for publishing: the sample goes from a plain
+        tuple to bytes without building models, unless
+        ``config.strict_validation`` asks for it to be validated first.
+        """
 
-        axes = AxesTelemetry(
-            x=AxisState(position_mm=random.uniform(0, 250), velocity_mm_min=feed),
-            y=AxisState(position_mm=random.uniform(0, 250), velocity_mm_min=feed),
-            z=AxisState(
-                position_mm=random.uniform(-100, 0), velocity_mm_min=feed / 2.0
-            ),
-        )
+        row = self._next_row()
+        if self.config.strict_validation:
+            return telemetry_json(telemetry_from_row(row))
+        return telemetry_row_json(row)
 
-        spindle = SpindleTelemetry(
-            rpm=rpm,
-            load_percent=load_percent,
-            temperature_c=random.uniform(25.0, 60.0),
-            vibration_mm_s=self.spindle.vibration_mm_s(
-                wear_percent=self._tool_wear_percent
-            ),
-        )
+    def _next_row(self) -> tuple:
+        """Advance the machine one cycle; return a ``TELEMETRY_ROW_FIELDS`` row."""
 
-        tool = ToolTelemetry(
-            id="T01",
-            type="end_mill",
-            diameter_mm=10.0,
-            wear_percent=self._tool_wear_percent,
-            runtime_minutes=self._tool_runtime_minutes,
-        )
+        delta_s = self._elapsed_since_last_cycle() if self._running else 0.0
+        self._advance_state(delta_s)
 
-        coolant = CoolantTelemetry(
-            flow_rate_lpm=12.0 if rpm > 0 else 0.0,
-            temperature_c=random.uniform(20.0, 30.0),
-            pressure_bar=4.0 if rpm > 0 else 0.0,
-        )
+        active = self._running and not self._paused
+        if self.program is not None and active:
+            sample = self.program.sample(self._program_tick)
+            self._program_tick += 1
+            rpm = min(sample.spindle_rpm, float(self.config.max_spindle_rpm))
+            feed = sample.feed_mm_min
+            x, y, z = sample.x, sample.y, sample.z
+            vx, vy, vz = sample.vx, sample.vy, sample.vz
+            tool_id = f"T{sample.tool:02d}"
+            program, block = self.program.name, sample.block
+        else:
+            rpm = self._rng.uniform(3000, 18000) if active else 0.0
+            feed = 0.0 if rpm == 0 else self._rng.uniform(500.0, 8000.0)
+            x = self._rng.uniform(0, 250)
+            y = self._rng.uniform(0, 250)
+            z = self._rng.uniform(-100, 0)
+            vx, vy, vz = feed, feed, feed / 2.0
+            tool_id = "T01"
+            program, block = "O1234", "N0100"
 
-        power = PowerTelemetry(
-            total_kw=total_kw, spindle_kw=spindle_kw, servo_kw=servo_kw
-        )
+        # Looked up once per sample; rebuilt only when a failure changes.
+        impact = self.failures.impacts()
+        offset_mm = impact["position_drift_mm"] + impact["backlash_mm"]
 
-        status = StatusTelemetry(
-            mode="AUTO",
-            program="O1234",
-            block="N0100",
-            cycle_time_s=int(self.config.cycle_time_s * 1000),
+        load_percent = 0.0 if rpm == 0 else self._rng.uniform(20.0, 80.0)
+        torque_nm = 6.0 + 0.0005 * rpm
+        spindle_kw = self.spindle.power_kw(rpm=rpm, torque_nm=torque_nm)
+        servo_kw = 0.5 + 0.0002 * feed
+        spindle_temp_c = min(
+            120.0,
+            self._rng.uniform(25.0, 60.0) + impact["temp_offset_c"],
+        )
+        vibration = min(
+            20.0,
+            self.spindle.vibration_mm_s(wear_percent=self._tool_wear_percent)
+            * impact["vibration_multiplier"],
         )
+        flow_lpm = (
+            max(0.0, 12.0 * impact["coolant_flow_multiplier"]) if rpm > 0 else 0.0
+        )
+        coolant_temp_c = self._rng.uniform(20.0, 30.0)
 
-        return Telemetry(
-            timestamp=datetime.now(timezone.utc),
-            machine_id=self.machine_id,
-            spindle=spindle,
-            axes=axes,
-            tool=tool,
-            coolant=coolant,
-            power=power,
-            status=status,
+        self._last_rpm = rpm
+        self._last_vibration_mm_s = vibration
+        return (
+            self.clock.now(),
+            self.machine_id,
+            rpm,
+            load_percent,
+            spindle_temp_c,
+            vibration,
+            x + offset_mm,
+            vx,
+            y + offset_mm,
+            vy,
+            z + offset_mm,
+            vz,
+            tool_id,
+            "end_mill",
+            10.0,
+            self._tool_wear_percent,
+            self._tool_runtime_minutes,
+            flow_lpm,
+            coolant_temp_c,
+            4.0 if rpm > 0 else 0.0,
+            spindle_kw + servo_kw,
+            spindle_kw,
+            servo_kw,
+            "AUTO",
+            program,
+            block,
+            int(self.config.cycle_time_s * 1000),
         )
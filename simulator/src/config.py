@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from datetime import datetime, timezone
 
 
 @dataclass(frozen=True)
@@ -15,17 +16,40 @@ class SimulatorConfig:
     max_spindle_rpm: int = 24000
     min_spindle_rpm: int = 0
     ambient_temp_c: float = 20.0
+    seed: int | None = None
+    fast_forward: bool = False
+    # Start of simulated time in fast-forward mode (default ``SIMULATION_EPOCH``).
+    start_time: datetime | None = None
+    program_path: str | None = None
+    vibration_sample_rate_hz: float = 10_000.0
+    vibration_block_size: int = 4096
+    strict_validation: bool = False
 
     @classmethod
     def from_env(cls) -> "SimulatorConfig":
         """Create config from environment variables when provided."""
 
+        seed = os.getenv("CNC_SEED")
+        start_time = os.getenv("CNC_START_TIME")
         return cls(
             machine_id=os.getenv("CNC_MACHINE_ID", cls.machine_id),
             cycle_time_s=float(os.getenv("CNC_CYCLE_TIME_S", cls.cycle_time_s)),
             max_spindle_rpm=int(os.getenv("CNC_MAX_SPINDLE_RPM", cls.max_spindle_rpm)),
             min_spindle_rpm=int(os.getenv("CNC_MIN_SPINDLE_RPM", cls.min_spindle_rpm)),
             ambient_temp_c=float(os.getenv("CNC_AMBIENT_TEMP_C", cls.ambient_temp_c)),
+            seed=int(seed) if seed else None,
+            fast_forward=os.getenv("CNC_FAST_FORWARD", "false").lower()
+            in {"1", "true", "yes"},
+            start_time=_utc(datetime.fromisoformat(start_time)) if start_time else None,
+            program_path=os.getenv("CNC_PROGRAM_PATH") or None,
+            vibration_sample_rate_hz=float(
+                os.getenv("CNC_VIBRATION_SAMPLE_RATE_HZ", cls.vibration_sample_rate_hz)
+            ),
+            vibration_block_size=int(
+                os.getenv("CNC_VIBRATION_BLOCK_SIZE", cls.vibration_block_size)
+            ),
+            strict_validation=os.getenv("CNC_STRICT_VALIDATION", "false").lower()
+            in {"1", "true", "yes"},
         )
 
 
@@ -39,3 +63,18 @@ class MqttConfig:
     cert_path: str | None = os.getenv("MQTT_CERT_PATH")
     key_path: str | None = os.getenv("MQTT_KEY_PATH")
     ca_path: str | None = os.getenv("MQTT_CA_PATH")
+    batch_size: int = int(os.getenv("MQTT_BATCH_SIZE", "1"))
+    batch_max_delay_s: float = float(os.getenv("MQTT_BATCH_MAX_DELAY_S", "1.0"))
+    compression: str = os.getenv("MQTT_COMPRESSION", "none")
+    buffer_max_messages: int = int(os.getenv("MQTT_BUFFER_MAX_MESSAGES", "10000"))
+    drop_policy: str = os.getenv("MQTT_DROP_POLICY", "drop_oldest")
+    spill_path: str | None = os.getenv("MQTT_SPILL_PATH") or None
+    flush_rate_per_s: float | None = (
+        float(os.getenv("MQTT_FLUSH_RATE_PER_S"))
+        if os.getenv("MQTT_FLUSH_RATE_PER_S")
+        else None
+    )
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -5,7 +5,31 @@ from __future__ import annotations
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+# Neutral value of every impact key, used when no active failure sets it.
+IMPACT_DEFAULTS: Mapping[str, float] = MappingProxyType(
+    {
+        "tool_wear_multiplier": 1.0,
+        "vibration_multiplier": 1.0,
+        "temp_offset_c": 0.0,
+        "coolant_flow_multiplier": 1.0,
+        "position_drift_mm": 0.0,
+        "backlash_mm": 0.0,
+    }
+)
+
+# Tunable parameters of the failure kinds and their defaults. ``FailureMode``
+# subclasses take them as fields, ``FleetFailures.inject`` as keywords.
+KIND_PARAMS: Mapping[str, Mapping[str, float]] = MappingProxyType(
+    {
+        "TOOL_WEAR_ACCELERATED": MappingProxyType({"multiplier": 2.0}),
+        "SPINDLE_BEARING_DEGRADATION": MappingProxyType({"vibration_gain": 2.0}),
+    }
+)
 
 
 @dataclass
@@ -27,25 +51,24 @@ class FailureMode:
 
 @dataclass
 class ToolWearAccelerated(FailureMode):
-    multiplier: float = 2.0
+    multiplier: float = KIND_PARAMS["TOOL_WEAR_ACCELERATED"]["multiplier"]
 
     def __post_init__(self) -> None:
         self.name = "TOOL_WEAR_ACCELERATED"
 
     def get_impact(self) -> Dict[str, float]:
-        return {"tool_wear_multiplier": self.multiplier * (1.0 + self.severity)}
+        return _tool_wear_impact(self.severity, self.multiplier)
 
 
 @dataclass
 class SpindleBearingDegradation(FailureMode):
+    vibration_gain: float = KIND_PARAMS["SPINDLE_BEARING_DEGRADATION"]["vibration_gain"]
+
     def __post_init__(self) -> None:
         self.name = "SPINDLE_BEARING_DEGRADATION"
 
     def get_impact(self) -> Dict[str, float]:
-        return {
-            "vibration_multiplier": 1.0 + 2.0 * self.severity,
-            "temp_offset_c": 5.0 * self.severity,
-        }
+        return _bearing_impact(self.severity, self.vibration_gain)
 
 
 @dataclass
@@ -54,10 +77,7 @@ class CoolantSystemFailure(FailureMode):
         self.name = "COOLANT_SYSTEM_FAILURE"
 
     def get_impact(self) -> Dict[str, float]:
-        return {
-            "coolant_flow_multiplier": 1.0 - 0.7 * self.severity,
-            "temp_offset_c": 3.0 * self.severity,
-        }
+        return _coolant_impact(self.severity)
 
 
 @dataclass
@@ -66,7 +86,7 @@ class ThermalDrift(FailureMode):
         self.name = "THERMAL_DRIFT"
 
     def get_impact(self) -> Dict[str, float]:
-        return {"position_drift_mm": 0.02 * self.severity}
+        return _thermal_drift_impact(self.severity)
 
 
 @dataclass
@@ -75,31 +95,214 @@ class AxisBacklash(FailureMode):
         self.name = "AXIS_BACKLASH"
 
     def get_impact(self) -> Dict[str, float]:
-        return {"backlash_mm": 0.05 * self.severity}
+        return _backlash_impact(self.severity)
+
+
+# Impact formulas work on float or per-machine array severities and
+# parameters; parameters are named as in ``KIND_PARAMS``.
+def _tool_wear_impact(severity, multiplier) -> Dict:
+    return {"tool_wear_multiplier": multiplier * (1.0 + severity)}
+
+
+def _bearing_impact(severity, vibration_gain) -> Dict:
+    return {
+        "vibration_multiplier": 1.0 + vibration_gain * severity,
+        "temp_offset_c": 5.0 * severity,
+    }
+
+
+def _coolant_impact(severity) -> Dict:
+    return {
+        "coolant_flow_multiplier": 1.0 - 0.7 * severity,
+        "temp_offset_c": 3.0 * severity,
+    }
+
+
+def _thermal_drift_impact(severity) -> Dict:
+    return {"position_drift_mm": 0.02 * severity}
+
+
+def _backlash_impact(severity) -> Dict:
+    return {"backlash_mm": 0.05 * severity}
+
+
+FAILURE_KINDS: Tuple[str, ...] = (
+    "TOOL_WEAR_ACCELERATED",
+    "SPINDLE_BEARING_DEGRADATION",
+    "COOLANT_SYSTEM_FAILURE",
+    "THERMAL_DRIFT",
+    "AXIS_BACKLASH",
+)
+_KIND_IMPACTS: Tuple[Callable[..., Dict], ...] = (
+    _tool_wear_impact,
+    _bearing_impact,
+    _coolant_impact,
+    _thermal_drift_impact,
+    _backlash_impact,
+)
 
 
 class FailureManager:
-    """Manage active failure modes."""
+    """Manage active failure modes.
+
+    ``combined_impact`` is cached and only rebuilt when a failure is added
+    or removed or when ``tick`` changes a severity; a version counter marks
+    those changes, so a cached lookup is a single integer comparison.
+    Change severities through ``tick`` (or re-``inject``) for them to apply.
+    """
 
     def __init__(self) -> None:
         self._active: Dict[str, FailureMode] = {}
+        self._version = 0
+        self._impact: Mapping[str, float] = MappingProxyType({})
+        self._impacts: Mapping[str, float] = IMPACT_DEFAULTS
+        self._impact_version = 0
 
     def inject(self, failure: FailureMode) -> None:
         self._active[failure.id] = failure
+        self._version += 1
 
     def remove(self, failure_id: str) -> None:
-        self._active.pop(failure_id, None)
+        if self._active.pop(failure_id, None) is not None:
+            self._version += 1
 
     def active_failures(self) -> List[FailureMode]:
         return list(self._active.values())
 
+    def severities(self) -> Dict[str, float]:
+        """Highest severity per failure name, for labelling telemetry."""
+
+        labels: Dict[str, float] = {}
+        for failure in self._active.values():
+            labels[failure.name] = max(labels.get(failure.name, 0.0), failure.severity)
+        return labels
+
     def tick(self, delta_minutes: float) -> None:
         for failure in self._active.values():
+            severity = failure.severity
             failure.tick(delta_minutes)
+            if failure.severity != severity:
+                self._version += 1
 
-    def combined_impact(self) -> Dict[str, float]:
+    def combined_impact(self) -> Mapping[str, float]:
+        """Sum of active impacts; a read-only mapping shared between calls."""
+
+        self._refresh()
+        return self._impact
+
+    def impacts(self) -> Mapping[str, float]:
+        """``combined_impact`` with ``IMPACT_DEFAULTS`` for every unset key."""
+
+        self._refresh()
+        return self._impacts
+
+    def impact(self, name: str) -> float:
+        return self.impacts()[name]
+
+    def _refresh(self) -> None:
+        if self._impact_version == self._version:
+            return
         impact: Dict[str, float] = {}
         for failure in self._active.values():
-            for key, value in failure.get_impact().items():
-                impact[key] = impact.get(key, 0.0) + value
-        return impact
+            for name, value in failure.get_impact().items():
+                impact[name] = impact.get(name, 0.0) + value
+        self._impact = MappingProxyType(impact)
+        self._impacts = MappingProxyType({**IMPACT_DEFAULTS, **impact})
+        self._impact_version = self._version
+
+
+class FleetFailures:
+    """Failure severities for a whole fleet, one array column per kind.
+
+    ``severity`` and ``rate`` are ``(machines, kinds)`` arrays, so one tick
+    progresses every failure on every machine with a few array operations.
+    ``params`` holds one array per ``KIND_PARAMS`` entry.
+    The per-machine impact arrays are rebuilt only when a severity actually
+    changes (or failures are injected or cleared).
+    """
+
+    def __init__(self, size: int) -> None:
+        shape = (size, len(FAILURE_KINDS))
+        self.severity = np.zeros(shape)
+        self.rate = np.zeros(shape)
+        self.injected = np.zeros(shape, dtype=bool)
+        self.params: Dict[str, Dict[str, np.ndarray]] = {
+            kind: {name: np.full(size, value) for name, value in params.items()}
+            for kind, params in KIND_PARAMS.items()
+        }
+        self._impact: Dict[str, np.ndarray] | None = None
+
+    def inject(
+        self,
+        kind: str,
+        machines: Iterable[int] | slice | np.ndarray,
+        progression_rate: float = 0.01,
+        severity: float = 0.0,
+        **params: float,
+    ) -> None:
+        """Inject ``kind``; ``params`` override its ``KIND_PARAMS`` defaults."""
+
+        column = FAILURE_KINDS.index(kind)
+        defaults = KIND_PARAMS.get(kind, {})
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Unknown {kind} parameters: {sorted(unknown)}")
+        rows = _rows(machines)
+        for name, default in defaults.items():
+            self.params[kind][name][rows] = params.get(name, default)
+        self.injected[rows, column] = True
+        self.rate[rows, column] = progression_rate
+        self.severity[rows, column] = severity
+        self._impact = None
+
+    def clear(
+        self, kind: str, machines: Iterable[int] | slice | np.ndarray = slice(None)
+    ) -> None:
+        column = FAILURE_KINDS.index(kind)
+        rows = _rows(machines)
+        self.injected[rows, column] = False
+        self.rate[rows, column] = 0.0
+        self.severity[rows, column] = 0.0
+        self._impact = None
+
+    def tick(self, delta_minutes: float) -> None:
+        if delta_minutes <= 0:
+            return
+        progressed = np.minimum(1.0, self.severity + self.rate * delta_minutes)
+        if not np.array_equal(progressed, self.severity):
+            self.severity = progressed
+            self._impact = None
+
+    def impact(self) -> Dict[str, np.ndarray]:
+        """Combined impact per key as one array over the fleet."""
+
+        if self._impact is None:
+            size = len(self.severity)
+            totals = {name: np.zeros(size) for name in IMPACT_DEFAULTS}
+            present = {name: np.zeros(size, dtype=bool) for name in IMPACT_DEFAULTS}
+            for column, formula in enumerate(_KIND_IMPACTS):
+                injected = self.injected[:, column]
+                if not injected.any():
+                    continue
+                params = self.params.get(FAILURE_KINDS[column], {})
+                values = formula(self.severity[:, column], **params)
+                for name, value in values.items():
+                    totals[name] += np.where(injected, value, 0.0)
+                    present[name] |= injected
+            self._impact = {
+                name: np.where(present[name], totals[name], default)
+                for name, default in IMPACT_DEFAULTS.items()
+            }
+        return self._impact
+
+    def labels(self) -> Dict[str, np.ndarray]:
+        """Severity per failure kind (0 where not injected), per machine."""
+
+        masked = np.where(self.injected, self.severity, 0.0)
+        return {kind: masked[:, column] for column, kind in enumerate(FAILURE_KINDS)}
+
+
+def _rows(machines: Iterable[int] | slice | np.ndarray) -> slice | np.ndarray:
+    if isinstance(machines, slice):
+        return machines
+    return np.asarray(list(machines), dtype=np.intp)
@@ -0,0 +1,285 @@
+"""Vectorized simulation of many CNC machines per tick."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import repeat
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+from config import SimulatorConfig
+from failure_modes import FleetFailures
+from models import (
+    Telemetry,
+    encode_rows_binary,
+    telemetry_from_row,
+    telemetry_json,
+    telemetry_row_json,
+)
+from spindle import Spindle
+from vibration import VibrationSynthesizer
+
+# Rows of the per-tick random draw matrix.
+_RPM, _LOAD, _SPINDLE_TEMP, _FEED, _X, _Y, _Z, _COOLANT_TEMP = range(8)
+_DRAWS = 8
+
+
+@dataclass
+class FleetSimulator:
+    """Hold the state of N machines in arrays and advance them together.
+
+    Each ``tick`` draws every random value for the whole fleet with a single
+    generator call and updates wear, runtime and derived metrics with array
+    arithmetic. Injected failures (``failures``) progress the same way and
+    their impacts are applied to wear, vibration, temperatures, coolant flow
+    and axis positions; ``labels`` exposes the per-machine severities as
+    ground truth, and ``vibration_blocks`` synthesizes raw spindle waveforms
+    for the whole fleet in one array call. Pydantic ``Telemetry`` objects are
+    only built when a consumer asks for them via ``telemetry`` or
+    ``iter_telemetry``.
+    """
+
+    size: int
+    config: SimulatorConfig | None = None
+    spindle: Spindle = field(default_factory=Spindle)
+    seed: int | None = None
+    id_prefix: str = "CNC-"
+    wear_rate_per_min: float = 0.05
+
+    machine_ids: List[str] = field(init=False)
+    failures: FleetFailures = field(init=False)
+    timestamp: datetime = field(init=False)
+    tool_wear_percent: np.ndarray = field(init=False)
+    tool_runtime_minutes: np.ndarray = field(init=False)
+    rpm: np.ndarray = field(init=False)
+    load_percent: np.ndarray = field(init=False)
+    spindle_temperature_c: np.ndarray = field(init=False)
+    vibration_mm_s: np.ndarray = field(init=False)
+    feed_mm_min: np.ndarray = field(init=False)
+    position_mm: np.ndarray = field(init=False)
+    coolant_temperature_c: np.ndarray = field(init=False)
+    coolant_flow_lpm: np.ndarray = field(init=False)
+    spindle_kw: np.ndarray = field(init=False)
+    servo_kw: np.ndarray = field(init=False)
+    _rng: np.random.Generator = field(init=False)
+    _vibration: VibrationSynthesizer | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if self.size <= 0:
+            raise ValueError("Fleet size must be positive")
+        if self.config is None:
+            self.config = SimulatorConfig.from_env()
+        self._rng = np.random.default_rng(self.seed)
+        width = max(3, len(str(self.size)))
+        self.machine_ids = [
+            f"{self.id_prefix}{index + 1:0{width}d}" for index in range(self.size)
+        ]
+        self.timestamp = datetime.now(timezone.utc)
+        self.failures = FleetFailures(self.size)
+        zeros = np.zeros(self.size)
+        self.tool_wear_percent = zeros.copy()
+        self.tool_runtime_minutes = zeros.copy()
+        self.rpm = zeros.copy()
+        self.load_percent = zeros.copy()
+        self.spindle_temperature_c = np.full(self.size, self.config.ambient_temp_c)
+        self.vibration_mm_s = self.spindle.vibration_mm_s_batch(zeros)
+        self.feed_mm_min = zeros.copy()
+        self.position_mm = np.zeros((self.size, 3))
+        self.coolant_temperature_c = np.full(self.size, self.config.ambient_temp_c)
+        self.coolant_flow_lpm = np.full(self.size, 12.0)
+        self.spindle_kw = zeros.copy()
+        self.servo_kw = zeros.copy()
+
+    def tick(self, delta_s: float, timestamp: datetime | None = None) -> None:
+        """Advance every machine by ``delta_s`` seconds."""
+
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+        self.failures.tick(delta_s / 60.0)
+        impact = self.failures.impact()
+        if delta_s > 0:
+            delta_min = delta_s / 60.0
+            self.tool_runtime_minutes += delta_min
+            wear_rate = self.wear_rate_per_min * impact["tool_wear_multiplier"]
+            np.minimum(
+                self.tool_wear_percent + wear_rate * delta_min,
+                100.0,
+                out=self.tool_wear_percent,
+            )
+
+        draws = self._rng.random((_DRAWS, self.size))
+        self.rpm = 3000.0 + 15000.0 * draws[_RPM]
+        self.load_percent = 20.0 + 60.0 * draws[_LOAD]
+        self.spindle_temperature_c = np.minimum(
+            120.0, 25.0 + 35.0 * draws[_SPINDLE_TEMP] + impact["temp_offset_c"]
+        )
+        self.feed_mm_min = 500.0 + 7500.0 * draws[_FEED]
+        offset_mm = impact["position_drift_mm"] + impact["backlash_mm"]
+        self.position_mm[:, 0] = 250.0 * draws[_X] + offset_mm
+        self.position_mm[:, 1] = 250.0 * draws[_Y] + offset_mm
+        self.position_mm[:, 2] = -100.0 * draws[_Z] + offset_mm
+        self.coolant_temperature_c = 20.0 + 10.0 * draws[_COOLANT_TEMP]
+        self.coolant_flow_lpm = np.maximum(
+            0.0, 12.0 * impact["coolant_flow_multiplier"]
+        )
+
+        torque_nm = 6.0 + 0.0005 * self.rpm
+        self.spindle_kw = self.spindle.power_kw(rpm=self.rpm, torque_nm=torque_nm)
+        self.servo_kw = 0.5 + 0.0002 * self.feed_mm_min
+        self.vibration_mm_s = np.minimum(
+            20.0,
+            self.spindle.vibration_mm_s_batch(self.tool_wear_percent)
+            * impact["vibration_multiplier"],
+        )
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Return the current fleet state as columnar arrays."""
+
+        return {
+            "spindle.rpm": self.rpm,
+            "spindle.load_percent": self.load_percent,
+            "spindle.temperature_c": self.spindle_temperature_c,
+            "spindle.vibration_mm_s": self.vibration_mm_s,
+            "axes.x.position_mm": self.position_mm[:, 0],
+            "axes.y.position_mm": self.position_mm[:, 1],
+            "axes.z.position_mm": self.position_mm[:, 2],
+            "axes.x.velocity_mm_min": self.feed_mm_min,
+            "axes.y.velocity_mm_min": self.feed_mm_min,
+            "axes.z.velocity_mm_min": self.feed_mm_min / 2.0,
+            "tool.wear_percent": self.tool_wear_percent,
+            "tool.runtime_minutes": self.tool_runtime_minutes,
+            "coolant.flow_rate_lpm": self.coolant_flow_lpm,
+            "coolant.temperature_c": self.coolant_temperature_c,
+            "power.spindle_kw": self.spindle_kw,
+            "power.servo_kw": self.servo_kw,
+            "power.total_kw": self.spindle_kw + self.servo_kw,
+        }
+
+    def telemetry(self, index: int) -> Telemetry:
+        """Build the validated telemetry model for one machine."""
+
+        return telemetry_from_row(
+            tuple(
+                value[index] if isinstance(value, (list, np.ndarray)) else value
+                for value in self._columns()
+            )
+        )
+
+    def rows(self) -> Iterator[tuple]:
+        """Yield one ``TELEMETRY_ROW_FIELDS`` tuple per machine.
+
+        Each column is converted to a Python list once, so building a row is
+        a ``zip`` step rather than per-element array indexing.
+        """
+
+        columns = []
+        for value in self._columns():
+            if isinstance(value, np.ndarray):
+                value = value.tolist()
+            elif not isinstance(value, list):
+                value = repeat(value, self.size)
+            columns.append(value)
+        return zip(*columns)
+
+    def iter_json(self) -> Iterator[bytes]:
+        """Yield every machine's sample as JSON bytes (trusted fast path).
+
+        With ``config.strict_validation`` each sample is validated through
+        the ``Telemetry`` model first.
+        """
+
+        if self.config.strict_validation:
+            for row in self.rows():
+                yield telemetry_json(telemetry_from_row(row))
+        else:
+            for row in self.rows():
+                yield telemetry_row_json(row)
+
+    def binary_batch(self) -> bytes:
+        """Every machine's sample as one binary batch (trusted fast path)."""
+
+        return encode_rows_binary(self.rows())
+
+    def _columns(self) -> List[object]:
+        """Row fields in ``TELEMETRY_ROW_FIELDS`` order.
+
+        Per-machine fields are arrays (or the id list); the rest are shared
+        constants.
+        """
+
+        return [
+            self.timestamp,
+            self.machine_ids,
+            self.rpm,
+            self.load_percent,
+            self.spindle_temperature_c,
+            self.vibration_mm_s,
+            self.position_mm[:, 0],
+            self.feed_mm_min,
+            self.position_mm[:, 1],
+            self.feed_mm_min,
+            self.position_mm[:, 2],
+            self.feed_mm_min / 2.0,
+            "T01",
+            "end_mill",
+            10.0,
+            self.tool_wear_percent,
+            self.tool_runtime_minutes,
+            self.coolant_flow_lpm,
+            self.coolant_temperature_c,
+            4.0,
+            self.spindle_kw + self.servo_kw,
+            self.spindle_kw,
+            self.servo_kw,
+            "AUTO",
+            "O1234",
+            "N0100",
+            int(self.config.cycle_time_s * 1000),
+        ]
+
+    def labels(self) -> Dict[str, np.ndarray]:
+        """Failure severity per kind and machine, aligned with ``snapshot``."""
+
+        return self.failures.labels()
+
+    def vibration_blocks(self) -> np.ndarray:
+        """``(machines, block_size)`` raw vibration for the current tick."""
+
+        if self._vibration is None:
+            self._vibration = VibrationSynthesizer(
+                spindle=self.spindle,
+                sample_rate_hz=self.config.vibration_sample_rate_hz,
+                block_size=self.config.vibration_block_size,
+                seed=self.seed,
+            )
+        return self._vibration.synthesize_batch(
+            self.rpm,
+            self.failures.labels()["SPINDLE_BEARING_DEGRADATION"],
+            self.vibration_mm_s,
+        )
+
+    def iter_telemetry(self) -> Iterator[Telemetry]:
+        for row in self.rows():
+            yield telemetry_from_row(row)
+
+    async def run(
+        self,
+        on_tick: Callable[["FleetSimulator"], None] | None = None,
+        max_ticks: int | None = None,
+    ) -> None:
+        """Tick the fleet at the configured cycle time."""
+
+        cycle_s = self.config.cycle_time_s
+        last = time.monotonic()
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            now = time.monotonic()
+            self.tick(now - last)
+            last = now
+            if on_tick is not None:
+                on_tick(self)
+            ticks += 1
+            elapsed = time.monotonic() - now
+            await asyncio.sleep(max(0.0, cycle_s - elapsed))
@@ -0,0 +1,357 @@
+"""Execute G-code programs into precomputed axis trajectories."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+from gcode_parser import GCodeCommand, GCodeParser
+
+Vector = Tuple[float, float, float]
+
+RAPID, LINEAR, ARC_CW, ARC_CCW, DWELL = 0, 1, 2, 3, -1
+_MM_PER_INCH = 25.4
+# Arc plane -> (first, second, normal) axis indices; G18 is the ZX plane.
+PLANE_AXES = {17: (0, 1, 2), 18: (2, 0, 1), 19: (1, 2, 0)}
+
+
+@dataclass(frozen=True)
+class MotionSegment:
+    """One executed block: a move, an arc, or a timed dwell."""
+
+    motion: int
+    start: Vector
+    end: Vector
+    feed_mm_min: float
+    spindle_rpm: float
+    tool: int
+    block: str
+    duration_s: float
+    center: Tuple[float, float] | None = None
+    sweep_rad: float = 0.0
+    plane: int = 17
+
+    @property
+    def radius_mm(self) -> float:
+        if self.center is None:
+            return 0.0
+        first, second, _ = PLANE_AXES[self.plane]
+        return math.hypot(
+            self.start[first] - self.center[0], self.start[second] - self.center[1]
+        )
+
+    @property
+    def length_mm(self) -> float:
+        if self.motion == DWELL:
+            return 0.0
+        if self.center is not None:
+            normal = PLANE_AXES[self.plane][2]
+            rise = self.end[normal] - self.start[normal]
+            return math.hypot(abs(self.sweep_rad) * self.radius_mm, rise)
+        return math.dist(self.start, self.end)
+
+
+@dataclass
+class ModalState:
+    """Modal machine state carried between blocks."""
+
+    motion: int = RAPID
+    absolute: bool = True
+    unit_scale: float = 1.0
+    feed_mm_min: float = 0.0
+    spindle_rpm: float = 0.0
+    spindle_on: bool = False
+    tool: int = 0
+    pending_tool: int | None = None
+    position: Vector = (0.0, 0.0, 0.0)
+    plane: int = 17
+
+
+class TrajectorySample(NamedTuple):
+    x: float
+    y: float
+    z: float
+    vx: float
+    vy: float
+    vz: float
+    feed_mm_min: float
+    spindle_rpm: float
+    tool: int
+    block: str
+
+
+@dataclass
+class ProgramTrajectory:
+    """Per-tick axis positions and program state for a compiled program.
+
+    Every array has one entry per simulator cycle, so playback is an index
+    lookup regardless of program complexity.
+    """
+
+    name: str
+    cycle_time_s: float
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    feed_mm_min: np.ndarray
+    spindle_rpm: np.ndarray
+    tool: np.ndarray
+    block_index: np.ndarray
+    blocks: List[str]
+    velocity_mm_min: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        positions = np.stack([self.x, self.y, self.z], axis=1)
+        previous = np.vstack([positions[:1], positions[:-1]])
+        self.velocity_mm_min = np.abs(positions - previous) * (60.0 / self.cycle_time_s)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def duration_s(self) -> float:
+        return len(self) * self.cycle_time_s
+
+    def sample(self, tick: int) -> TrajectorySample:
+        """Return the state at ``tick``; playback loops at program end."""
+
+        i = tick % len(self)
+        vx, vy, vz = self.velocity_mm_min[i]
+        return TrajectorySample(
+            x=float(self.x[i]),
+            y=float(self.y[i]),
+            z=float(self.z[i]),
+            vx=float(vx),
+            vy=float(vy),
+            vz=float(vz),
+            feed_mm_min=float(self.feed_mm_min[i]),
+            spindle_rpm=float(self.spindle_rpm[i]),
+            tool=int(self.tool[i]),
+            block=self.blocks[self.block_index[i]],
+        )
+
+
+@dataclass
+class GCodeInterpreter:
+    """Run FANUC-style programs, tracking modal state between blocks.
+
+    Supports G0/G1/G2/G3 with G17/G18/G19 plane selection (arc centres from
+    I/J/K), G90/G91, G20/G21, F, S, M3/M4/M5, T with M6 tool changes, and
+    M2/M30 program end.
+    """
+
+    rapid_feed_mm_min: float = 15000.0
+    tool_change_s: float = 5.0
+    parser: GCodeParser = field(default_factory=GCodeParser)
+
+    def segments(self, lines: Iterable[str]) -> List[MotionSegment]:
+        state = ModalState()
+        segments: List[MotionSegment] = []
+        for line_no, line in enumerate(lines, start=1):
+            cmd = self.parser.parse_line(line)
+            number = cmd.block_number if cmd.block_number is not None else line_no
+            block = f"N{number:04d}"
+            if self._execute(cmd, state, block, segments):
+                break
+        return segments
+
+    def compile(
+        self, lines: Iterable[str], cycle_time_s: float, name: str = "O0001"
+    ) -> ProgramTrajectory:
+        if cycle_time_s <= 0:
+            raise ValueError("cycle_time_s must be positive")
+        segments = self.segments(lines)
+        if not segments:
+            raise ValueError("Program contains no executable blocks")
+
+        blocks: List[str] = []
+        block_ids: dict[str, int] = {}
+        xs, ys, zs, feeds, rpms, tools, block_idx = [], [], [], [], [], [], []
+        for segment in segments:
+            ticks = max(1, math.ceil(segment.duration_s / cycle_time_s))
+            t = np.arange(1, ticks + 1) / ticks
+            x, y, z = _interpolate(segment, t)
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+            feed = 0.0 if segment.motion == DWELL else segment.feed_mm_min
+            feeds.append(np.full(ticks, feed))
+            rpms.append(np.full(ticks, segment.spindle_rpm))
+            tools.append(np.full(ticks, segment.tool, dtype=np.int32))
+            index = block_ids.setdefault(segment.block, len(blocks))
+            if index == len(blocks):
+                blocks.append(segment.block)
+            block_idx.append(np.full(ticks, index, dtype=np.int32))
+
+        return ProgramTrajectory(
+            name=name,
+            cycle_time_s=cycle_time_s,
+            x=np.concatenate(xs),
+            y=np.concatenate(ys),
+            z=np.concatenate(zs),
+            feed_mm_min=np.concatenate(feeds),
+            spindle_rpm=np.concatenate(rpms),
+            tool=np.concatenate(tools),
+            block_index=np.concatenate(block_idx),
+            blocks=blocks,
+        )
+
+    def compile_file(self, path: str | Path, cycle_time_s: float) -> ProgramTrajectory:
+        path = Path(path)
+        text = path.read_text()
+        return self.compile(
+            text.splitlines(), cycle_time_s, name=program_name(text, path.stem)
+        )
+
+    def _execute(
+        self,
+        cmd: GCodeCommand,
+        state: ModalState,
+        block: str,
+        segments: List[MotionSegment],
+    ) -> bool:
+        """Apply one block to ``state``; return True when the program ends."""
+
+        for code in cmd.g_codes:
+            if code in (RAPID, LINEAR, ARC_CW, ARC_CCW):
+                state.motion = code
+            elif code == 90:
+                state.absolute = True
+            elif code == 91:
+                state.absolute = False
+            elif code == 20:
+                state.unit_scale = _MM_PER_INCH
+            elif code == 21:
+                state.unit_scale = 1.0
+            elif code in PLANE_AXES:
+                state.plane = code
+        if cmd.f is not None:
+            state.feed_mm_min = cmd.f * state.unit_scale
+        if cmd.s is not None:
+            state.spindle_rpm = cmd.s
+        if cmd.t is not None:
+            state.pending_tool = cmd.t
+
+        for code in cmd.m_codes:
+            if code in (3, 4):
+                state.spindle_on = True
+            elif code == 5:
+                state.spindle_on = False
+            elif code == 6 and state.pending_tool is not None:
+                state.tool = state.pending_tool
+                state.spindle_on = False
+                segments.append(
+                    MotionSegment(
+                        motion=DWELL,
+                        start=state.position,
+                        end=state.position,
+                        feed_mm_min=0.0,
+                        spindle_rpm=0.0,
+                        tool=state.tool,
+                        block=block,
+                        duration_s=self.tool_change_s,
+                    )
+                )
+
+        if cmd.x is not None or cmd.y is not None or cmd.z is not None:
+            segments.append(self._move(cmd, state, block))
+
+        return any(code in (2, 30) for code in cmd.m_codes)
+
+    def _move(self, cmd: GCodeCommand, state: ModalState, block: str) -> MotionSegment:
+        start = state.position
+        target = []
+        for axis, value in enumerate((cmd.x, cmd.y, cmd.z)):
+            if value is None:
+                target.append(start[axis])
+            elif state.absolute:
+                target.append(value * state.unit_scale)
+            else:
+                target.append(start[axis] + value * state.unit_scale)
+        end: Vector = (target[0], target[1], target[2])
+        state.position = end
+
+        if state.motion == RAPID:
+            feed = self.rapid_feed_mm_min
+        else:
+            feed = state.feed_mm_min
+            if feed <= 0:
+                raise ValueError(f"{block}: feed rate required for G{state.motion}")
+
+        center = None
+        sweep = 0.0
+        if state.motion in (ARC_CW, ARC_CCW):
+            first, second, _ = PLANE_AXES[state.plane]
+            offsets = [(v or 0.0) * state.unit_scale for v in (cmd.i, cmd.j, cmd.k)]
+            center = (start[first] + offsets[first], start[second] + offsets[second])
+            sweep = _arc_sweep(
+                (start[first], start[second]),
+                (end[first], end[second]),
+                center,
+                clockwise=state.motion == ARC_CW,
+            )
+
+        segment = MotionSegment(
+            motion=state.motion,
+            start=start,
+            end=end,
+            feed_mm_min=feed,
+            spindle_rpm=state.spindle_rpm if state.spindle_on else 0.0,
+            tool=state.tool,
+            block=block,
+            duration_s=0.0,
+            center=center,
+            sweep_rad=sweep,
+            plane=state.plane,
+        )
+        return replace(segment, duration_s=60.0 * segment.length_mm / feed)
+
+
+def program_name(text: str, default: str) -> str:
+    """Return the O-number from a leading ``(O1234 ...)`` comment if present."""
+
+    for line in text.splitlines():
+        stripped = line.strip().lstrip("(").upper()
+        if not stripped:
+            continue
+        word = stripped.split()[0].rstrip(")")
+        if word.startswith("O") and word[1:].isdigit():
+            return word
+        break
+    return default
+
+
+def _arc_sweep(
+    start: Tuple[float, float],
+    end: Tuple[float, float],
+    center: Tuple[float, float],
+    clockwise: bool,
+) -> float:
+    a0 = math.atan2(start[1] - center[1], start[0] - center[0])
+    a1 = math.atan2(end[1] - center[1], end[0] - center[0])
+    sweep = a1 - a0
+    if clockwise and sweep >= 0:
+        sweep -= 2.0 * math.pi
+    elif not clockwise and sweep <= 0:
+        sweep += 2.0 * math.pi
+    return sweep
+
+
+def _interpolate(
+    segment: MotionSegment, t: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    start = segment.start
+    end = segment.end
+    axes = [start[axis] + (end[axis] - start[axis]) * t for axis in range(3)]
+    if segment.center is not None:
+        first, second, _ = PLANE_AXES[segment.plane]
+        ca, cb = segment.center
+        angle = (
+            math.atan2(start[second] - cb, start[first] - ca) + segment.sweep_rad * t
+        )
+        axes[first] = ca + segment.radius_mm * np.cos(angle)
+        axes[second] = cb + segment.radius_mm * np.sin(angle)
+    return axes[0], axes[1], axes[2]
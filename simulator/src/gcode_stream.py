@@ -0,0 +1,278 @@
+"""Streaming G-code parser producing a compact columnar program."""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+_NUMBER_RE = re.compile(rb"[-+]?\d*\.?\d+")
+_NUMBER_CHARS = np.zeros(256, dtype=bool)
+_NUMBER_CHARS[list(b"0123456789.+-")] = True
+# Parenthesised comments (never spanning lines) and ``;`` end-of-line comments.
+_COMMENT_RE = re.compile(rb"\([^)\n]*\)?|;[^\n]*")
+_FLOAT_WORDS = tuple(b"XYZIJKFS")
+_INT_WORDS = tuple(b"NT")
+_MODAL_WORDS = ("x", "y", "z", "f", "s")
+_G, _M = b"GM"
+_MOTION_CODES = frozenset((0, 1, 2, 3))
+
+
+@dataclass
+class ProgramColumns:
+    """Struct-of-arrays view of a parsed program, one row per block.
+
+    Missing words are NaN (floats) or -1 (integers). G and M codes are
+    stored as indices into interned code-set tables, so repeated
+    combinations such as ``(1,)`` share a single tuple.
+    """
+
+    line_number: np.ndarray
+    block_number: np.ndarray
+    motion: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    i: np.ndarray
+    j: np.ndarray
+    k: np.ndarray
+    f: np.ndarray
+    s: np.ndarray
+    t: np.ndarray
+    g_set: np.ndarray
+    m_set: np.ndarray
+    g_code_sets: List[Tuple[int, ...]]
+    m_code_sets: List[Tuple[int, ...]]
+
+    def __len__(self) -> int:
+        return len(self.line_number)
+
+    def g_codes(self, row: int) -> Tuple[int, ...]:
+        return self.g_code_sets[self.g_set[row]]
+
+    def m_codes(self, row: int) -> Tuple[int, ...]:
+        return self.m_code_sets[self.m_set[row]]
+
+
+class StreamingGCodeParser:
+    """Parse large programs in bulk into ``ProgramColumns``.
+
+    Input is consumed in newline-aligned chunks (memory-mapped for files)
+    and tokenized with array operations over the raw bytes, so there is no
+    per-line Python work. With ``modal=True`` axis words, feed, spindle
+    speed and the motion G code carry over from earlier blocks (a
+    vectorized forward fill), so every row holds the commanded state.
+    Words must follow their address letter directly (``X10``, not
+    ``X 10``), as with ``GCodeParser``.
+    """
+
+    def __init__(self, chunk_bytes: int = 4 << 20) -> None:
+        if chunk_bytes <= 0:
+            raise ValueError("chunk_bytes must be positive")
+        self.chunk_bytes = chunk_bytes
+
+    def parse_file(self, path: str | Path, modal: bool = False) -> ProgramColumns:
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return self._parse_chunks((), modal)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self._parse_chunks(self._mmap_chunks(mm), modal)
+
+    def parse_text(self, text: str, modal: bool = False) -> ProgramColumns:
+        return self._parse_chunks((text.encode("ascii", "ignore"),), modal)
+
+    def parse_lines(self, lines: Iterable[str], modal: bool = False) -> ProgramColumns:
+        return self.parse_text("\n".join(line.rstrip("\r\n") for line in lines), modal)
+
+    def _mmap_chunks(self, mm: mmap.mmap) -> Iterator[bytes]:
+        start = 0
+        size = len(mm)
+        while start < size:
+            end = mm.find(b"\n", min(start + self.chunk_bytes, size) - 1)
+            end = size if end < 0 else end + 1
+            yield mm[start:end]
+            start = end
+
+    def _parse_chunks(self, chunks: Iterable[bytes], modal: bool) -> ProgramColumns:
+        parts: Dict[int, Tuple[List[np.ndarray], List[np.ndarray]]] = {
+            letter: ([], []) for letter in _FLOAT_WORDS + _INT_WORDS
+        }
+        line_parts: List[np.ndarray] = []
+        g_rows, g_ids, m_rows, m_ids = array("i"), array("i"), array("i"), array("i")
+        g_intern: Dict[Tuple[int, ...], int] = {(): 0}
+        m_intern: Dict[Tuple[int, ...], int] = {(): 0}
+        row = 0
+        line_offset = 1
+
+        for chunk in chunks:
+            if not chunk.endswith(b"\n"):
+                chunk += b"\n"
+            if b"(" in chunk or b";" in chunk:
+                chunk = _COMMENT_RE.sub(b"", chunk)
+            letters, values, word_line = _tokenize(chunk)
+            # A word opens a block when it is the first on its line.
+            opens = np.empty(len(word_line), dtype=bool)
+            opens[:1] = True
+            np.not_equal(word_line[1:], word_line[:-1], out=opens[1:])
+            line_parts.append(word_line[opens].astype(np.int32) + line_offset)
+            word_row = (np.cumsum(opens) - 1).astype(np.int32) + row
+            row += int(opens.sum())
+            line_offset += chunk.count(b"\n")
+
+            for letter, (rows, vals) in parts.items():
+                mask = letters == letter
+                if mask.any():
+                    rows.append(word_row[mask])
+                    vals.append(values[mask])
+            _collect_codes(letters, values, word_row, _G, g_intern, g_rows, g_ids)
+            _collect_codes(letters, values, word_row, _M, m_intern, m_rows, m_ids)
+
+        columns = {
+            chr(letter).lower(): _dense(row, rows, vals, math.nan, np.float64)
+            for letter, (rows, vals) in parts.items()
+        }
+        g_code_sets = list(g_intern)
+        g_set = _dense_codes(row, g_rows, g_ids)
+        set_motion = np.array(
+            [
+                next((c for c in reversed(s) if c in _MOTION_CODES), -1)
+                for s in g_code_sets
+            ],
+            dtype=np.int8,
+        )
+        motion = set_motion[g_set]
+        if modal:
+            motion = _forward_fill(motion, motion >= 0)
+            for name in _MODAL_WORDS:
+                columns[name] = _forward_fill(columns[name], ~np.isnan(columns[name]))
+
+        return ProgramColumns(
+            line_number=(
+                np.concatenate(line_parts) if line_parts else np.zeros(0, np.int32)
+            ),
+            block_number=_as_int(columns["n"]),
+            motion=motion,
+            x=columns["x"],
+            y=columns["y"],
+            z=columns["z"],
+            i=columns["i"],
+            j=columns["j"],
+            k=columns["k"],
+            f=columns["f"],
+            s=columns["s"],
+            t=_as_int(columns["t"]),
+            g_set=g_set,
+            m_set=_dense_codes(row, m_rows, m_ids),
+            g_code_sets=g_code_sets,
+            m_code_sets=list(m_intern),
+        )
+
+
+def _tokenize(chunk: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (letter, value, line index) for every address word in ``chunk``.
+
+    Works on the raw bytes with array masks: a word is a letter directly
+    followed by a run of number characters, and the runs are cut out as
+    fixed-width strings that numpy converts to floats in one call.
+    """
+
+    buf = np.frombuffer(chunk, dtype=np.uint8)
+    upper = buf & 0xDF
+    number = _NUMBER_CHARS[buf]
+    starts = np.flatnonzero(
+        (upper[:-1] >= ord("A")) & (upper[:-1] <= ord("Z")) & number[1:]
+    )
+    if not len(starts):
+        return (np.empty(0, np.uint8), np.empty(0), np.empty(0, np.int64))
+    first = starts + 1
+    stops = np.flatnonzero(~number)
+    length = stops[np.searchsorted(stops, first)] - first
+    width = int(length.max())
+    window = buf[np.minimum(first[:, None] + np.arange(width), len(buf) - 1)]
+    window[np.arange(width) >= length[:, None]] = ord(" ")
+    text = window.view(f"S{width}").ravel()
+    try:
+        values = text.astype(np.float64)
+    except ValueError:
+        values = np.array([_number(word) for word in text.tolist()])
+    newlines = np.flatnonzero(buf == ord("\n"))
+    valid = ~np.isnan(values)
+    return (
+        upper[starts][valid],
+        values[valid],
+        np.searchsorted(newlines, starts[valid]),
+    )
+
+
+def _number(text: bytes) -> float:
+    match = _NUMBER_RE.match(text)
+    return float(match.group()) if match else math.nan
+
+
+def _intern(table: Dict[Tuple[int, ...], int], codes: Tuple[int, ...]) -> int:
+    index = table.get(codes)
+    if index is None:
+        index = len(table)
+        table[codes] = index
+    return index
+
+
+def _collect_codes(
+    letters: np.ndarray,
+    values: np.ndarray,
+    word_row: np.ndarray,
+    letter: int,
+    table: Dict[Tuple[int, ...], int],
+    rows: array,
+    ids: array,
+) -> None:
+    """Group the ``letter`` words of each block into interned code sets."""
+
+    mask = letters == letter
+    if not mask.any():
+        return
+    codes = values[mask].astype(np.int64).tolist()
+    owners = word_row[mask].tolist()
+    start = 0
+    for end in range(1, len(owners) + 1):
+        if end == len(owners) or owners[end] != owners[start]:
+            rows.append(owners[start])
+            ids.append(_intern(table, tuple(codes[start:end])))
+            start = end
+
+
+def _dense(
+    size: int,
+    rows: List[np.ndarray],
+    values: List[np.ndarray],
+    fill: float,
+    dtype: type,
+) -> np.ndarray:
+    column = np.full(size, fill, dtype=dtype)
+    if rows:
+        column[np.concatenate(rows)] = np.concatenate(values)
+    return column
+
+
+def _dense_codes(size: int, rows: array, ids: array) -> np.ndarray:
+    column = np.zeros(size, dtype=np.int32)
+    if rows:
+        column[np.frombuffer(rows, dtype=np.int32)] = np.frombuffer(ids, np.int32)
+    return column
+
+
+def _as_int(column: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(column), -1, column).astype(np.int32)
+
+
+def _forward_fill(column: np.ndarray, present: np.ndarray) -> np.ndarray:
+    index = np.where(present, np.arange(len(column)), 0)
+    np.maximum.accumulate(index, out=index)
+    return column[index]
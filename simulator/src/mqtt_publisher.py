@@ -2,19 +2,219 @@
 
 from __future__ import annotations
 
+import gzip
 import json
+import os
+import struct
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Literal
+
+from config import MqttConfig
+from vibration import VibrationBlock
 
 try:
     import paho.mqtt.client as mqtt
 except Exception:  # pragma: no cover - optional for tests
     mqtt = None
 
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+Compression = Literal["none", "gzip", "zstd"]
+DropPolicy = Literal["drop_oldest", "drop_newest"]
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_RECORD_HEADER = struct.Struct("<I")
+
+
+def encode_batch(samples: List[dict], compression: Compression = "none") -> bytes:
+    """Pack samples into one JSON array payload, optionally compressed."""
+
+    return encode_json_batch(
+        [json.dumps(sample, separators=(",", ":")).encode() for sample in samples],
+        compression,
+    )
+
+
+def encode_json_batch(
+    messages: List[bytes], compression: Compression = "none"
+) -> bytes:
+    """Like ``encode_batch`` for samples that are already JSON-encoded."""
+
+    data = b"[" + b",".join(messages) + b"]"
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression")
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if compression != "none":
+        raise ValueError(f"Unsupported compression: {compression}")
+    return data
+
+
+def decode_batch(payload: bytes) -> List[dict]:
+    """Inverse of ``encode_batch``; the encoding is detected from magic bytes."""
+
+    if payload.startswith(_GZIP_MAGIC):
+        payload = gzip.decompress(payload)
+    elif payload.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for zstd payloads")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    return json.loads(payload)
+
+
+@dataclass
+class OfflineBuffer:
+    """Bounded FIFO of encoded messages held while the broker is unreachable.
+
+    At most ``max_messages`` are kept in memory. When full, the oldest
+    in-memory message is spilled to ``spill_path`` (length-prefixed records,
+    up to ``max_spill_bytes`` not yet read back) if configured; otherwise, or
+    once the spill file is full, ``drop_policy`` discards either the incoming
+    message or the oldest one, which is the head of the spill file whenever
+    it holds any. ``popleft`` always returns messages in arrival order.
+
+    Records left in ``spill_path`` by a previous run are older than anything
+    new, so they are recovered and replayed first; a record cut short by a
+    crash is discarded.
+    """
+
+    max_messages: int = 10_000
+    drop_policy: DropPolicy = "drop_oldest"
+    spill_path: str | None = None
+    max_spill_bytes: int = 64 * 1024 * 1024
+
+    dropped: int = field(default=0, init=False)
+    _memory: Deque[bytes] = field(default_factory=deque, init=False)
+    _spill: BinaryIO | None = field(default=None, init=False)
+    _spilled: int = field(default=0, init=False)
+    _spill_bytes: int = field(default=0, init=False)
+    _read_offset: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        if self.max_messages <= 0:
+            raise ValueError("max_messages must be positive")
+        if self.drop_policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unsupported drop policy: {self.drop_policy}")
+        if self.spill_path is not None and os.path.exists(self.spill_path):
+            self._recover_spill()
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
+
+    def append(self, message: bytes) -> None:
+        if len(self._memory) < self.max_messages:
+            self._memory.append(message)
+            return
+        if self.drop_policy == "drop_oldest":
+            # The oldest messages are on disk; drop those to make room.
+            while self._spilled and not self._can_spill(self._memory[0]):
+                self._read_spill()
+                self.dropped += 1
+        if self._can_spill(self._memory[0]):
+            self._write_spill(self._memory.popleft())
+            self._memory.append(message)
+            return
+        self.dropped += 1
+        if self.drop_policy == "drop_oldest":
+            self._memory.popleft()
+            self._memory.append(message)
+
+    def popleft(self) -> bytes:
+        if self._spilled:
+            return self._read_spill()
+        return self._memory.popleft()
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _can_spill(self, message: bytes) -> bool:
+        if self.spill_path is None:
+            return False
+        size = _RECORD_HEADER.size + len(message)
+        return self._spill_bytes + size <= self.max_spill_bytes
+
+    def _write_spill(self, message: bytes) -> None:
+        if self._spill is None:
+            self._spill = open(self.spill_path, "w+b")
+        if self._read_offset >= self.max_spill_bytes:
+            self._compact_spill()
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(_RECORD_HEADER.pack(len(message)))
+        self._spill.write(message)
+        self._spilled += 1
+        self._spill_bytes += _RECORD_HEADER.size + len(message)
+
+    def _read_spill(self) -> bytes:
+        self._spill.seek(self._read_offset)
+        (length,) = _RECORD_HEADER.unpack(self._spill.read(_RECORD_HEADER.size))
+        message = self._spill.read(length)
+        self._read_offset += _RECORD_HEADER.size + length
+        self._spill_bytes -= _RECORD_HEADER.size + length
+        self._spilled -= 1
+        if not self._spilled:
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._read_offset = 0
+            self._spill_bytes = 0
+        return message
+
+    def _compact_spill(self) -> None:
+        # Messages dropped from the head leave dead bytes; move the live tail
+        # to the start so the file stays within about twice the budget.
+        self._spill.seek(self._read_offset)
+        live = self._spill.read()
+        self._spill.seek(0)
+        self._spill.write(live)
+        self._spill.truncate()
+        self._read_offset = 0
+
+    def _recover_spill(self) -> None:
+        self._spill = open(self.spill_path, "r+b")
+        end = self._spill.seek(0, os.SEEK_END)
+        offset = 0
+        while offset + _RECORD_HEADER.size <= end:
+            self._spill.seek(offset)
+            (length,) = _RECORD_HEADER.unpack(self._spill.read(_RECORD_HEADER.size))
+            if offset + _RECORD_HEADER.size + length > end:
+                break
+            offset += _RECORD_HEADER.size + length
+            self._spilled += 1
+        self._spill.truncate(offset)
+        self._spill_bytes = offset
+
 
 @dataclass
 class MQTTPublisher:
-    """Publish telemetry to an MQTT broker with buffering and TLS support."""
+    """Publish telemetry to an MQTT broker with buffering and TLS support.
+
+    With ``batch_size`` above 1, samples are packed into one message (a JSON
+    array, optionally gzip/zstd compressed) on ``batch_topic``. A batch is
+    sent when it is full, on ``flush``, or once ``batch_max_delay_s`` has
+    passed since its first sample: the next publish checks the deadline and
+    a timer thread sends the batch if no publish comes. A gateway can publish
+    many machines' samples through one publisher this way; calls are
+    serialized by a lock shared with the timer.
+
+    While disconnected, messages go to a bounded ``OfflineBuffer``. On
+    reconnect the backlog is replayed at up to ``flush_rate_per_s``
+    messages per second (unlimited by default), continuing on later
+    ``publish``/``flush`` calls; live messages are not held behind it.
+    """
 
     machine_id: str
     broker_host: str = "localhost"
@@ -24,17 +224,71 @@ class MQTTPublisher:
     key_path: str | None = None
     ca_path: str | None = None
     client_factory: Callable[[], object] | None = None
+    batch_size: int = 1
+    batch_max_delay_s: float = 1.0
+    compression: Compression = "none"
+    buffer: OfflineBuffer = field(default_factory=OfflineBuffer)
+    flush_rate_per_s: float | None = None
+    clock: Callable[[], float] = time.monotonic
 
     client: object | None = field(default=None, init=False)
-    _queue: list[str] = field(default_factory=list, init=False)
     _connected: bool = field(default=False, init=False)
+    _batch: List[bytes] = field(default_factory=list, init=False)
+    _batch_started: float = field(default=0.0, init=False)
+    _batch_qos: int = field(default=0, init=False)
+    _batch_timer: threading.Timer | None = field(default=None, init=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False)
+    _tokens: float = field(default=0.0, init=False)
+    _tokens_at: float = field(default=0.0, init=False)
+    _stats: Dict[str, int] = field(init=False)
+
+    @classmethod
+    def from_config(
+        cls, machine_id: str, config: MqttConfig | None = None, **kwargs: Any
+    ) -> "MQTTPublisher":
+        """Publisher with broker, TLS, batching and buffer settings from ``config``.
+
+        ``{machine_id}`` in ``spill_path`` is replaced, so publishers for
+        several machines spill to separate files.
+        """
+
+        config = config or MqttConfig()
+        spill_path = config.spill_path
+        return cls(
+            machine_id=machine_id,
+            broker_host=config.broker_host,
+            broker_port=config.broker_port,
+            use_tls=config.use_tls,
+            cert_path=config.cert_path,
+            key_path=config.key_path,
+            ca_path=config.ca_path,
+            batch_size=config.batch_size,
+            batch_max_delay_s=config.batch_max_delay_s,
+            compression=config.compression,
+            buffer=OfflineBuffer(
+                max_messages=config.buffer_max_messages,
+                drop_policy=config.drop_policy,
+                spill_path=(
+                    spill_path.format(machine_id=machine_id) if spill_path else None
+                ),
+            ),
+            flush_rate_per_s=config.flush_rate_per_s,
+            **kwargs,
+        )
 
     def __post_init__(self) -> None:
+        if self.batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if self.flush_rate_per_s is not None and self.flush_rate_per_s <= 0:
+            raise ValueError("flush_rate_per_s must be positive")
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression")
         if self.client_factory is None:
             if mqtt is None:
                 raise RuntimeError("paho-mqtt is required to create a client")
             self.client_factory = mqtt.Client
         self.client = self.client_factory()
+        self._stats = {"messages": 0, "samples": 0, "bytes": 0}
 
         if self.use_tls:
             self.client.tls_set(
@@ -45,34 +299,147 @@ class MQTTPublisher:
     def topic(self) -> str:
         return f"dt/cnc/{self.machine_id}/telemetry"
 
+    @property
+    def batch_topic(self) -> str:
+        return f"{self.topic}/batch"
+
+    @property
+    def vibration_topic(self) -> str:
+        return f"dt/cnc/{self.machine_id}/vibration"
+
     def connect(self) -> None:
         self.client.connect(self.broker_host, self.broker_port, keepalive=60)
         if hasattr(self.client, "loop_start"):
             self.client.loop_start()
-        self._connected = True
-        self._flush_queue()
+        with self._lock:
+            self._connected = True
+            self._tokens = self._burst()
+            self._tokens_at = self.clock()
+            self._flush_queue()
 
     def disconnect(self) -> None:
         if hasattr(self.client, "loop_stop"):
             self.client.loop_stop()
         if hasattr(self.client, "disconnect"):
             self.client.disconnect()
-        self._connected = False
+        with self._lock:
+            self._connected = False
 
     def publish(self, payload: dict, qos: int = 0) -> None:
-        message = json.dumps(payload)
-        if not self._connected:
-            self._queue.append(message)
+        if self.batch_size == 1:
+            self.publish_json(json.dumps(payload).encode(), qos)
             return
-        self.client.publish(self.topic, message, qos=qos)
+        self.publish_json(json.dumps(payload, separators=(",", ":")).encode(), qos)
+
+    def publish_json(self, message: bytes, qos: int = 0) -> None:
+        """Publish one sample that is already encoded as a JSON object."""
+
+        with self._lock:
+            if self.batch_size == 1:
+                self._send(message, samples=1, qos=qos)
+                return
+            self._add_to_batch(message, qos)
+
+    def publish_vibration(self, block: VibrationBlock, qos: int = 0) -> bool:
+        """Publish a raw vibration block in its binary form.
+
+        Waveforms are only useful while fresh, so they bypass the offline
+        buffer: nothing is sent (and ``False`` returned) while disconnected.
+        """
+
+        message = block.to_bytes()
+        with self._lock:
+            if not self._connected:
+                return False
+            self.client.publish(self.vibration_topic, message, qos=qos)
+            self._stats["bytes"] += len(message)
+        return True
+
+    def flush(self, qos: int = 0) -> None:
+        """Send any partial batch and replay as much backlog as allowed."""
+
+        with self._lock:
+            if self._batch:
+                self._send_batch(qos)
+            else:
+                self._flush_queue()
 
     def queue_size(self) -> int:
-        return len(self._queue)
+        return len(self.buffer)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self._stats,
+            "buffered": len(self.buffer),
+            "spilled": self.buffer.spilled,
+            "dropped": self.buffer.dropped,
+        }
+
+    def _add_to_batch(self, message: bytes, qos: int) -> None:
+        if not self._batch:
+            self._batch_started = self.clock()
+            self._batch_qos = qos
+        self._batch.append(message)
+        expired = self.clock() - self._batch_started >= self.batch_max_delay_s
+        if len(self._batch) >= self.batch_size or expired:
+            self._send_batch(qos)
+            return
+        if self._batch_timer is None:
+            self._batch_timer = threading.Timer(
+                self.batch_max_delay_s, self._send_expired_batch
+            )
+            self._batch_timer.daemon = True
+            self._batch_timer.start()
+        self._flush_queue()
+
+    def _send_expired_batch(self) -> None:
+        with self._lock:
+            self._batch_timer = None
+            if not self._batch:
+                return
+            if self.clock() - self._batch_started >= self.batch_max_delay_s:
+                self._send_batch(self._batch_qos)
+
+    def _send_batch(self, qos: int) -> None:
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+        self._send(
+            encode_json_batch(batch, self.compression), samples=len(batch), qos=qos
+        )
+
+    def _send(self, message: bytes, samples: int, qos: int) -> None:
+        self._stats["samples"] += samples
+        if not self._connected:
+            self.buffer.append(message)
+            return
+        self._flush_queue()
+        self._publish(message, qos)
+
+    def _publish(self, message: bytes, qos: int) -> None:
+        topic = self.batch_topic if self.batch_size > 1 else self.topic
+        self.client.publish(topic, message, qos=qos)
+        self._stats["messages"] += 1
+        self._stats["bytes"] += len(message)
 
     def _flush_queue(self) -> None:
-        if not self._queue:
+        if not self._connected or not len(self.buffer):
             return
-        pending = self._queue
-        self._queue = []
-        for message in pending:
-            self.client.publish(self.topic, message, qos=0)
+        budget = len(self.buffer)
+        if self.flush_rate_per_s is not None:
+            now = self.clock()
+            self._tokens = min(
+                self._burst(),
+                self._tokens + (now - self._tokens_at) * self.flush_rate_per_s,
+            )
+            self._tokens_at = now
+            budget = min(budget, int(self._tokens))
+            self._tokens -= budget
+        for _ in range(budget):
+            self._publish(self.buffer.popleft(), qos=0)
+
+    def _burst(self) -> float:
+        if self.flush_rate_per_s is None:
+            return 0.0
+        return max(1.0, self.flush_rate_per_s)
@@ -0,0 +1,197 @@
+"""Compact append-only recordings of telemetry streams."""
+
+from __future__ import annotations
+
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from models import Telemetry
+
+MAGIC = b"DTREC1\n"
+
+# Numeric fields stored per sample, as (section, sub-object or None, field).
+_FLOAT_FIELDS: Tuple[Tuple[str, str | None, str], ...] = (
+    ("spindle", None, "rpm"),
+    ("spindle", None, "load_percent"),
+    ("spindle", None, "temperature_c"),
+    ("spindle", None, "vibration_mm_s"),
+    ("axes", "x", "position_mm"),
+    ("axes", "x", "velocity_mm_min"),
+    ("axes", "y", "position_mm"),
+    ("axes", "y", "velocity_mm_min"),
+    ("axes", "z", "position_mm"),
+    ("axes", "z", "velocity_mm_min"),
+    ("tool", None, "diameter_mm"),
+    ("tool", None, "wear_percent"),
+    ("tool", None, "runtime_minutes"),
+    ("coolant", None, "flow_rate_lpm"),
+    ("coolant", None, "temperature_c"),
+    ("coolant", None, "pressure_bar"),
+    ("power", None, "total_kw"),
+    ("power", None, "spindle_kw"),
+    ("power", None, "servo_kw"),
+)
+_STRING_FIELDS: Tuple[Tuple[str | None, str], ...] = (
+    (None, "machine_id"),
+    ("tool", "id"),
+    ("tool", "type"),
+    ("status", "mode"),
+    ("status", "program"),
+    ("status", "block"),
+)
+
+_TAG = struct.Struct("<c")
+_STRING = struct.Struct("<IH")
+# timestamp (epoch s), float32 metrics, string ids, status.cycle_time_s
+_SAMPLE = struct.Struct(f"<d{len(_FLOAT_FIELDS)}f{len(_STRING_FIELDS)}II")
+_TAG_STRING, _TAG_SAMPLE = b"S", b"T"
+
+
+class TelemetryRecorder:
+    """Append telemetry samples to a binary recording.
+
+    The file is a magic header followed by tagged records: ``S`` defines an
+    interned string (machine ids, tool ids, program and block names) the
+    first time it is seen, and ``T`` is one fixed-size sample of 113
+    bytes (float64 timestamp, float32 metrics, string ids) compared with
+    roughly 900 bytes of JSON. Re-opening an existing recording appends to it.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._strings: Dict[str, int] = {}
+        self.count = 0
+        if self.path.exists() and self.path.stat().st_size:
+            end = len(MAGIC)
+            for tag, value, end in _read_records(self.path):
+                if tag == _TAG_STRING:
+                    self._strings[value] = len(self._strings)
+                else:
+                    self.count += 1
+            self._fh: BinaryIO = self.path.open("r+b")
+            # Drop a partially written trailing record before appending.
+            self._fh.truncate(end)
+            self._fh.seek(end)
+        else:
+            self._fh = self.path.open("wb")
+            self._fh.write(MAGIC)
+
+    def __enter__(self) -> "TelemetryRecorder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, telemetry: Telemetry) -> None:
+        string_ids = [
+            self._string_id(getattr(_owner(telemetry, section), name))
+            for section, name in _STRING_FIELDS
+        ]
+        floats = [
+            getattr(_owner(telemetry, section, axis), name)
+            for section, axis, name in _FLOAT_FIELDS
+        ]
+        self._fh.write(_TAG_SAMPLE)
+        self._fh.write(
+            _SAMPLE.pack(
+                telemetry.timestamp.timestamp(),
+                *floats,
+                *string_ids,
+                telemetry.status.cycle_time_s,
+            )
+        )
+        self.count += 1
+
+    def write_many(self, samples: Iterable[Telemetry]) -> None:
+        for telemetry in samples:
+            self.write(telemetry)
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def _string_id(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings[value] = index
+            encoded = value.encode()
+            self._fh.write(_TAG_STRING)
+            self._fh.write(_STRING.pack(index, len(encoded)))
+            self._fh.write(encoded)
+        return index
+
+
+def read_payloads(path: str | Path) -> Iterator[dict]:
+    """Yield recorded samples as JSON-ready telemetry dicts, in file order.
+
+    A truncated trailing record (e.g. from a crash mid-write) is ignored.
+    """
+
+    strings: List[str] = []
+    for tag, value, _ in _read_records(Path(path)):
+        if tag == _TAG_STRING:
+            strings.append(value)
+            continue
+        timestamp, *rest = value
+        floats = rest[: len(_FLOAT_FIELDS)]
+        ids = rest[len(_FLOAT_FIELDS) : -1]
+        payload: dict = {
+            "timestamp": datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(),
+            "spindle": {},
+            "axes": {"x": {}, "y": {}, "z": {}},
+            "tool": {},
+            "coolant": {},
+            "power": {},
+            "status": {"cycle_time_s": rest[-1]},
+        }
+        for (section, axis, name), number in zip(_FLOAT_FIELDS, floats):
+            owner = payload[section] if axis is None else payload[section][axis]
+            owner[name] = number
+        for (section, name), index in zip(_STRING_FIELDS, ids):
+            owner = payload if section is None else payload[section]
+            owner[name] = strings[index]
+        yield payload
+
+
+def read_telemetry(path: str | Path) -> Iterator[Telemetry]:
+    for payload in read_payloads(path):
+        yield Telemetry.model_validate(payload)
+
+
+def _owner(telemetry: Telemetry, *path: str | None) -> object:
+    owner: object = telemetry
+    for name in path:
+        if name is not None:
+            owner = getattr(owner, name)
+    return owner
+
+
+def _read_records(path: Path) -> Iterator[Tuple[bytes, object, int]]:
+    """Yield (tag, value, end offset) for each complete record."""
+
+    with path.open("rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry recording")
+        while True:
+            tag = fh.read(_TAG.size)
+            if tag == _TAG_STRING:
+                header = fh.read(_STRING.size)
+                if len(header) < _STRING.size:
+                    return
+                _, length = _STRING.unpack(header)
+                data = fh.read(length)
+                if len(data) < length:
+                    return
+                yield tag, data.decode(), fh.tell()
+            elif tag == _TAG_SAMPLE:
+                data = fh.read(_SAMPLE.size)
+                if len(data) < _SAMPLE.size:
+                    return
+                yield tag, _SAMPLE.unpack(data), fh.tell()
+            else:
+                return
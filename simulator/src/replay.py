@@ -0,0 +1,241 @@
+"""Replay recorded telemetry into the pipeline for load testing."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Protocol, Sequence
+
+import numpy as np
+from clock import Clock, SystemClock
+from mqtt_publisher import MQTTPublisher
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - optional for tests
+    httpx = None
+
+
+class Sink(Protocol):
+    """Destination for replayed samples."""
+
+    name: str
+
+    async def send(self, payloads: List[dict]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def _http_client(base_url: str, client: object | None) -> object:
+    if client is not None:
+        return client
+    if httpx is None:
+        raise RuntimeError("httpx is required for HTTP replay sinks")
+    return httpx.AsyncClient(base_url=base_url, timeout=10.0)
+
+
+@dataclass
+class DigitalTwinSink:
+    """POST each sample to digital-twin-api's telemetry ingest endpoint."""
+
+    base_url: str = "http://localhost:8000"
+    api_key: str = "dev-key"
+    client: object | None = None
+    name: str = "digital-twin-api"
+
+    def __post_init__(self) -> None:
+        self.client = _http_client(self.base_url, self.client)
+
+    async def send(self, payloads: List[dict]) -> None:
+        for payload in payloads:
+            machine_id = payload["machine_id"]
+            body = {
+                "timestamp": payload["timestamp"],
+                "machine_id": machine_id,
+                "data": {
+                    key: value
+                    for key, value in payload.items()
+                    if key not in ("timestamp", "machine_id")
+                },
+            }
+            response = await self.client.post(
+                f"/machines/{machine_id}/telemetry",
+                json=body,
+                headers={"x-api-key": self.api_key},
+            )
+            response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+@dataclass
+class AnomalyDetectionSink:
+    """POST samples as one ``TelemetryBatch`` to anomaly-detection ``/detect``."""
+
+    base_url: str = "http://localhost:8001"
+    client: object | None = None
+    name: str = "anomaly-detection"
+
+    def __post_init__(self) -> None:
+        self.client = _http_client(self.base_url, self.client)
+
+    async def send(self, payloads: List[dict]) -> None:
+        response = await self.client.post("/detect", json={"telemetry": payloads})
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+@dataclass
+class MQTTSink:
+    """Publish samples through one ``MQTTPublisher`` per machine."""
+
+    publisher_factory: Callable[[str], MQTTPublisher]
+    name: str = "mqtt"
+    _publishers: Dict[str, MQTTPublisher] = field(default_factory=dict, init=False)
+
+    async def send(self, payloads: List[dict]) -> None:
+        for payload in payloads:
+            machine_id = payload["machine_id"]
+            publisher = self._publishers.get(machine_id)
+            if publisher is None:
+                publisher = self.publisher_factory(machine_id)
+                publisher.connect()
+                self._publishers[machine_id] = publisher
+            publisher.publish(payload)
+
+    async def close(self) -> None:
+        for publisher in self._publishers.values():
+            publisher.flush()
+            publisher.disconnect()
+
+
+@dataclass
+class ReplayReport:
+    """Achieved throughput and per-request latency for one sink."""
+
+    sink: str
+    samples: int = 0
+    requests: int = 0
+    errors: int = 0
+    duration_s: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput_per_s(self) -> float:
+        return self.samples / self.duration_s if self.duration_s > 0 else 0.0
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self.latencies_ms:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(self.latencies_ms, [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+    def as_dict(self) -> Dict[str, float | int | str]:
+        return {
+            "sink": self.sink,
+            "samples": self.samples,
+            "requests": self.requests,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 3),
+            "throughput_per_s": round(self.throughput_per_s, 1),
+            **{f"latency_{k}_ms": round(v, 3) for k, v in self.percentiles().items()},
+        }
+
+
+@dataclass
+class Replayer:
+    """Drive recorded payloads into sinks at a chosen speed.
+
+    ``speed`` of 1.0 keeps the recorded pacing, N replays N times faster and
+    ``None`` sends as fast as the sinks accept. Each machine's stream runs
+    as its own task; ``clones`` multiplies the recording into that many
+    virtual machines (ids suffixed ``-000``, ``-001``, ...) to emulate a
+    larger fleet, and ``concurrency`` caps requests in flight per sink.
+    """
+
+    payloads: Sequence[dict]
+    sinks: Sequence[Sink]
+    speed: float | None = 1.0
+    clones: int = 1
+    concurrency: int = 64
+    batch_size: int = 1
+    clock: Clock = field(default_factory=SystemClock)
+
+    def __post_init__(self) -> None:
+        if self.speed is not None and self.speed <= 0:
+            raise ValueError("speed must be positive (or None for max speed)")
+        if self.clones <= 0 or self.concurrency <= 0 or self.batch_size <= 0:
+            raise ValueError("clones, concurrency and batch_size must be positive")
+
+    def streams(self) -> Dict[str, List[dict]]:
+        """Per-machine payload streams after cloning."""
+
+        streams: Dict[str, List[dict]] = {}
+        for clone in range(self.clones):
+            for payload in self.payloads:
+                machine_id = payload["machine_id"]
+                if self.clones > 1:
+                    machine_id = f"{machine_id}-{clone:03d}"
+                    payload = {**payload, "machine_id": machine_id}
+                streams.setdefault(machine_id, []).append(payload)
+        return streams
+
+    async def run(self) -> Dict[str, ReplayReport]:
+        reports = {sink.name: ReplayReport(sink=sink.name) for sink in self.sinks}
+        if not self.payloads:
+            return reports
+        origin = min(_epoch(payload) for payload in self.payloads)
+        limits = {sink.name: asyncio.Semaphore(self.concurrency) for sink in self.sinks}
+        started_at = self.clock.monotonic()
+        wall_start = time.perf_counter()
+
+        async def replay_stream(stream: List[dict]) -> None:
+            for start in range(0, len(stream), self.batch_size):
+                batch = stream[start : start + self.batch_size]
+                if self.speed is not None:
+                    due = (_epoch(batch[0]) - origin) / self.speed
+                    delay = due - (self.clock.monotonic() - started_at)
+                    if delay > 0:
+                        await self.clock.sleep(delay)
+                await asyncio.gather(
+                    *(
+                        self._send(sink, batch, limits[sink.name], reports[sink.name])
+                        for sink in self.sinks
+                    )
+                )
+
+        await asyncio.gather(*(replay_stream(s) for s in self.streams().values()))
+        elapsed = time.perf_counter() - wall_start
+        for report in reports.values():
+            report.duration_s = elapsed
+        return reports
+
+    async def _send(
+        self,
+        sink: Sink,
+        batch: List[dict],
+        limit: asyncio.Semaphore,
+        report: ReplayReport,
+    ) -> None:
+        async with limit:
+            started = time.perf_counter()
+            try:
+                await sink.send(batch)
+            except Exception:
+                report.errors += 1
+            else:
+                report.samples += len(batch)
+            report.requests += 1
+            report.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+
+
+def _epoch(payload: dict) -> float:
+    timestamp = payload["timestamp"]
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return datetime.fromisoformat(timestamp).timestamp()
@@ -5,6 +5,8 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass(frozen=True)
 class BearingGeometry:
@@ -68,3 +70,9 @@ class Spindle:
         wear = max(0.0, min(100.0, wear_percent)) / 100.0
         vibration = self.base_vibration_mm_s * math.exp(3.0 * wear)
         return min(vibration, 10.0)
+
+    def vibration_mm_s_batch(self, wear_percent: np.ndarray) -> np.ndarray:
+        """Vectorized ``vibration_mm_s`` for an array of wear values."""
+
+        wear = np.clip(wear_percent, 0.0, 100.0) / 100.0
+        return np.minimum(self.base_vibration_mm_s * np.exp(3.0 * wear), 10.0)
@@ -0,0 +1,168 @@
+"""Toolpath geometry and cycle-time estimation for G-code programs."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+from gcode_interpreter import (
+    ARC_CCW,
+    ARC_CW,
+    DWELL,
+    RAPID,
+    GCodeInterpreter,
+    MotionSegment,
+    program_name,
+)
+
+
+@dataclass(frozen=True)
+class MachineLimits:
+    """Kinematic limits used for cycle-time estimates."""
+
+    rapid_feed_mm_min: float = 15000.0
+    max_accel_mm_s2: float = 2000.0
+    tool_change_s: float = 5.0
+
+    def __post_init__(self) -> None:
+        if self.rapid_feed_mm_min <= 0 or self.max_accel_mm_s2 <= 0:
+            raise ValueError("Feed and acceleration limits must be positive")
+        if self.tool_change_s < 0:
+            raise ValueError("tool_change_s must not be negative")
+
+
+@dataclass(frozen=True)
+class ToolpathSummary:
+    """Distances and estimated times for one program."""
+
+    program: str
+    program_hash: str
+    segments: int
+    rapid_mm: float
+    feed_mm: float
+    arc_mm: float
+    rapid_s: float
+    feed_s: float
+    dwell_s: float
+    tool_changes: int
+
+    @property
+    def total_mm(self) -> float:
+        return self.rapid_mm + self.feed_mm
+
+    @property
+    def cycle_time_s(self) -> float:
+        return self.rapid_s + self.feed_s + self.dwell_s
+
+
+def move_times_s(
+    lengths_mm: np.ndarray, feeds_mm_min: np.ndarray, accel_mm_s2: float
+) -> np.ndarray:
+    """Time for each move under a trapezoidal velocity profile.
+
+    Every block starts and ends at rest (exact stop), which gives an upper
+    bound on cycle time. Moves too short to reach the programmed feed use
+    a triangular profile instead.
+    """
+
+    speed = feeds_mm_min / 60.0
+    ramp_mm = speed**2 / accel_mm_s2
+    cruise = lengths_mm >= ramp_mm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trapezoid = lengths_mm / speed + speed / accel_mm_s2
+    triangle = 2.0 * np.sqrt(lengths_mm / accel_mm_s2)
+    return np.where(cruise, trapezoid, triangle)
+
+
+def summarize(
+    segments: Sequence[MotionSegment],
+    limits: MachineLimits,
+    program: str = "O0001",
+    program_hash: str = "",
+) -> ToolpathSummary:
+    """Reduce executed segments to rapid/feed distance and estimated times."""
+
+    moves = [s for s in segments if s.motion != DWELL]
+    motion = np.array([s.motion for s in moves], dtype=np.int8)
+    lengths = np.array([s.length_mm for s in moves], dtype=np.float64)
+    feeds = np.array([s.feed_mm_min for s in moves], dtype=np.float64)
+    rapid = motion == RAPID
+    feeds[rapid] = limits.rapid_feed_mm_min
+    times = move_times_s(lengths, feeds, limits.max_accel_mm_s2)
+    arc = (motion == ARC_CW) | (motion == ARC_CCW)
+    tool_changes = len(segments) - len(moves)
+    return ToolpathSummary(
+        program=program,
+        program_hash=program_hash,
+        segments=len(moves),
+        rapid_mm=float(lengths[rapid].sum()),
+        feed_mm=float(lengths[~rapid].sum()),
+        arc_mm=float(lengths[arc].sum()),
+        rapid_s=float(times[rapid].sum()),
+        feed_s=float(times[~rapid].sum()),
+        dwell_s=tool_changes * limits.tool_change_s,
+        tool_changes=tool_changes,
+    )
+
+
+@dataclass
+class ToolpathAnalyzer:
+    """Estimate cycle times for stored programs without running them.
+
+    Results are cached by a SHA-256 of the program text, so re-analysing an
+    unchanged program (even under a different file name) is a dict lookup.
+    The cache is an LRU bounded by ``cache_size``.
+    """
+
+    limits: MachineLimits = field(default_factory=MachineLimits)
+    cache_size: int = 4096
+    _cache: "OrderedDict[str, ToolpathSummary]" = field(
+        default_factory=OrderedDict, init=False
+    )
+    _hits: int = field(default=0, init=False)
+    _misses: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        if self.cache_size <= 0:
+            raise ValueError("cache_size must be positive")
+        self._interpreter = GCodeInterpreter(
+            rapid_feed_mm_min=self.limits.rapid_feed_mm_min,
+            tool_change_s=self.limits.tool_change_s,
+        )
+
+    def analyze_text(self, text: str, name: str | None = None) -> ToolpathSummary:
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        program = name or program_name(text, "O0001")
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._hits += 1
+            self._cache.move_to_end(digest)
+            if cached.program != program:
+                cached = replace(cached, program=program)
+            return cached
+
+        self._misses += 1
+        segments = self._interpreter.segments(text.splitlines())
+        summary = summarize(segments, self.limits, program, digest)
+        self._cache[digest] = summary
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return summary
+
+    def analyze_file(self, path: str | Path) -> ToolpathSummary:
+        path = Path(path)
+        text = path.read_text()
+        return self.analyze_text(text, program_name(text, path.stem))
+
+    def analyze_many(self, paths: Iterable[str | Path]) -> List[ToolpathSummary]:
+        return [self.analyze_file(path) for path in paths]
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "hits": self._hits, "misses": self._misses}
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+START = datetime(2026, 2, 4, 6, 0, tzinfo=timezone.utc)
+
+
+def test_simulated_clock_advances_on_sleep():
+    from clock import SimulatedClock
+
+    clock = SimulatedClock(start=START)
+    asyncio.run(clock.sleep(90.0))
+
+    assert clock.monotonic() == 90.0
+    assert clock.now() == START + timedelta(seconds=90)
+    with pytest.raises(ValueError):
+        clock.advance(-1.0)
+
+
+def test_fast_forward_runs_from_config_are_reproducible(monkeypatch):
+    from clock import SIMULATION_EPOCH
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    def run(config):
+        return [s.model_dump() for s in CNCMachine(config=config).simulate(60)]
+
+    config = SimulatorConfig(cycle_time_s=10.0, seed=7, fast_forward=True)
+    first = run(config)
+    assert first == run(config)
+    assert first[0]["timestamp"] == SIMULATION_EPOCH
+
+    monkeypatch.setenv("CNC_FAST_FORWARD", "true")
+    monkeypatch.setenv("CNC_START_TIME", "2026-02-04T06:00:00")
+    assert CNCMachine(config=SimulatorConfig.from_env()).clock.now() == START
+
+
+def test_simulate_shift_fast_forward():
+    from clock import SimulatedClock
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    cnc = CNCMachine(
+        config=SimulatorConfig(cycle_time_s=10.0),
+        clock=SimulatedClock(start=START),
+        seed=42,
+    )
+    samples = list(cnc.simulate(8 * 3600))
+
+    assert len(samples) == 8 * 360
+    assert samples[0].timestamp == START
+    assert samples[-1].timestamp == START + timedelta(seconds=8 * 3600 - 10)
+    assert samples[-1].tool.wear_percent == pytest.approx(0.05 * (8 * 60 - 10 / 60))
+
+
+def test_seeded_machines_are_reproducible():
+    from clock import SimulatedClock
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    def run():
+        cnc = CNCMachine(
+            config=SimulatorConfig(cycle_time_s=1.0),
+            clock=SimulatedClock(start=START),
+            seed=7,
+        )
+        return [t.model_dump() for t in cnc.simulate(30)]
+
+    assert run() == run()
+
+
+def test_run_with_simulated_clock_does_not_wait():
+    from clock import SimulatedClock
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    clock = SimulatedClock(start=START)
+    cnc = CNCMachine(config=SimulatorConfig(cycle_time_s=60.0), clock=clock)
+    asyncio.run(cnc.run(max_cycles=600))
+
+    assert clock.elapsed_s == 600 * 60.0
@@ -41,3 +41,61 @@ def test_telemetry_schema():
     )
     assert {"wear_percent", "runtime_minutes"}.issubset(telemetry["tool"].keys())
     assert {"mode", "cycle_time_s"}.issubset(telemetry["status"].keys())
+
+
+def test_failure_impacts_shape_telemetry():
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+    from failure_modes import (
+        AxisBacklash,
+        CoolantSystemFailure,
+        SpindleBearingDegradation,
+    )
+
+    healthy = CNCMachine(config=SimulatorConfig(), seed=11)
+    faulty = CNCMachine(config=SimulatorConfig(), seed=11)
+    faulty.failures.inject(SpindleBearingDegradation(severity=1.0))
+    faulty.failures.inject(CoolantSystemFailure(severity=1.0))
+    faulty.failures.inject(AxisBacklash(severity=1.0))
+    for machine in (healthy, faulty):
+        machine.start()
+
+    base = healthy.generate_telemetry()
+    degraded = faulty.generate_telemetry()
+
+    assert degraded.spindle.vibration_mm_s == pytest.approx(
+        3.0 * base.spindle.vibration_mm_s
+    )
+    assert degraded.spindle.temperature_c == pytest.approx(
+        base.spindle.temperature_c + 8.0
+    )
+    assert degraded.coolant.flow_rate_lpm == pytest.approx(12.0 * 0.3)
+    assert degraded.axes.x.position_mm == pytest.approx(base.axes.x.position_mm + 0.05)
+
+
+def test_json_fast_path_matches_strict_validation():
+    from datetime import datetime, timezone
+
+    from clock import SimulatedClock
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def machine(strict):
+        clock = SimulatedClock(start=start)
+        sim = CNCMachine(
+            config=SimulatorConfig(strict_validation=strict), clock=clock, seed=4
+        )
+        sim.start()
+        return sim, clock
+
+    fast, fast_clock = machine(False)
+    strict, strict_clock = machine(True)
+    reference, reference_clock = machine(False)
+    for clock in (fast_clock, strict_clock, reference_clock):
+        clock.advance(30.0)
+
+    expected = reference.generate_telemetry().model_dump_json().encode()
+    assert fast.generate_json() == expected
+    assert strict.generate_json() == expected
@@ -17,3 +17,112 @@ def test_failure_injection_tracks_active():
     failure = ToolWearAccelerated(multiplier=3.0)
     manager.inject(failure)
     assert len(manager.active_failures()) == 1
+
+
+def test_combined_impact_is_cached_until_severity_changes():
+    from failure_modes import (
+        CoolantSystemFailure,
+        FailureManager,
+        SpindleBearingDegradation,
+    )
+
+    manager = FailureManager()
+    bearing = SpindleBearingDegradation(progression_rate=0.1)
+    manager.inject(bearing)
+    manager.inject(CoolantSystemFailure(severity=0.5, progression_rate=0.0))
+
+    first = manager.combined_impact()
+    assert manager.combined_impact() is first
+    assert first["temp_offset_c"] == pytest.approx(1.5)
+
+    manager.tick(5.0)
+    updated = manager.combined_impact()
+    assert updated is not first
+    assert updated["vibration_multiplier"] == pytest.approx(2.0)
+    assert manager.impact("backlash_mm") == 0.0
+    assert manager.severities() == {
+        "SPINDLE_BEARING_DEGRADATION": 0.5,
+        "COOLANT_SYSTEM_FAILURE": 0.5,
+    }
+
+    # A tick that leaves every severity unchanged keeps the cached mapping.
+    bearing.progression_rate = 0.0
+    manager.tick(5.0)
+    assert manager.combined_impact() is updated
+    impacts = manager.impacts()
+    assert manager.impacts() is impacts
+    assert impacts["coolant_flow_multiplier"] == pytest.approx(0.65)
+    assert impacts["tool_wear_multiplier"] == 1.0
+
+    manager.remove(bearing.id)
+    assert "vibration_multiplier" not in manager.combined_impact()
+    assert manager.impacts()["vibration_multiplier"] == 1.0
+
+
+def test_fleet_failures_progress_and_match_scalar_impacts():
+    import numpy as np
+    from failure_modes import (
+        FailureManager,
+        FleetFailures,
+        SpindleBearingDegradation,
+        ThermalDrift,
+    )
+
+    fleet = FleetFailures(size=4)
+    fleet.inject("SPINDLE_BEARING_DEGRADATION", [1, 2], progression_rate=0.1)
+    fleet.inject("THERMAL_DRIFT", [2], progression_rate=0.0, severity=0.5)
+    fleet.tick(5.0)
+
+    impact = fleet.impact()
+    assert fleet.impact() is impact
+    assert impact["vibration_multiplier"].tolist() == [1.0, 2.0, 2.0, 1.0]
+
+    manager = FailureManager()
+    manager.inject(SpindleBearingDegradation(severity=0.5))
+    manager.inject(ThermalDrift(severity=0.5))
+    for name, value in manager.combined_impact().items():
+        assert impact[name][2] == pytest.approx(value)
+
+    fleet.tick(100.0)
+    saturated = fleet.impact()
+    assert saturated is not impact
+    fleet.tick(1.0)
+    assert fleet.impact() is saturated
+
+    labels = fleet.labels()
+    assert labels["SPINDLE_BEARING_DEGRADATION"].tolist() == [0.0, 1.0, 1.0, 0.0]
+    fleet.clear("SPINDLE_BEARING_DEGRADATION")
+    assert np.all(fleet.impact()["vibration_multiplier"] == 1.0)
+
+
+def test_fleet_failures_use_configured_failure_parameters():
+    from failure_modes import (
+        FleetFailures,
+        SpindleBearingDegradation,
+        ToolWearAccelerated,
+    )
+
+    fleet = FleetFailures(size=3)
+    fleet.inject("TOOL_WEAR_ACCELERATED", [0], progression_rate=0.0)
+    fleet.inject(
+        "TOOL_WEAR_ACCELERATED", [1], progression_rate=0.0, severity=0.5, multiplier=3.0
+    )
+    fleet.inject("SPINDLE_BEARING_DEGRADATION", [1], severity=0.5, vibration_gain=4.0)
+
+    impact = fleet.impact()
+    assert impact["tool_wear_multiplier"].tolist() == [
+        ToolWearAccelerated().get_impact()["tool_wear_multiplier"],
+        ToolWearAccelerated(severity=0.5, multiplier=3.0).get_impact()[
+            "tool_wear_multiplier"
+        ],
+        1.0,
+    ]
+    bearing = SpindleBearingDegradation(severity=0.5, vibration_gain=4.0)
+    assert impact["vibration_multiplier"][1] == pytest.approx(
+        bearing.get_impact()["vibration_multiplier"]
+    )
+
+    fleet.inject("TOOL_WEAR_ACCELERATED", [1], progression_rate=0.0)
+    assert fleet.impact()["tool_wear_multiplier"][1] == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        fleet.inject("THERMAL_DRIFT", [0], multiplier=3.0)
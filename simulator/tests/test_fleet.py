@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+
+def test_fleet_tick_advances_all_machines():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    fleet = FleetSimulator(size=1000, config=SimulatorConfig(), seed=7)
+    fleet.tick(120.0)
+
+    assert np.all(fleet.tool_wear_percent > 0)
+    assert np.allclose(fleet.tool_runtime_minutes, 2.0)
+    assert np.all((fleet.rpm >= 3000) & (fleet.rpm <= 18000))
+    snapshot = fleet.snapshot()
+    assert snapshot["spindle.rpm"].shape == (1000,)
+    assert fleet.machine_ids[0] == "CNC-0001"
+
+
+def test_fleet_is_reproducible_with_seed():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    first = FleetSimulator(size=50, config=SimulatorConfig(), seed=3)
+    second = FleetSimulator(size=50, config=SimulatorConfig(), seed=3)
+    first.tick(1.0)
+    second.tick(1.0)
+
+    assert np.array_equal(first.rpm, second.rpm)
+    assert np.array_equal(first.position_mm, second.position_mm)
+
+
+def test_fleet_builds_validated_telemetry_on_demand():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    fleet = FleetSimulator(size=5, config=SimulatorConfig(), seed=1)
+    fleet.tick(60.0)
+
+    telemetry = list(fleet.iter_telemetry())
+    assert [t.machine_id for t in telemetry] == fleet.machine_ids
+    assert telemetry[2].spindle.rpm == pytest.approx(fleet.rpm[2])
+    assert telemetry[2].power.total_kw == pytest.approx(
+        fleet.spindle_kw[2] + fleet.servo_kw[2]
+    )
+
+
+def test_fleet_json_fast_path_matches_models():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    fleet = FleetSimulator(size=4, config=SimulatorConfig(), seed=2)
+    fleet.tick(60.0)
+    strict = FleetSimulator(
+        size=4, config=SimulatorConfig(strict_validation=True), seed=2
+    )
+    strict.tick(60.0)
+    strict.timestamp = fleet.timestamp
+
+    messages = list(fleet.iter_json())
+    assert messages == [t.model_dump_json().encode() for t in fleet.iter_telemetry()]
+    assert messages == list(strict.iter_json())
+    assert fleet.telemetry(3) == list(fleet.iter_telemetry())[3]
+
+
+def test_fleet_run_calls_consumer_each_tick():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    fleet = FleetSimulator(size=10, config=SimulatorConfig(cycle_time_s=0.0), seed=1)
+    seen = []
+    asyncio.run(fleet.run(on_tick=lambda f: seen.append(f.timestamp), max_ticks=3))
+
+    assert len(seen) == 3
+
+
+def test_fleet_failures_are_applied_and_labelled():
+    from config import SimulatorConfig
+    from fleet import FleetSimulator
+
+    fleet = FleetSimulator(size=100, config=SimulatorConfig(), seed=5)
+    fleet.failures.inject("COOLANT_SYSTEM_FAILURE", range(10), progression_rate=0.5)
+    fleet.failures.inject("TOOL_WEAR_ACCELERATED", range(90, 100))
+    fleet.tick(60.0)
+
+    labels = fleet.labels()
+    assert np.allclose(labels["COOLANT_SYSTEM_FAILURE"][:10], 0.5)
+    assert np.all(labels["COOLANT_SYSTEM_FAILURE"][10:] == 0.0)
+    flow = fleet.snapshot()["coolant.flow_rate_lpm"]
+    assert np.allclose(flow[:10], 12.0 * (1.0 - 0.35))
+    assert np.allclose(flow[10:], 12.0)
+    assert np.all(fleet.tool_wear_percent[90:] > fleet.tool_wear_percent[0])
+    assert fleet.telemetry(0).coolant.flow_rate_lpm == pytest.approx(7.8)
@@ -0,0 +1,97 @@
+import math
+from pathlib import Path
+
+import pytest
+
+SAMPLES = Path(__file__).resolve().parents[1] / "gcode_samples"
+
+
+def test_square_pocket_segments_follow_modal_state():
+    from gcode_interpreter import LINEAR, RAPID, GCodeInterpreter
+
+    text = (SAMPLES / "01_square_pocket.nc").read_text()
+    segments = GCodeInterpreter().segments(text.splitlines())
+    moves = [s for s in segments if s.length_mm > 0]
+
+    assert moves[0].motion == RAPID
+    assert moves[0].end == (0.0, 0.0, 5.0)
+    cuts = [s for s in moves if s.motion == LINEAR and s.start[2] == -2.0]
+    assert [s.end[:2] for s in cuts] == [(20, 0), (20, 20), (0, 20), (0, 0)]
+    assert all(s.feed_mm_min == 800 and s.spindle_rpm == 8000 for s in cuts)
+    assert cuts[0].duration_s == pytest.approx(60.0 * 20 / 800)
+
+
+def test_incremental_mode_and_arc_interpolation():
+    from gcode_interpreter import GCodeInterpreter
+
+    program = [
+        "G21 G91 S1000 M03",
+        "G01 X10 F600",
+        "G01 X10",
+        "G90 G03 X0 Y0 I-10 J0",
+        "M30",
+        "G01 X99",
+    ]
+    interpreter = GCodeInterpreter()
+    segments = interpreter.segments(program)
+
+    assert [s.end for s in segments[:2]] == [(10.0, 0.0, 0.0), (20.0, 0.0, 0.0)]
+    arc = segments[2]
+    assert arc.center == (10.0, 0.0)
+    assert arc.length_mm == pytest.approx(math.pi * 10)
+    assert len(segments) == 3
+
+    trajectory = interpreter.compile(program, cycle_time_s=0.1)
+    half = len(trajectory) - 1 - round(arc.duration_s / 0.1 / 2)
+    assert math.hypot(trajectory.x[half] - 10, trajectory.y[half]) == pytest.approx(10)
+    assert trajectory.x[-1] == pytest.approx(0.0)
+    assert trajectory.y[-1] == pytest.approx(0.0, abs=1e-9)
+    assert trajectory.y.max() == pytest.approx(10.0, abs=0.01)
+
+
+def test_tool_changes_drive_tool_and_spindle_state():
+    from gcode_interpreter import GCodeInterpreter
+
+    trajectory = GCodeInterpreter().compile_file(
+        SAMPLES / "03_tool_change.nc", cycle_time_s=0.5
+    )
+
+    assert trajectory.name == "O0003"
+    assert list(dict.fromkeys(trajectory.tool.tolist())) == [1, 2]
+    second_tool = trajectory.tool == 2
+    assert trajectory.spindle_rpm[second_tool].max() == 7000
+    sample = trajectory.sample(len(trajectory) + 3)
+    assert sample == trajectory.sample(3)
+
+
+def test_machine_telemetry_plays_back_program():
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    cnc = CNCMachine(config=SimulatorConfig(cycle_time_s=0.1), seed=1)
+    trajectory = cnc.load_program(SAMPLES / "02_circular_interp.nc")
+    cnc.start()
+    samples = [cnc.generate_telemetry() for _ in range(len(trajectory))]
+
+    assert {t.status.program for t in samples} == {"O0002"}
+    assert samples[0].tool.id == "T02"
+    assert samples[-1].axes.z.position_mm == pytest.approx(5.0)
+    cutting = [t for t in samples if t.axes.z.position_mm == pytest.approx(-1.0)]
+    assert cutting and all(t.spindle.rpm == 6000 for t in cutting)
+    assert max(t.axes.x.position_mm for t in cutting) == pytest.approx(10.0)
+
+
+def test_yz_plane_arc_interpolates_in_y_and_z():
+    from gcode_interpreter import ARC_CCW, GCodeInterpreter
+
+    program = ["G21 G90 G19", "G01 Y10 Z0 F600", "G03 Y-10 Z0 J-10 K0"]
+    interpreter = GCodeInterpreter()
+    arc = interpreter.segments(program)[-1]
+
+    assert arc.motion == ARC_CCW
+    assert arc.plane == 19
+    assert arc.length_mm == pytest.approx(math.pi * 10.0)
+
+    trajectory = interpreter.compile(program, cycle_time_s=0.1)
+    assert max(abs(z) for z in trajectory.z) == pytest.approx(10.0, abs=0.05)
+    assert all(x == 0.0 for x in trajectory.x)
@@ -0,0 +1,100 @@
+import math
+from pathlib import Path
+
+import pytest
+
+SAMPLES = Path(__file__).resolve().parents[1] / "gcode_samples"
+
+
+def test_columns_match_line_parser_on_samples():
+    from gcode_parser import GCodeParser
+    from gcode_stream import StreamingGCodeParser
+
+    parser = GCodeParser()
+    for path in sorted(SAMPLES.glob("*.nc")):
+        lines = path.read_text().splitlines()
+        columns = StreamingGCodeParser(chunk_bytes=64).parse_file(path)
+        commands = [
+            (number, parser.parse_line(line))
+            for number, line in enumerate(lines, start=1)
+        ]
+        commands = [
+            (number, cmd)
+            for number, cmd in commands
+            if cmd.g_codes
+            or cmd.m_codes
+            or cmd.block_number is not None
+            or any(getattr(cmd, a) is not None for a in "xyzfstijk")
+        ]
+
+        assert len(columns) == len(commands)
+        for row, (number, cmd) in enumerate(commands):
+            assert columns.line_number[row] == number
+            assert list(columns.g_codes(row)) == cmd.g_codes
+            assert list(columns.m_codes(row)) == cmd.m_codes
+            assert columns.block_number[row] == (
+                -1 if cmd.block_number is None else cmd.block_number
+            )
+            assert columns.t[row] == (-1 if cmd.t is None else cmd.t)
+            for axis in "xyzfsijk":
+                value = getattr(columns, axis)[row]
+                expected = getattr(cmd, axis)
+                if expected is None:
+                    assert math.isnan(value)
+                else:
+                    assert value == pytest.approx(expected)
+
+
+def test_modal_mode_carries_state_and_interns_code_sets():
+    from gcode_stream import StreamingGCodeParser
+
+    text = "\n".join(
+        [
+            "%",
+            "(header comment)",
+            "N10 G21 G90 g01 x10 F500 ; metric",
+            "",
+            "N20 Y5.5 (partial) Z-.25",
+            "N30 G00 X0",
+            "N40 G01 X1 (unterminated",
+            "N50 M05 M30",
+        ]
+    )
+    columns = StreamingGCodeParser().parse_text(text, modal=True)
+
+    assert columns.line_number.tolist() == [3, 5, 6, 7, 8]
+    assert columns.block_number.tolist() == [10, 20, 30, 40, 50]
+    assert columns.motion.tolist() == [1, 1, 0, 1, 1]
+    assert columns.x.tolist() == [10.0, 10.0, 0.0, 1.0, 1.0]
+    assert math.isnan(columns.y[0])
+    assert columns.y[1:].tolist() == [5.5, 5.5, 5.5, 5.5]
+    assert columns.z[1] == -0.25
+    assert columns.f.tolist() == [500.0] * 5
+    assert columns.g_codes(0) == (21, 90, 1)
+    assert columns.g_codes(1) == ()
+    assert columns.g_codes(3) is columns.g_code_sets[columns.g_set[3]]
+    assert columns.m_codes(4) == (5, 30)
+
+    raw = StreamingGCodeParser().parse_text(text)
+    assert math.isnan(raw.x[1]) and math.isnan(raw.f[1])
+    assert raw.motion.tolist() == [1, -1, 0, 1, -1]
+
+
+def test_parse_file_handles_empty_and_unterminated_files(tmp_path):
+    from gcode_stream import StreamingGCodeParser
+
+    empty = tmp_path / "empty.nc"
+    empty.write_bytes(b"")
+    assert len(StreamingGCodeParser().parse_file(empty)) == 0
+
+    program = tmp_path / "big.nc"
+    program.write_text("\n".join(f"N{n} G01 X{n}.5 F100" for n in range(1, 501)))
+    columns = StreamingGCodeParser(chunk_bytes=100).parse_file(program)
+
+    assert len(columns) == 500
+    assert columns.line_number[-1] == 500
+    assert columns.x[-1] == 500.5
+    assert len(columns.g_code_sets) == 2
+
+    with pytest.raises(ValueError):
+        StreamingGCodeParser(chunk_bytes=0)
@@ -17,3 +17,36 @@ def test_telemetry_schema_defaults():
     assert 0 <= t.spindle.rpm <= 24000
     assert 0 <= t.tool.wear_percent <= 100
     assert t.machine_id
+
+
+def test_row_fast_path_matches_validated_model():
+    import json
+
+    from models import (
+        TELEMETRY_ROW_FIELDS,
+        Telemetry,
+        telemetry_from_row,
+        telemetry_json,
+        telemetry_row_json,
+    )
+    from pydantic import ValidationError
+
+    payload = Telemetry.example().model_dump()
+    row = []
+    for name in TELEMETRY_ROW_FIELDS:
+        value = payload
+        for part in name.split("."):
+            value = value[part]
+        row.append(value)
+    row = tuple(row)
+
+    trusted = telemetry_row_json(row)
+    validated = telemetry_json(telemetry_from_row(row))
+    assert trusted == validated
+    assert json.loads(trusted)["axes"]["z"]["position_mm"] == -25.5
+
+    bad = list(row)
+    bad[TELEMETRY_ROW_FIELDS.index("spindle.rpm")] = -1.0
+    assert b'"rpm":-1.0' in telemetry_row_json(tuple(bad))
+    with pytest.raises(ValidationError):
+        telemetry_from_row(tuple(bad))
@@ -51,3 +51,235 @@ def test_buffered_publish_flushes_on_connect():
     publisher.connect()
     assert publisher.queue_size() == 0
     assert publisher.client.published
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_batches_are_packed_and_compressed():
+    from mqtt_publisher import MQTTPublisher, decode_batch
+
+    publisher = MQTTPublisher(
+        machine_id="GW-01",
+        client_factory=FakeClient,
+        batch_size=3,
+        compression="gzip",
+        clock=FakeClock(),
+    )
+    publisher.connect()
+    for value in range(7):
+        publisher.publish({"machine_id": f"CNC-{value:03d}", "value": value})
+
+    topics = {topic for topic, _, _ in publisher.client.published}
+    assert topics == {"dt/cnc/GW-01/telemetry/batch"}
+    assert len(publisher.client.published) == 2
+    publisher.flush()
+    batches = [decode_batch(payload) for _, payload, _ in publisher.client.published]
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert batches[2][0]["value"] == 6
+    assert publisher.client.published[0][1][:2] == b"\x1f\x8b"
+    assert publisher.stats()["messages"] == 3
+
+
+def test_partial_batch_is_sent_after_max_delay():
+    from mqtt_publisher import MQTTPublisher, decode_batch
+
+    clock = FakeClock()
+    publisher = MQTTPublisher(
+        machine_id="GW-01",
+        client_factory=FakeClient,
+        batch_size=100,
+        batch_max_delay_s=1.0,
+        clock=clock,
+    )
+    publisher.connect()
+    publisher.publish({"value": 1})
+    clock.now = 1.5
+    publisher.publish({"value": 2})
+
+    assert len(publisher.client.published) == 1
+    assert decode_batch(publisher.client.published[0][1]) == [
+        {"value": 1},
+        {"value": 2},
+    ]
+
+
+def test_offline_buffer_is_bounded_and_spills_in_order(tmp_path):
+    from mqtt_publisher import OfflineBuffer
+
+    dropping = OfflineBuffer(max_messages=2)
+    for message in (b"a", b"b", b"c"):
+        dropping.append(message)
+    assert [dropping.popleft() for _ in range(len(dropping))] == [b"b", b"c"]
+    assert dropping.dropped == 1
+
+    newest = OfflineBuffer(max_messages=2, drop_policy="drop_newest")
+    for message in (b"a", b"b", b"c"):
+        newest.append(message)
+    assert [newest.popleft(), newest.popleft()] == [b"a", b"b"]
+
+    spill = tmp_path / "spill.bin"
+    spilling = OfflineBuffer(max_messages=2, spill_path=str(spill), max_spill_bytes=20)
+    for message in (b"m1", b"m2", b"m3", b"m4", b"m5", b"m6", b"m7"):
+        spilling.append(message)
+    # Three records of 6 bytes fit in the spill file; after that the oldest
+    # messages, which are in the spill file, are dropped.
+    assert spilling.spilled == 3
+    assert spilling.dropped == 2
+    drained = [spilling.popleft() for _ in range(len(spilling))]
+    assert drained == [b"m3", b"m4", b"m5", b"m6", b"m7"]
+    assert spill.stat().st_size == 0
+    spilling.close()
+
+
+def test_offline_buffer_recovers_spill_file_from_previous_run(tmp_path):
+    from mqtt_publisher import OfflineBuffer
+
+    spill = tmp_path / "spill.bin"
+    crashed = OfflineBuffer(max_messages=1, spill_path=str(spill))
+    for message in (b"m1", b"m2", b"m3"):
+        crashed.append(message)
+    crashed.close()
+    # A record cut short when the process died.
+    with spill.open("ab") as fh:
+        fh.write(b"\x09\x00\x00\x00m4")
+
+    restarted = OfflineBuffer(max_messages=1, spill_path=str(spill))
+    restarted.append(b"m5")
+    assert restarted.spilled == 2
+    assert [restarted.popleft() for _ in range(len(restarted))] == [
+        b"m1",
+        b"m2",
+        b"m5",
+    ]
+    restarted.close()
+
+
+def test_partial_batch_of_quiet_publisher_is_sent_by_timer():
+    import time
+
+    from mqtt_publisher import MQTTPublisher, decode_batch
+
+    publisher = MQTTPublisher(
+        machine_id="GW-01",
+        client_factory=FakeClient,
+        batch_size=100,
+        batch_max_delay_s=0.05,
+    )
+    publisher.connect()
+    publisher.publish({"value": 1})
+    deadline = time.monotonic() + 2.0
+    while not publisher.client.published and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [decode_batch(p) for _, p, _ in publisher.client.published] == [
+        [{"value": 1}]
+    ]
+
+
+def test_reconnect_flush_is_rate_limited():
+    from mqtt_publisher import MQTTPublisher, OfflineBuffer
+
+    clock = FakeClock()
+    publisher = MQTTPublisher(
+        machine_id="CNC-001",
+        client_factory=FakeClient,
+        buffer=OfflineBuffer(max_messages=100),
+        flush_rate_per_s=10.0,
+        clock=clock,
+    )
+    for value in range(50):
+        publisher.publish({"value": value})
+    publisher.connect()
+    assert len(publisher.client.published) == 10
+    assert publisher.queue_size() == 40
+
+    clock.now = 0.5
+    publisher.publish({"value": "live"})
+    assert len(publisher.client.published) == 16
+    assert publisher.client.published[-1][1] == b'{"value": "live"}'
+
+    # The burst is capped at one second of budget, however long the pause.
+    rounds = 0
+    while publisher.queue_size():
+        clock.now += 10.0
+        publisher.flush()
+        rounds += 1
+    assert rounds == 4
+    assert len(publisher.client.published) == 51
+
+
+def test_vibration_blocks_publish_binary_only_while_connected():
+    import numpy as np
+    from mqtt_publisher import MQTTPublisher
+    from vibration import VibrationBlock
+
+    block = VibrationBlock(
+        "CNC-001", 0.0, 10_000.0, 6000.0, np.zeros(256, dtype=np.float32)
+    )
+    publisher = MQTTPublisher(machine_id="CNC-001", client_factory=FakeClient)
+
+    assert publisher.publish_vibration(block) is False
+    publisher.connect()
+    assert publisher.publish_vibration(block) is True
+
+    assert publisher.client.published == [
+        ("dt/cnc/CNC-001/vibration", block.to_bytes(), 0)
+    ]
+    assert publisher.queue_size() == 0
+
+
+def test_pre_encoded_samples_batch_like_dicts():
+    import json
+
+    from mqtt_publisher import MQTTPublisher, decode_batch, encode_batch
+
+    samples = [{"machine_id": f"CNC-{i:03d}", "value": i / 3} for i in range(3)]
+    publisher = MQTTPublisher(
+        machine_id="gateway", client_factory=FakeClient, batch_size=3
+    )
+    publisher.connect()
+    for sample in samples:
+        publisher.publish_json(json.dumps(sample).encode())
+
+    ((topic, payload, _),) = publisher.client.published
+    assert topic == "dt/cnc/gateway/telemetry/batch"
+    assert decode_batch(payload) == samples
+    assert decode_batch(encode_batch(samples, "gzip")) == samples
+
+
+def test_publisher_from_config_applies_batch_and_buffer_settings(tmp_path):
+    from config import MqttConfig
+    from mqtt_publisher import MQTTPublisher
+
+    config = MqttConfig(
+        broker_host="broker",
+        broker_port=8883,
+        batch_size=4,
+        batch_max_delay_s=0.5,
+        compression="gzip",
+        buffer_max_messages=2,
+        drop_policy="drop_newest",
+        spill_path=str(tmp_path / "{machine_id}.spill"),
+        flush_rate_per_s=10.0,
+    )
+    publisher = MQTTPublisher.from_config("CNC-007", config, client_factory=FakeClient)
+
+    assert (publisher.broker_host, publisher.broker_port) == ("broker", 8883)
+    assert (publisher.batch_size, publisher.batch_max_delay_s) == (4, 0.5)
+    assert publisher.compression == "gzip"
+    assert publisher.flush_rate_per_s == 10.0
+    assert publisher.buffer.max_messages == 2
+    assert publisher.buffer.drop_policy == "drop_newest"
+    assert publisher.buffer.spill_path == str(tmp_path / "CNC-007.spill")
+
+    publisher.connect()
+    for value in range(4):
+        publisher.publish({"value": value})
+    ((topic, _, _),) = publisher.client.published
+    assert topic == "dt/cnc/CNC-007/telemetry/batch"
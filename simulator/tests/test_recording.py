@@ -0,0 +1,66 @@
+import pytest
+
+
+def _samples(seconds=1.0, machine_id="CNC-007"):
+    from clock import SimulatedClock
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+
+    machine = CNCMachine(
+        machine_id=machine_id,
+        config=SimulatorConfig(),
+        clock=SimulatedClock(),
+        seed=4,
+    )
+    return list(machine.simulate(seconds))
+
+
+def test_recording_round_trips_telemetry(tmp_path):
+    from recording import TelemetryRecorder, read_telemetry
+
+    samples = _samples()
+    path = tmp_path / "run.dtrec"
+    with TelemetryRecorder(path) as recorder:
+        recorder.write_many(samples)
+
+    replayed = list(read_telemetry(path))
+    assert len(replayed) == len(samples) > 1
+    for original, copy in zip(samples, replayed):
+        assert copy.machine_id == original.machine_id
+        assert copy.timestamp == original.timestamp
+        assert copy.status == original.status
+        assert copy.tool.id == original.tool.id
+        assert copy.spindle.rpm == pytest.approx(original.spindle.rpm, rel=1e-6)
+        assert copy.axes.x.position_mm == pytest.approx(
+            original.axes.x.position_mm, rel=1e-6
+        )
+    # Strings are interned, so samples stay far smaller than their JSON.
+    json_bytes = sum(len(s.model_dump_json()) for s in samples)
+    assert path.stat().st_size < json_bytes / 5
+
+
+def test_recording_appends_and_ignores_truncated_tail(tmp_path):
+    from recording import TelemetryRecorder, read_payloads
+
+    path = tmp_path / "run.dtrec"
+    first = _samples(0.5)
+    with TelemetryRecorder(path) as recorder:
+        recorder.write_many(first)
+    with path.open("ab") as fh:
+        fh.write(b"T\x00\x01")  # crash mid-record
+
+    count = len(first)
+    assert len(list(read_payloads(path))) == count
+    with TelemetryRecorder(path) as recorder:
+        assert recorder.count == count
+        recorder.write_many(_samples(0.5, machine_id="CNC-008"))
+
+    payloads = list(read_payloads(path))
+    machine_ids = [p["machine_id"] for p in payloads]
+    assert machine_ids == ["CNC-007"] * count + ["CNC-008"] * count
+    assert payloads[-1]["tool"]["id"] == "T01"
+
+    bogus = tmp_path / "bogus.dtrec"
+    bogus.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        list(read_payloads(bogus))
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def _payloads(machines=2, samples=5, step_s=1.0):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "timestamp": (start + timedelta(seconds=i * step_s)).isoformat(),
+            "machine_id": f"CNC-{m:03d}",
+            "spindle": {"rpm": 1000.0 + i},
+        }
+        for i in range(samples)
+        for m in range(machines)
+    ]
+
+
+class FakeMQTTClient:
+    def __init__(self):
+        self.published = []
+
+    def connect(self, host, port, keepalive=60):
+        return None
+
+    def disconnect(self):
+        return None
+
+    def publish(self, topic, payload, qos=0):
+        self.published.append((topic, payload, qos))
+
+
+class RecordingSink:
+    name = "fake"
+
+    def __init__(self, fail_every=0):
+        self.batches = []
+        self.fail_every = fail_every
+
+    async def send(self, payloads):
+        self.batches.append(payloads)
+        if self.fail_every and len(self.batches) % self.fail_every == 0:
+            raise RuntimeError("boom")
+
+    async def close(self):
+        return None
+
+
+def test_max_speed_replay_clones_machines_and_reports():
+    from replay import Replayer
+
+    sink = RecordingSink(fail_every=10)
+    replayer = Replayer(
+        payloads=_payloads(), sinks=[sink], speed=None, clones=3, batch_size=2
+    )
+    report = asyncio.run(replayer.run())["fake"]
+
+    machines = {p["machine_id"] for batch in sink.batches for p in batch}
+    assert machines == {f"CNC-{m:03d}-{c:03d}" for m in range(2) for c in range(3)}
+    # 6 streams of 5 samples in batches of 2 -> 3 requests each.
+    assert report.requests == 18
+    assert report.errors == 1
+    assert report.samples == 30 - len(sink.batches[9])
+    summary = report.as_dict()
+    assert summary["throughput_per_s"] > 0
+    assert set(report.percentiles()) == {"p50", "p95", "p99"}
+
+
+def test_paced_replay_follows_recorded_timeline():
+    from clock import SimulatedClock
+    from replay import Replayer
+
+    clock = SimulatedClock()
+    sink = RecordingSink()
+    replayer = Replayer(
+        payloads=_payloads(machines=1, samples=11), sinks=[sink], speed=5.0, clock=clock
+    )
+    asyncio.run(replayer.run())
+
+    assert len(sink.batches) == 11
+    # 10 s of recording at 5x takes 2 s of (simulated) time.
+    assert clock.elapsed_s == pytest.approx(2.0)
+
+    with pytest.raises(ValueError):
+        Replayer(payloads=[], sinks=[sink], speed=0)
+
+
+def test_http_sinks_post_expected_bodies():
+    import httpx
+    from replay import AnomalyDetectionSink, DigitalTwinSink, Replayer
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, json.loads(request.content), request))
+        return httpx.Response(200, json={"status": "success"})
+
+    def client(base_url):
+        return httpx.AsyncClient(
+            base_url=base_url, transport=httpx.MockTransport(handler)
+        )
+
+    sinks = [
+        DigitalTwinSink(client=client("http://dt"), api_key="k"),
+        AnomalyDetectionSink(client=client("http://ad")),
+    ]
+    replayer = Replayer(
+        payloads=_payloads(machines=1, samples=2), sinks=sinks, speed=None, batch_size=2
+    )
+    reports = asyncio.run(replayer.run())
+
+    dt = [r for r in requests if r[0].startswith("/machines")]
+    assert [r[0] for r in dt] == ["/machines/CNC-000/telemetry"] * 2
+    assert dt[0][1]["data"] == {"spindle": {"rpm": 1000.0}}
+    assert dt[0][2].headers["x-api-key"] == "k"
+    detect = [r for r in requests if r[0] == "/detect"]
+    assert len(detect[0][1]["telemetry"]) == 2
+    assert reports["digital-twin-api"].samples == 2
+    assert reports["anomaly-detection"].requests == 1
+
+
+def test_mqtt_sink_uses_one_publisher_per_machine():
+    from mqtt_publisher import MQTTPublisher
+    from replay import MQTTSink, Replayer
+
+    sink = MQTTSink(
+        lambda machine_id: MQTTPublisher(
+            machine_id=machine_id, client_factory=FakeMQTTClient
+        )
+    )
+    asyncio.run(Replayer(payloads=_payloads(), sinks=[sink], speed=None).run())
+
+    publishers = sink._publishers
+    assert set(publishers) == {"CNC-000", "CNC-001"}
+    assert len(publishers["CNC-001"].client.published) == 5
+    asyncio.run(sink.close())
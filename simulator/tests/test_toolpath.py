@@ -0,0 +1,70 @@
+import math
+from pathlib import Path
+
+import pytest
+
+SAMPLES = Path(__file__).resolve().parents[1] / "gcode_samples"
+
+
+def test_move_times_use_trapezoid_and_triangle_profiles():
+    import numpy as np
+    from toolpath import move_times_s
+
+    # 600 mm/min = 10 mm/s at 100 mm/s^2: 1 mm of ramp, 0.1 s per ramp.
+    times = move_times_s(np.array([100.0, 0.25, 0.0]), np.full(3, 600.0), 100.0)
+
+    assert times[0] == pytest.approx(100.0 / 10.0 + 0.1)
+    assert times[1] == pytest.approx(2.0 * math.sqrt(0.25 / 100.0))
+    assert times[2] == 0.0
+
+
+def test_summary_splits_rapid_feed_and_arc_distance():
+    from toolpath import MachineLimits, ToolpathAnalyzer
+
+    analyzer = ToolpathAnalyzer(MachineLimits(max_accel_mm_s2=1e9))
+    summary = analyzer.analyze_file(SAMPLES / "02_circular_interp.nc")
+
+    assert summary.program == "O0002"
+    assert summary.arc_mm == pytest.approx(2.0 * math.pi * 10.0)
+    assert summary.feed_mm >= summary.arc_mm
+    assert summary.total_mm == pytest.approx(summary.rapid_mm + summary.feed_mm)
+    # With effectively unlimited acceleration the estimate is distance / feed.
+    assert summary.rapid_s == pytest.approx(60.0 * summary.rapid_mm / 15000.0, rel=1e-4)
+
+    tool_change = analyzer.analyze_file(SAMPLES / "03_tool_change.nc")
+    assert tool_change.tool_changes >= 1
+    assert tool_change.dwell_s == 5.0 * tool_change.tool_changes
+    assert tool_change.cycle_time_s == pytest.approx(
+        tool_change.rapid_s + tool_change.feed_s + tool_change.dwell_s
+    )
+
+
+def test_arcs_in_xz_plane_use_i_and_k():
+    from toolpath import ToolpathAnalyzer
+
+    program = "\n".join(["G21 G90 G18", "G01 X10 Z0 F600", "G02 X-10 Z0 I-10 K0"])
+    summary = ToolpathAnalyzer().analyze_text(program)
+
+    assert summary.arc_mm == pytest.approx(math.pi * 10.0)
+    assert summary.feed_mm == pytest.approx(10.0 + math.pi * 10.0)
+
+
+def test_results_are_cached_by_program_hash():
+    from toolpath import ToolpathAnalyzer
+
+    analyzer = ToolpathAnalyzer(cache_size=1)
+    text = (SAMPLES / "01_square_pocket.nc").read_text()
+
+    first = analyzer.analyze_text(text, name="A")
+    renamed = analyzer.analyze_text(text, name="B")
+    assert renamed.program == "B"
+    assert renamed.program_hash == first.program_hash
+    assert renamed.cycle_time_s == first.cycle_time_s
+    assert analyzer.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    analyzer.analyze_text("G01 X1 F100")
+    analyzer.analyze_text(text)
+    assert analyzer.stats() == {"size": 1, "hits": 1, "misses": 3}
+
+    with pytest.raises(ValueError):
+        ToolpathAnalyzer(cache_size=0)
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+
+
+def _spectrum_peak_hz(signal, sample_rate_hz, low_hz, high_hz):
+    """Dominant frequency of the |signal| envelope within [low_hz, high_hz]."""
+
+    envelope = np.abs(signal) - np.abs(signal).mean()
+    amplitudes = np.abs(np.fft.rfft(envelope * np.hanning(len(envelope))))
+    freqs = np.fft.rfftfreq(len(envelope), d=1.0 / sample_rate_hz)
+    band = (freqs >= low_hz) & (freqs <= high_hz)
+    return freqs[band][np.argmax(amplitudes[band])]
+
+
+def test_defect_impacts_scale_with_severity_at_bpfo():
+    from spindle import Spindle
+    from vibration import VibrationSynthesizer
+
+    synth = VibrationSynthesizer(seed=3, block_size=8192)
+    blocks = synth.synthesize_batch(
+        rpm=np.array([6000.0, 6000.0, 6000.0]),
+        bearing_severity=np.array([0.0, 0.2, 0.8]),
+        base_rms_mm_s=np.array([0.5, 0.5, 0.5]),
+    )
+
+    assert blocks.shape == (3, 8192)
+    assert blocks.dtype == np.float32
+    rms = np.sqrt((blocks.astype(float) ** 2).mean(axis=1))
+    assert rms[0] == pytest.approx(0.5, rel=0.15)
+    assert rms[0] < rms[1] < rms[2]
+
+    bpfo = Spindle().bearing_frequencies_hz(6000.0)["BPFO"]
+    peak = _spectrum_peak_hz(blocks[2], synth.sample_rate_hz, 200.0, 400.0)
+    assert peak == pytest.approx(bpfo, abs=2 * synth.sample_rate_hz / 8192)
+
+
+def test_block_binary_round_trip():
+    from vibration import VibrationBlock, VibrationSynthesizer
+
+    samples = VibrationSynthesizer(seed=1).synthesize(9000.0, 0.5)
+    block = VibrationBlock("CNC-007", 1_700_000_000.5, 10_000.0, 9000.0, samples)
+
+    payload = block.to_bytes()
+    decoded = VibrationBlock.from_bytes(payload)
+
+    assert len(payload) < 4 * len(samples) + 64
+    assert decoded.machine_id == "CNC-007"
+    assert decoded.timestamp == 1_700_000_000.5
+    assert decoded.rpm == 9000.0
+    np.testing.assert_array_equal(decoded.samples, samples)
+    with pytest.raises(ValueError):
+        VibrationBlock.from_bytes(b"x" * len(payload))
+
+
+def test_machine_and_fleet_emit_blocks_for_bearing_failures():
+    from cnc_machine import CNCMachine
+    from config import SimulatorConfig
+    from failure_modes import SpindleBearingDegradation
+    from fleet import FleetSimulator
+
+    config = SimulatorConfig(vibration_sample_rate_hz=8000.0, vibration_block_size=1024)
+    machine = CNCMachine(config=config, seed=5)
+    machine.start()
+    assert not np.any(machine.vibration_block().samples)  # spindle not sampled yet
+
+    telemetry = machine.generate_telemetry()
+    healthy = machine.vibration_block()
+    machine.failures.inject(SpindleBearingDegradation(severity=1.0))
+    degraded = machine.vibration_block()
+
+    assert healthy.rpm == telemetry.spindle.rpm
+    assert healthy.sample_rate_hz == 8000.0
+    assert len(healthy.samples) == 1024
+    assert np.abs(degraded.samples).max() > 3 * np.abs(healthy.samples).max()
+
+    fleet = FleetSimulator(size=4, config=config, seed=5)
+    fleet.failures.inject("SPINDLE_BEARING_DEGRADATION", [1], severity=1.0)
+    fleet.tick(1.0)
+    blocks = fleet.vibration_blocks()
+
+    assert blocks.shape == (4, 1024)
+    peaks = np.abs(blocks).max(axis=1)
+    assert peaks[1] > 3 * max(peaks[0], peaks[2], peaks[3])
@@ -0,0 +1,153 @@
+"""End-to-end throughput, latency and memory benchmarks (``RUN_BENCH=1``)."""
+
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_BENCH"), reason="set RUN_BENCH=1 to run benchmarks"
+)
+
+MACHINES = 20
+TICKS = 60
+API_KEY = "bench-key"
+METRICS = ("spindle.temperature_c", "spindle.vibration_mm_s", "spindle.load_percent")
+
+
+@pytest.fixture(scope="module")
+def frames():
+    import harness
+
+    return harness.simulate_fleet(MACHINES, TICKS)
+
+
+@pytest.fixture(scope="module")
+def results():
+    import harness
+
+    collected = {}
+    yield collected
+    harness.write_results(collected, harness.RESULTS_PATH)
+    if os.getenv("BENCH_UPDATE"):
+        baselines = harness.load_baselines()
+        baselines.update({n: r.to_dict() for n, r in collected.items()})
+        harness.write_results(
+            {n: harness.BenchResult(**r) for n, r in baselines.items()},
+            harness.BASELINE_PATH,
+        )
+
+
+def _ingestion(harness, frames):
+    app = harness.load_service(
+        "digital-twin-api",
+        {
+            "API_KEYS": API_KEY,
+            "RATE_LIMIT_PER_MIN": "1000000000",
+            # Keep ingestion local: no alert fan-out to an absent service.
+            "CRITICAL_SPINDLE_TEMP_C": "1000",
+        },
+    )
+    requests = []
+    for frame in frames:
+        for item in frame:
+            data = {
+                k: v for k, v in item.items() if k not in ("timestamp", "machine_id")
+            }
+            body = {
+                "timestamp": item["timestamp"],
+                "machine_id": item["machine_id"],
+                "data": data,
+            }
+            requests.append(("POST", f"/machines/{item['machine_id']}/telemetry", body))
+    return harness.Scenario("ingestion", app, requests, headers={"x-api-key": API_KEY})
+
+
+def _detection(harness, frames):
+    app = harness.load_service("anomaly-detection")
+    requests = [("POST", "/detect", {"telemetry": frame}) for frame in frames]
+    return harness.Scenario("detection", app, requests, concurrency=2)
+
+
+def _aggregation(harness, frames):
+    app = harness.load_service("data-aggregator")
+    requests = []
+    for frame in frames:
+        points = [
+            {
+                "machine_id": item["machine_id"],
+                "metric": metric,
+                "timestamp": item["timestamp"],
+                "value": item[metric.split(".")[0]][metric.split(".")[1]],
+            }
+            for item in frame
+            for metric in METRICS
+        ]
+        requests.append(
+            ("POST", "/aggregate", {"points": points, "windows": ["1min", "5min"]})
+        )
+    return harness.Scenario("aggregation", app, requests, concurrency=2)
+
+
+def _prediction(harness, frames):
+    app = harness.load_service("predictive-maintenance")
+    requests = []
+    for frame in frames:
+        for item in frame:
+            tool, spindle = item["tool"], item["spindle"]
+            body = {
+                "machine_id": item["machine_id"],
+                "wear_percent": tool["wear_percent"],
+                "runtime_minutes": tool["runtime_minutes"],
+                "cutting_speed_m_min": 3.1416
+                * tool["diameter_mm"]
+                * spindle["rpm"]
+                / 1000,
+            }
+            requests.append(("POST", "/predict/tool-rul", body))
+    return harness.Scenario("prediction", app, requests)
+
+
+def _alerting(harness, frames):
+    app = harness.load_service("alerting-service", {"SLACK_WEBHOOK_URL": ""})
+    requests = [
+        (
+            "POST",
+            "/alerts",
+            {
+                "machine_id": item["machine_id"],
+                "severity": "high",
+                "message": "Spindle temperature high",
+                "metric": "spindle.temperature_c",
+                "value": item["spindle"]["temperature_c"],
+            },
+        )
+        for frame in frames
+        for item in frame
+    ]
+    return harness.Scenario("alerting", app, requests)
+
+
+@pytest.mark.parametrize(
+    "build", [_ingestion, _detection, _aggregation, _prediction, _alerting]
+)
+def test_pipeline_stage_within_baseline(build, frames, results):
+    import harness
+
+    scenario = build(harness, frames)
+    result = harness.run_scenario(scenario)
+    results[scenario.name] = result
+    print(
+        f"\n{result.scenario:<12} {result.requests:>5} req "
+        f"{result.throughput_rps:>9.1f} req/s  p50 {result.p50_ms:.3f} ms  "
+        f"p95 {result.p95_ms:.3f} ms  p99 {result.p99_ms:.3f} ms  "
+        f"peak {result.peak_memory_kib:.0f} KiB"
+    )
+
+    if os.getenv("BENCH_UPDATE"):
+        return
+    baseline = harness.load_baselines().get(scenario.name)
+    if baseline is None:
+        pytest.skip(f"no baseline for {scenario.name}; run with BENCH_UPDATE=1")
+    tolerance = float(os.getenv("BENCH_TOLERANCE", harness.DEFAULT_TOLERANCE))
+    found = harness.regressions(result, baseline, tolerance)
+    assert not found, f"{scenario.name} regressed: " + "; ".join(found)